@@ -0,0 +1,45 @@
+import base64
+import binascii
+import datetime
+import json
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor was not produced by encode_cursor."""
+
+
+def encode_cursor(*values) -> str:
+    """
+    Packs the sort key of the last row on a page into an opaque, URL-safe cursor.
+    Datetimes are kept as ISO 8601 strings; everything else must be JSON serializable.
+    """
+    payload = [value.isoformat() if isinstance(value, datetime.datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, *types) -> tuple:
+    """
+    Unpacks a cursor from encode_cursor into a tuple of values converted to types
+    (datetime.datetime, int or str), so it can be compared against the sort columns.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursorError("Malformed cursor.") from e
+    if not isinstance(payload, list) or len(payload) != len(types):
+        raise InvalidCursorError("Malformed cursor.")
+
+    values = []
+    for value, value_type in zip(payload, types):
+        try:
+            if value_type is datetime.datetime:
+                values.append(datetime.datetime.fromisoformat(value))
+            elif isinstance(value, value_type) and not isinstance(value, bool):
+                values.append(value)
+            else:
+                raise TypeError(value)
+        except (TypeError, ValueError) as e:
+            raise InvalidCursorError("Malformed cursor.") from e
+    return tuple(values)
@@ -1,10 +1,12 @@
-from pydantic import BaseModel, EmailStr, ConfigDict # Added ConfigDict
+from pydantic import BaseModel, EmailStr, ConfigDict, Field # Added ConfigDict
 from enum import Enum
-from typing import Optional, Dict, Union, List
+from typing import Any, Optional, Dict, Union, List, Tuple
 import datetime
 from backend.app.core.ai.flashcard_generation_module import Flashcard
 from backend.app.core.ai.quiz_generation_module import QuizQuestion
 from backend.app.models.planner import NextStep
+from backend.app.services.nlp_service import SignalProfile
+from backend.app.core.config import NLP_PIPE_BATCH_SIZE
 
 class UserRegistration(BaseModel):
     email: EmailStr
@@ -61,6 +63,8 @@ class StudyMaterialResponse(BaseModel):
     s3_key: str
     upload_date: datetime.datetime
     processing_status: str
+    size_bytes: Optional[int] = None
+    content_sha256: Optional[str] = None
     generated_summaries: List['GeneratedSummaryResponse'] = []
     generated_flashcard_sets: List['GeneratedFlashcardSetResponse'] = []
     generated_quizzes: List['GeneratedQuizResponse'] = []
@@ -68,6 +72,51 @@ class StudyMaterialResponse(BaseModel):
     class Config:
         orm_mode = True # Updated Pydantic V2 syntax
 
+class StudyMaterialInclude(str, Enum):
+    summaries = "summaries"
+    flashcard_sets = "flashcard_sets"
+    quizzes = "quizzes"
+
+class StudyMaterialListItem(BaseModel):
+    """
+    A study material as listed by GET /study-materials/. Generated content is only
+    loaded and returned for the kinds named in ?include=; the others are omitted.
+    """
+    id: int
+    user_id: int
+    file_name: str
+    s3_key: str
+    upload_date: datetime.datetime
+    processing_status: str
+    size_bytes: Optional[int] = None
+    content_sha256: Optional[str] = None
+    generated_summaries: Optional[List['GeneratedSummaryResponse']] = None
+    generated_flashcard_sets: Optional[List['GeneratedFlashcardSetResponse']] = None
+    generated_quizzes: Optional[List['GeneratedQuizResponse']] = None
+
+    @classmethod
+    def from_material(cls, material, attributes=()) -> "StudyMaterialListItem":
+        """
+        Builds the item field by field from a StudyMaterial, adding only the generated
+        content named in attributes, since reading a relationship that was not loaded
+        would lazy-load it.
+        """
+        return cls(
+            id=material.id,
+            user_id=material.user_id,
+            file_name=material.file_name,
+            s3_key=material.s3_key,
+            upload_date=material.upload_date,
+            processing_status=material.processing_status,
+            size_bytes=material.size_bytes,
+            content_sha256=material.content_sha256,
+            **{name: getattr(material, name) for name in attributes}
+        )
+
+class StudyMaterialPage(BaseModel):
+    items: List[StudyMaterialListItem]
+    next_cursor: Optional[str] = None # Pass as ?cursor= to get the next page; null on the last page
+
 class StudyMaterialUpdate(BaseModel):
     file_name: Optional[str] = None
     s3_key: Optional[str] = None
@@ -75,11 +124,37 @@ class StudyMaterialUpdate(BaseModel):
 
 class NLPRequest(BaseModel):
     text: str
+    profile: SignalProfile = SignalProfile.FULL
+
+class NLPBatchRequest(BaseModel):
+    texts: List[str]
+    batch_size: int = Field(NLP_PIPE_BATCH_SIZE, ge=1)
+    profile: SignalProfile = SignalProfile.FULL
 
 class NLPSignalsResponse(BaseModel):
-    lexical_signals: Dict
-    structural_signals: Dict
-    content_density: Dict
+    """
+    Signals extracted from a text. Fields outside the requested profile are
+    not computed and returned as null; computed_fields lists the ones that were.
+    """
+    original_text: str
+    profile: SignalProfile
+    computed_fields: List[str]
+    tokens: List[str]
+    lemmas: Optional[List[str]] = None
+    pos_tags: Optional[List[str]] = None
+    found_question_words: List[str]
+    sentences: Optional[List[str]] = None
+    num_sentences: Optional[int] = None
+    num_paragraphs: int
+    num_alphanumeric_tokens: int
+    unique_words: int
+    average_word_length: float
+    average_sentence_length: Optional[float] = None
+    named_entities: Optional[List[Tuple[str, str]]] = None
+    detected_intent: str
+    intent_confidence: float
+    inferred_user_state: str
+    user_state_confidence: float
 
 class SummarizeRequest(BaseModel):
     text: str
@@ -143,6 +218,39 @@ class GeneratedQuizResponse(BaseModel):
     class Config:
         orm_mode = True # Updated Pydantic V2 syntax
 
+class GenerateAllRequest(BaseModel):
+    text: str
+    detail_level: Optional[str] = "normal" # Detail level of the summary
+
+class GeneratedArtifactsResponse(BaseModel):
+    summary: GeneratedSummaryResponse
+    flashcard_set: GeneratedFlashcardSetResponse
+    quiz: GeneratedQuizResponse
+
+class JobType(str, Enum):
+    summary = "summary"
+    flashcards = "flashcards"
+    quiz = "quiz"
+
+class JobStatus(str, Enum):
+    queued = "queued"
+    running = "running"
+    complete = "complete"
+    failed = "failed"
+
+class JobResponse(BaseModel):
+    id: str
+    job_type: JobType
+    status: JobStatus
+    study_material_id: int
+    result_id: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime.datetime
+    updated_at: Optional[datetime.datetime] = None
+
+    class Config:
+        orm_mode = True # Updated Pydantic V2 syntax
+
 class Permissions(str, Enum):
     view_only = "view_only"
     edit = "edit"
@@ -168,12 +276,43 @@ class SharedMaterialResponse(BaseModel):
     class Config:
         orm_mode = True # Updated Pydantic V2 syntax
 
+class SharedMaterialPage(BaseModel):
+    items: List[SharedMaterialResponse]
+    next_cursor: Optional[str] = None # Pass as ?cursor= to get the next page; null on the last page
+
 class SharedLinkResponse(BaseModel):
     share_token: str
-    full_share_url: str # This will be generated by the frontend using the token
+    full_share_url: str # Frontend page for the token, under SHARE_LINK_BASE_URL
     permissions: Permissions
     expires_at: Optional[datetime.datetime] = None
 
+class SyncEntity(str, Enum):
+    study_material = "study_material"
+    summary = "summary"
+    flashcard_set = "flashcard_set"
+    quiz = "quiz"
+    share = "share"
+
+class SyncOperation(str, Enum):
+    upsert = "upsert"
+    delete = "delete"
+
+class SyncChange(BaseModel):
+    """
+    The latest state of one entity changed since the client's cursor. data holds the
+    entity as its own endpoints return it (a study material without generated content)
+    for upserts, and is null for deletes (tombstones).
+    """
+    entity_type: SyncEntity
+    entity_id: int
+    operation: SyncOperation
+    data: Optional[Dict[str, Any]] = None
+
+class SyncResponse(BaseModel):
+    changes: List[SyncChange]
+    cursor: str # Pass as ?cursor= on the next sync
+    has_more: bool # True if more changes are waiting; sync again right away
+
 class FeedbackCreate(BaseModel):
     material_id: int
     material_type: str
@@ -193,4 +332,6 @@ class FeedbackResponse(BaseModel):
         orm_mode = True # Updated Pydantic V2 syntax
 
 # Add update_forward_refs() to handle forward references after all classes are defined
-StudyMaterialResponse.update_forward_refs()
\ No newline at end of file
+StudyMaterialResponse.update_forward_refs()
+StudyMaterialListItem.update_forward_refs()
+StudyMaterialPage.update_forward_refs()
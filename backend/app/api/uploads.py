@@ -0,0 +1,123 @@
+import os
+from collections import deque
+from typing import AsyncIterator
+
+from fastapi import Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+from python_multipart.exceptions import MultipartParseError
+
+
+class InvalidUploadError(ValueError):
+    """Raised when a request body is not multipart/form-data carrying the expected file field."""
+
+
+class MultipartFileStream:
+    """
+    Reads one file field of a multipart/form-data request straight off the request body.
+    Unlike UploadFile, which Starlette spools to memory and then a temporary file before the
+    route runs, the file is handed on chunk by chunk as it arrives.
+
+    Await open() for the file name, then iterate chunks() once for the content.
+    """
+
+    def __init__(self, request: Request, field_name: str = "file"):
+        content_type, params = parse_options_header(request.headers.get("content-type"))
+        if content_type != b"multipart/form-data" or not params.get(b"boundary"):
+            raise InvalidUploadError("Expected a multipart/form-data body.")
+        self.field_name = field_name
+        self.filename = None
+        self._body = request.stream()
+        self._headers = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._in_file = False
+        self._file_done = False
+        self._pending = deque()
+        self._parser = MultipartParser(params[b"boundary"], callbacks={
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def _on_part_begin(self):
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition"))
+        if self.filename is None and options.get(b"name") == self.field_name.encode() and b"filename" in options:
+            # Keep the last path segment only: browsers on Windows may send the full path
+            name = os.path.basename(options[b"filename"].decode("utf-8", "replace").replace("\\", "/"))
+            if not name or name in (".", ".."):
+                raise InvalidUploadError("The uploaded file has no name.")
+            self.filename = name
+            self._in_file = True
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if self._in_file:
+            self._pending.append(bytes(data[start:end]))
+
+    def _on_part_end(self):
+        if self._in_file:
+            self._in_file = False
+            self._file_done = True
+
+    async def _feed(self) -> bool:
+        """Parses the next chunk of the body. Returns False once the body is exhausted."""
+        try:
+            chunk = await self._body.__anext__()
+        except StopAsyncIteration:
+            return False
+        try:
+            self._parser.write(chunk)
+        except MultipartParseError as e:
+            raise InvalidUploadError("Malformed multipart body.") from e
+        return True
+
+    async def open(self) -> str:
+        """Reads the body up to the start of the file's content and returns its file name."""
+        while self.filename is None:
+            if not await self._feed():
+                raise InvalidUploadError(f"Missing file field '{self.field_name}'.")
+        return self.filename
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        """Yields the file's content as it is read from the body, raising if the body ends before the file does."""
+        while True:
+            while self._pending:
+                yield self._pending.popleft()
+            if self._file_done:
+                return
+            if not await self._feed():
+                raise InvalidUploadError("The request body ended before the uploaded file.")
+
+
+# OpenAPI description of the body MultipartFileStream reads, for routes that take the Request directly
+FILE_UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
@@ -2,8 +2,8 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from pydantic import BaseModel, EmailStr
 from backend.app.core.auth_service import auth_service, UserNotFoundException, InvalidVerificationTokenException, DuplicateUserException, Auth0CreationException, IncorrectLoginCredentialsException
-from backend.app.database import get_db
-from sqlalchemy.orm import Session
+from backend.app.database import get_async_db
+from sqlalchemy.ext.asyncio import AsyncSession
 from backend.app.api.schemas import LoginRequest, TokenResponse # Import new schemas
 
 router = APIRouter()
@@ -16,7 +16,7 @@ class UserCreate(BaseModel):
 from backend.app.api import schemas
 
 @router.post("/auth/register", status_code=status.HTTP_201_CREATED)
-async def register_user_endpoint(user: UserCreate, db: Session = Depends(get_db)):
+async def register_user_endpoint(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     try:
         response_content = await auth_service.register_user(user.email, user.password, db)
         return response_content
@@ -26,7 +26,7 @@ async def register_user_endpoint(user: UserCreate, db: Session = Depends(get_db)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 @router.post("/auth/verify-email", status_code=status.HTTP_200_OK)
-async def verify_email_endpoint(data: schemas.VerifyEmailRequest, db: Session = Depends(get_db)):
+async def verify_email_endpoint(data: schemas.VerifyEmailRequest, db: AsyncSession = Depends(get_async_db)):
     try:
         await auth_service.verify_email(data.email, data.token, db)
         return {"message": "Email verified successfully."}
@@ -36,7 +36,7 @@ async def verify_email_endpoint(data: schemas.VerifyEmailRequest, db: Session =
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.post("/auth/login", response_model=TokenResponse)
-async def login_for_access_token(request: LoginRequest, db: Session = Depends(get_db)):
+async def login_for_access_token(request: LoginRequest, db: AsyncSession = Depends(get_async_db)):
     try:
         token_data = await auth_service.login(request.email, request.password, db)
         return TokenResponse(access_token=token_data["access_token"], token_type=token_data.get("token_type", "bearer"))
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from backend.app.database import get_db
+from backend.app.models.user import User
+from backend.app.dependencies import get_current_user
+from backend.app.api.schemas import JobResponse
+from backend.app.services.job_service import job_service
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["jobs"],
+    dependencies=[Depends(get_current_user)], # All endpoints in this router require authentication
+    responses={404: {"description": "Not found"}},
+)
+
+@router.get("/{job_id}", response_model=JobResponse)
+def read_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Retrieves the status of a background generation job. Once the job is complete,
+    result_id holds the id of the generated summary, flashcard set or quiz.
+    """
+    db_job = job_service.get_job(db, job_id, current_user.id)
+    if db_job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return db_job
@@ -1,6 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from backend.app.services.nlp_service import NLPService
-from backend.app.api.schemas import NLPRequest, NLPSignalsResponse
+from backend.app.api.schemas import NLPRequest, NLPBatchRequest, NLPSignalsResponse
+from backend.app.core.config import NLP_BATCH_MAX_TEXTS
 
 router = APIRouter()
 
@@ -14,7 +17,35 @@ async def process_text_endpoint(
     nlp_service: NLPService = Depends(get_nlp_service)
 ):
     try:
-        signals = nlp_service.process_text(request.text)
+        signals = nlp_service.process_text(request.text, profile=request.profile)
         return NLPSignalsResponse(**signals)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/nlp/process-batch")
+async def process_batch_endpoint(
+    request: NLPBatchRequest,
+    nlp_service: NLPService = Depends(get_nlp_service)
+):
+    """
+    Analyses many texts in one request through spaCy's Language.pipe.
+    Signals are streamed back as NDJSON, one line per text in input order,
+    each tagged with the index of the text it belongs to.
+    """
+    if len(request.texts) > NLP_BATCH_MAX_TEXTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch may contain at most {NLP_BATCH_MAX_TEXTS} texts."
+        )
+
+    def ndjson_lines():
+        # A sync generator, so Starlette iterates it in a threadpool off the event loop
+        signals_iter = nlp_service.process_texts(
+            request.texts,
+            batch_size=request.batch_size,
+            profile=request.profile
+        )
+        for index, signals in enumerate(signals_iter):
+            yield json.dumps({"index": index, **signals}) + "\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
@@ -1,10 +1,14 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from backend.app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.app.database import get_async_db
 from backend.app.models.user import User
+from backend.app.models.shared_study_material import SharedStudyMaterial
 from backend.app.dependencies import get_current_user
-from backend.app.api.schemas import ShareCreateRequest, SharedMaterialResponse, SharedLinkResponse
+from backend.app.api.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from backend.app.api.schemas import ShareCreateRequest, SharedMaterialPage, SharedMaterialResponse, SharedLinkResponse
+from backend.app.core.config import SHARE_LINK_BASE_URL, SHARES_MAX_PAGE_SIZE, SHARES_PAGE_SIZE
 from backend.app.services.sharing_service import SharingService
 
 router = APIRouter(
@@ -16,7 +20,7 @@ router = APIRouter(
 @router.post("/generate-link", response_model=SharedLinkResponse, status_code=status.HTTP_201_CREATED)
 async def generate_link(
     share_request: ShareCreateRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -24,22 +28,26 @@ async def generate_link(
     """
     sharing_service = SharingService(db)
     try:
-        share_token = sharing_service.generate_share_link(
+        share_token = await sharing_service.generate_share_link(
             user_id=current_user.id,
             study_material_id=share_request.study_material_id,
             permissions=share_request.permissions
         )
-        return SharedLinkResponse(share_token=share_token)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e)
         )
+    return SharedLinkResponse(
+        share_token=share_token,
+        full_share_url=f"{SHARE_LINK_BASE_URL}/share/{share_token}",
+        permissions=share_request.permissions
+    )
 
 @router.post("/share-with-user", response_model=SharedMaterialResponse, status_code=status.HTTP_201_CREATED)
 async def share_with_user_endpoint(
     share_request: ShareCreateRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -52,7 +60,7 @@ async def share_with_user_endpoint(
         )
     sharing_service = SharingService(db)
     try:
-        shared_material = sharing_service.share_with_user(
+        shared_material = await sharing_service.share_with_user(
             shared_by_user_id=current_user.id,
             study_material_id=share_request.study_material_id,
             target_user_email=share_request.shared_with_email,
@@ -66,9 +74,9 @@ async def share_with_user_endpoint(
         )
 
 @router.get("/shared/{share_token}", response_model=SharedMaterialResponse)
-def get_shared_material_by_token_endpoint(
+async def get_shared_material_by_token_endpoint(
     share_token: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Optional[User] = Depends(get_current_user)
 ):
     """
@@ -76,72 +84,71 @@ def get_shared_material_by_token_endpoint(
     """
     sharing_service = SharingService(db)
     user_id = current_user.id if current_user else None
-    shared_material = sharing_service.get_shared_material_by_token(share_token, user_id)
+    shared_material = await sharing_service.get_shared_material_by_token(share_token, user_id)
     if not shared_material:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Shared material not found, link may have expired, or you may not have permission to view it."
         )
-    return SharedMaterialResponse(**shared_material)
+    return shared_material
 
-@router.get("/my-shares", response_model=List[SharedMaterialResponse])
-def get_my_shares(
-    db: Session = Depends(get_db),
+def share_page(shares: List[SharedMaterialResponse], limit: int) -> SharedMaterialPage:
+    """Cuts the limit + 1 shares a listing fetched down to one page and the cursor of the next."""
+    next_cursor = encode_cursor(shares[limit - 1].id) if len(shares) > limit else None
+    return SharedMaterialPage(items=shares[:limit], next_cursor=next_cursor)
+
+def cursor_share_id(cursor: Optional[str]) -> Optional[int]:
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor, int)[0]
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/my-shares", response_model=SharedMaterialPage)
+async def get_my_shares(
+    limit: int = Query(SHARES_PAGE_SIZE, ge=1, le=SHARES_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Retrieves a list of study materials shared by the current user.
+    Retrieves the study materials shared by the current user, newest share first, one page at a time.
+    Pass the next_cursor of a page as cursor to get the next one.
     """
-    shares = db.query(SharedStudyMaterial).filter(
-        SharedStudyMaterial.shared_by_user_id == current_user.id
-    ).all()
+    shares = await SharingService(db).list_shares_made(current_user.id, limit, cursor_share_id(cursor))
+    return share_page(shares, limit)
 
-    response_list = []
-    for share in shares:
-        db_study_material = db.query(StudyMaterial).filter(StudyMaterial.id == share.study_material_id).first()
-        if db_study_material:
-            response_data = share.__dict__
-            response_data['file_name'] = db_study_material.file_name
-            response_data['s3_key'] = db_study_material.s3_key
-            response_list.append(SharedMaterialResponse(**response_data))
-    return response_list
-
-@router.get("/shared-with-me", response_model=List[SharedMaterialResponse])
-def get_shared_with_me(
-    db: Session = Depends(get_db),
+@router.get("/shared-with-me", response_model=SharedMaterialPage)
+async def get_shared_with_me(
+    limit: int = Query(SHARES_PAGE_SIZE, ge=1, le=SHARES_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Retrieves a list of study materials shared with the current user.
+    Retrieves the study materials shared with the current user, newest share first, one page at a time.
+    Pass the next_cursor of a page as cursor to get the next one.
     """
-    shares = db.query(SharedStudyMaterial).filter(
-        SharedStudyMaterial.shared_with_user_id == current_user.id
-    ).all()
-
-    response_list = []
-    for share in shares:
-        db_study_material = db.query(StudyMaterial).filter(StudyMaterial.id == share.study_material_id).first()
-        if db_study_material:
-            response_data = share.__dict__
-            response_data['file_name'] = db_study_material.file_name
-            response_data['s3_key'] = db_study_material.s3_key
-            response_list.append(SharedMaterialResponse(**response_data))
-    return response_list
+    shares = await SharingService(db).list_shares_received(current_user.id, limit, cursor_share_id(cursor))
+    return share_page(shares, limit)
 
 @router.delete("/{share_id}", status_code=status.HTTP_204_NO_CONTENT)
-def revoke_share(
+async def revoke_share(
     share_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Revokes a specific share, effectively making the material no longer shared.
     Only the owner of the share can revoke it.
     """
-    db_share = db.query(SharedStudyMaterial).filter(
-        SharedStudyMaterial.id == share_id,
-        SharedStudyMaterial.shared_by_user_id == current_user.id
-    ).first()
+    db_share = await db.scalar(
+        select(SharedStudyMaterial).where(
+            SharedStudyMaterial.id == share_id,
+            SharedStudyMaterial.shared_by_user_id == current_user.id
+        )
+    )
 
     if not db_share:
         raise HTTPException(
@@ -149,6 +156,6 @@ def revoke_share(
             detail="Share not found or user is not the owner"
         )
     
-    db.delete(db_share)
-    db.commit()
+    await db.delete(db_share)
+    await db.commit()
     return
\ No newline at end of file
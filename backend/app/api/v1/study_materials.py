@@ -1,16 +1,27 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from fastapi.responses import StreamingResponse
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, selectinload # Import selectinload
-from backend.app.database import get_db
+from backend.app.database import get_db, get_async_db
 from backend.app.models.study_material import StudyMaterial
+from backend.app.models.change_log import ChangeLogEntry
 from backend.app.models.user import User
 from backend.app.models.generated_summary import GeneratedSummary # Import GeneratedSummary
 from backend.app.models.generated_flashcard_set import GeneratedFlashcardSet # Import GeneratedFlashcardSet
 from backend.app.models.generated_quiz import GeneratedQuiz # Import GeneratedQuiz
-from backend.app.dependencies import get_current_user
+from backend.app.models.generated_content import GeneratedContent
+from backend.app.models.generation_job import GenerationJob
+from backend.app.dependencies import get_current_user, bind_llm_user
+from backend.app.api.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from backend.app.api.uploads import FILE_UPLOAD_OPENAPI, InvalidUploadError, MultipartFileStream
+from backend.app.core.config import STUDY_MATERIALS_MAX_PAGE_SIZE, STUDY_MATERIALS_PAGE_SIZE
 from backend.app.api.schemas import (
     StudyMaterialCreate,
+    StudyMaterialInclude,
+    StudyMaterialListItem,
+    StudyMaterialPage,
     StudyMaterialResponse,
     StudyMaterialUpdate,
     SummarizeRequest,
@@ -19,26 +30,55 @@ from backend.app.api.schemas import (
     GeneratedSummaryResponse,        # New import
     GeneratedFlashcardSetResponse,   # New import
     GeneratedQuizResponse,            # New import
-    ExportRequest
+    ExportRequest,
+    GenerateAllRequest,
+    GeneratedArtifactsResponse,
+    JobResponse,
+    JobType,
+    SyncEntity
 )
-from backend.app.services.nlp_service import NLPService # Import NLPService
+from backend.app.services.nlp_service import NLPService, GenerationTimeoutError # Import NLPService
 from backend.app.services.export_service import export_service
-import shutil
-import os
+from backend.app.services.job_service import job_service
+from backend.app.services.file_store_service import FileStore
+from backend.app.services.storage_service import StorageBackend, get_storage_backend
 import datetime
+import json
 
 from backend.app.core.websockets import emit_to_user # Import emit_to_user
 
-# For S3 integration, will be implemented later
-# from backend.app.services.s3_service import upload_file_to_s3, delete_file_from_s3
-
 router = APIRouter(
     prefix="/study-materials",
     tags=["study-materials"],
-    dependencies=[Depends(get_current_user)], # All endpoints in this router require authentication
+    dependencies=[Depends(get_current_user), Depends(bind_llm_user)], # All endpoints in this router require authentication
     responses={404: {"description": "Not found"}},
 )
 
+# Relationships serialized by StudyMaterialResponse and their models, loaded eagerly on the async routes
+GENERATED_CONTENT_ATTRIBUTES = {
+    "generated_summaries": GeneratedSummary,
+    "generated_flashcard_sets": GeneratedFlashcardSet,
+    "generated_quizzes": GeneratedQuiz,
+}
+
+def generated_content_loader(name: str, with_content: bool = True):
+    """
+    Loads one generated relationship of StudyMaterial with the content of its artifacts,
+    or, when with_content is False, with just the content ids a delete cascades to.
+    """
+    loader = selectinload(getattr(StudyMaterial, name)).selectinload(GENERATED_CONTENT_ATTRIBUTES[name].stored_content)
+    return loader if with_content else loader.load_only(GeneratedContent.id)
+
+def generated_content_options(with_content: bool = True) -> tuple:
+    return tuple(generated_content_loader(name, with_content) for name in GENERATED_CONTENT_ATTRIBUTES)
+
+# Relationship loaded for each ?include= option of the listing
+INCLUDE_ATTRIBUTES = {
+    StudyMaterialInclude.summaries: "generated_summaries",
+    StudyMaterialInclude.flashcard_sets: "generated_flashcard_sets",
+    StudyMaterialInclude.quizzes: "generated_quizzes",
+}
+
 # Initialize NLPService as a dependency
 def get_nlp_service(db: Session = Depends(get_db)): # Pass db session to NLPService
     return NLPService(db)
@@ -47,6 +87,7 @@ def get_nlp_service(db: Session = Depends(get_db)): # Pass db session to NLPServ
 async def summarize_text(
     study_material_id: int, # Added study_material_id
     request: SummarizeRequest,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
     nlp_service: NLPService = Depends(get_nlp_service)
 ):
@@ -54,18 +95,61 @@ async def summarize_text(
     Generates a summary of the provided text using the NLPService and stores it persistently.
     """
     # Ensure the user owns the study material
-    db_study_material = get_user_study_material(nlp_service.db, study_material_id, current_user.id)
+    db_study_material = await aget_user_study_material(db, study_material_id, current_user.id)
     if not db_study_material:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Study material not found or user does not own it")
 
-    summary = nlp_service.get_summary(study_material_id, request.text, request.detail_level) # Pass study_material_id
-    await emit_to_user(str(current_user.id), "summary_created", GeneratedSummaryResponse.from_orm(summary).model_dump())
+    summary = await nlp_service.aget_summary(study_material_id, request.text, request.detail_level) # Pass study_material_id
+    await emit_to_user(str(current_user.id), "summary_created", json.loads(GeneratedSummaryResponse.from_orm(summary).json()))
     return summary
 
+@router.post("/summarize/stream")
+async def stream_summary(
+    study_material_id: int,
+    request: SummarizeRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+    nlp_service: NLPService = Depends(get_nlp_service)
+):
+    """
+    Streams a summary as server-sent events while the LLM writes it.
+    Each text delta is sent as a 'summary_chunk' event (and mirrored to the user's
+    sockets); the stored summary follows as a 'summary_complete' event.
+    """
+    db_study_material = await aget_user_study_material(db, study_material_id, current_user.id)
+    if not db_study_material:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Study material not found or user does not own it")
+
+    user_id = str(current_user.id)
+
+    async def summary_events():
+        index = 0
+        try:
+            async for item in nlp_service.astream_summary(study_material_id, request.text, request.detail_level):
+                if isinstance(item, GeneratedSummary):
+                    payload = json.loads(GeneratedSummaryResponse.from_orm(item).json())
+                    await emit_to_user(user_id, "summary_created", payload)
+                    yield sse_event("summary_complete", payload)
+                    continue
+                chunk = {"study_material_id": study_material_id, "index": index, "delta": item}
+                index += 1
+                await emit_to_user(user_id, "summary_chunk", chunk)
+                yield sse_event("summary_chunk", chunk)
+        except Exception as e:
+            # The response has already started, so report the failure in-band
+            yield sse_event("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        summary_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/flashcards", response_model=GeneratedFlashcardSetResponse) # Changed response_model
 async def generate_flashcards_api(
     study_material_id: int, # Added study_material_id
     request: FlashcardGenerateRequest,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
     nlp_service: NLPService = Depends(get_nlp_service)
 ):
@@ -73,18 +157,19 @@ async def generate_flashcards_api(
     Generates flashcards from the provided text using the NLPService and stores them persistently.
     """
     # Ensure the user owns the study material
-    db_study_material = get_user_study_material(nlp_service.db, study_material_id, current_user.id)
+    db_study_material = await aget_user_study_material(db, study_material_id, current_user.id)
     if not db_study_material:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Study material not found or user does not own it")
 
-    flashcards_set = nlp_service.get_flashcards(study_material_id, request.text) # Pass study_material_id
-    await emit_to_user(str(current_user.id), "flashcards_created", GeneratedFlashcardSetResponse.from_orm(flashcards_set).model_dump())
+    flashcards_set = await nlp_service.aget_flashcards(study_material_id, request.text) # Pass study_material_id
+    await emit_to_user(str(current_user.id), "flashcards_created", json.loads(GeneratedFlashcardSetResponse.from_orm(flashcards_set).json()))
     return flashcards_set
 
 @router.post("/quiz", response_model=GeneratedQuizResponse) # Changed response_model
 async def generate_quiz_api(
     study_material_id: int, # Added study_material_id
     request: QuizGenerateRequest,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
     nlp_service: NLPService = Depends(get_nlp_service)
 ):
@@ -92,98 +177,219 @@ async def generate_quiz_api(
     Generates a quiz from the provided text using the NLPService and stores it persistently.
     """
     # Ensure the user owns the study material
-    db_study_material = get_user_study_material(nlp_service.db, study_material_id, current_user.id)
+    db_study_material = await aget_user_study_material(db, study_material_id, current_user.id)
     if not db_study_material:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Study material not found or user does not own it")
 
-    quiz = nlp_service.get_quiz_questions(study_material_id, request.text) # Pass study_material_id
-    await emit_to_user(str(current_user.id), "quiz_created", GeneratedQuizResponse.from_orm(quiz).model_dump())
+    quiz = await nlp_service.aget_quiz_questions(study_material_id, request.text) # Pass study_material_id
+    await emit_to_user(str(current_user.id), "quiz_created", json.loads(GeneratedQuizResponse.from_orm(quiz).json()))
     return quiz
 
-@router.get("/", response_model=List[StudyMaterialResponse])
-def read_study_materials(
+@router.post("/{study_material_id}/generate-all", response_model=GeneratedArtifactsResponse)
+async def generate_all_artifacts(
+    study_material_id: int,
+    request: GenerateAllRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+    nlp_service: NLPService = Depends(get_nlp_service)
+):
+    """
+    Generates a summary, flashcards and a quiz for a study material in one request.
+    The three LLM calls run concurrently and the artifacts are stored together.
+    """
+    db_study_material = await aget_user_study_material(db, study_material_id, current_user.id)
+    if not db_study_material:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Study material not found or user does not own it")
+
+    try:
+        summary, flashcard_set, quiz = await nlp_service.agenerate_all(study_material_id, request.text, request.detail_level)
+    except GenerationTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+
+    artifacts = GeneratedArtifactsResponse(
+        summary=GeneratedSummaryResponse.from_orm(summary),
+        flashcard_set=GeneratedFlashcardSetResponse.from_orm(flashcard_set),
+        quiz=GeneratedQuizResponse.from_orm(quiz)
+    )
+    await emit_to_user(str(current_user.id), "artifacts_created", json.loads(artifacts.json()))
+    return artifacts
+
+@router.post("/summarize/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_summary_job(
+    study_material_id: int,
+    request: SummarizeRequest,
     db: Session = Depends(get_db),
+    async_db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Retrieve a list of all study materials for the current user.
+    Queues summary generation and returns immediately. Poll GET /jobs/{job_id}
+    or listen for the 'job_completed' socket event for the result.
     """
-    study_materials = db.query(StudyMaterial).options(
-        selectinload(StudyMaterial.generated_summaries),
-        selectinload(StudyMaterial.generated_flashcard_sets),
-        selectinload(StudyMaterial.generated_quizzes)
-    ).filter(
-        StudyMaterial.user_id == current_user.id
-    ).all()
-    return study_materials
+    db_study_material = await aget_user_study_material(async_db, study_material_id, current_user.id)
+    if not db_study_material:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Study material not found or user does not own it")
 
-@router.get("/updates", response_model=List[StudyMaterialResponse])
-def get_updated_study_materials(
-    since: datetime.datetime, # Expect datetime object
+    return await job_service.submit(db, current_user.id, study_material_id, JobType.summary, request.dict())
+
+@router.post("/flashcards/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_flashcards_job(
+    study_material_id: int,
+    request: FlashcardGenerateRequest,
     db: Session = Depends(get_db),
+    async_db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Retrieve study materials for the current user that have been updated since a given timestamp.
+    Queues flashcard generation and returns immediately.
+    """
+    db_study_material = await aget_user_study_material(async_db, study_material_id, current_user.id)
+    if not db_study_material:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Study material not found or user does not own it")
+
+    return await job_service.submit(db, current_user.id, study_material_id, JobType.flashcards, request.dict())
+
+@router.post("/quiz/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_quiz_job(
+    study_material_id: int,
+    request: QuizGenerateRequest,
+    db: Session = Depends(get_db),
+    async_db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Queues quiz generation and returns immediately.
+    """
+    db_study_material = await aget_user_study_material(async_db, study_material_id, current_user.id)
+    if not db_study_material:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Study material not found or user does not own it")
+
+    return await job_service.submit(db, current_user.id, study_material_id, JobType.quiz, request.dict())
+
+@router.get("/", response_model=StudyMaterialPage, response_model_exclude_unset=True)
+async def read_study_materials(
+    limit: int = Query(STUDY_MATERIALS_PAGE_SIZE, ge=1, le=STUDY_MATERIALS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    include: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Retrieve the current user's study materials, newest first, one page at a time.
+
+    Args:
+        limit (int): Materials per page.
+        cursor (str): The next_cursor of the previous page; omit it for the first page.
+        include (str): Comma-separated generated content to return with each material
+                       (summaries, flashcard_sets, quizzes). Omitted by default.
+
+    Returns:
+        StudyMaterialPage: The materials and the cursor of the next page, which is null on the last page.
+    """
+    try:
+        included = {StudyMaterialInclude(name.strip()) for name in include.split(",") if name.strip()} if include else set()
+    except ValueError:
+        allowed = ", ".join(option.value for option in StudyMaterialInclude)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid include. Must be a comma-separated list of: {allowed}")
+    attributes = [INCLUDE_ATTRIBUTES[option] for option in StudyMaterialInclude if option in included]
+
+    query = select(StudyMaterial).options(
+        *(generated_content_loader(name) for name in attributes)
+    ).where(StudyMaterial.user_id == current_user.id)
+    if cursor:
+        try:
+            after = decode_cursor(cursor, datetime.datetime, int)
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        # Keyset condition: rows strictly after the last one returned, in (upload_date, id) DESC order
+        query = query.where(tuple_(StudyMaterial.upload_date, StudyMaterial.id) < after)
+    # One extra row tells whether there is a next page without a COUNT
+    query = query.order_by(StudyMaterial.upload_date.desc(), StudyMaterial.id.desc()).limit(limit + 1)
+
+    materials = (await db.execute(query)).scalars().all()
+    page = materials[:limit]
+    next_cursor = encode_cursor(page[-1].upload_date, page[-1].id) if len(materials) > limit else None
+    items = [StudyMaterialListItem.from_material(material, attributes) for material in page]
+    return StudyMaterialPage(items=items, next_cursor=next_cursor)
+
+@router.get("/updates", response_model=List[StudyMaterialResponse], deprecated=True)
+async def get_updated_study_materials(
+    since: datetime.datetime, # Expect datetime object
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Retrieve study materials for the current user that have been created or updated since a given timestamp.
+    Deprecated: it cannot report deletions. Use GET /sync, which also covers generated content and shares.
 
     Args:
-        since (datetime.datetime): The timestamp (e.g., ISO 8601 format) from which to retrieve updates.
-                                   Only materials updated *after* this timestamp will be returned.
+        since (datetime.datetime): The timestamp (e.g., ISO 8601 format, UTC) from which to retrieve updates.
+                                   Only materials changed *after* this timestamp will be returned.
 
     Returns:
         List[StudyMaterialResponse]: A list of study materials that have been updated.
     """
-    updated_materials = db.query(StudyMaterial).filter(
-        StudyMaterial.user_id == current_user.id,
-        StudyMaterial.updated_at > since
-    ).all()
-    return updated_materials
+    changed_ids = select(ChangeLogEntry.entity_id).where(
+        ChangeLogEntry.user_id == current_user.id,
+        ChangeLogEntry.entity_type == SyncEntity.study_material.value,
+        ChangeLogEntry.changed_at > since
+    )
+    result = await db.execute(
+        select(StudyMaterial).options(*generated_content_options()).where(
+            StudyMaterial.user_id == current_user.id,
+            StudyMaterial.id.in_(changed_ids)
+        )
+    )
+    return result.scalars().all()
 
-@router.post("/", response_model=StudyMaterialResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=StudyMaterialResponse, status_code=status.HTTP_201_CREATED, openapi_extra=FILE_UPLOAD_OPENAPI)
 async def create_study_material(
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+    storage: StorageBackend = Depends(get_storage_backend)
 ):
     """
-    Upload a new study material file.
-    S3 integration will be added here later. For now, it creates a DB entry.
+    Upload a new study material file, sent as the 'file' field of a multipart/form-data body.
+    The file streams from the request to storage part by part, hashed on the way, and is
+    never held whole in memory or on local disk. Content that is already stored, by this
+    user or any other, is kept once and shared.
     """
-    # Placeholder for S3 upload logic
-    # s3_key = await upload_file_to_s3(file.file, file.filename, current_user.id)
-    # For now, let's save the file locally for demonstration purposes (will remove later)
-    temp_file_path = f"temp_{file.filename}"
-    with open(temp_file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    # In a real scenario, this would be the s3_key
-    s3_key = f"users/{current_user.id}/{file.filename}" 
+    file_store = FileStore(db, storage)
+    try:
+        upload = MultipartFileStream(request)
+        file_name = await upload.open()
+        stored = await file_store.add(upload.chunks())
+    except InvalidUploadError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
     db_study_material = StudyMaterial(
         user_id=current_user.id,
-        file_name=file.filename,
-        s3_key=s3_key,
+        file_name=file_name,
+        s3_key=stored.storage_key,
+        size_bytes=stored.size,
+        content_sha256=stored.sha256,
+        stored_file_id=stored.stored_file_id,
         processing_status="pending"
     )
     db.add(db_study_material)
-    db.commit()
-    db.refresh(db_study_material)
-    
-    # Clean up temp file (will be replaced by S3 cleanup)
-    os.remove(temp_file_path)
+    await file_store.commit()
+    # Load the (empty) generated collections too, so the response never lazy-loads them
+    await db.refresh(db_study_material, ["upload_date", *GENERATED_CONTENT_ATTRIBUTES])
 
-    await emit_to_user(str(current_user.id), "study_material_created", StudyMaterialResponse.from_orm(db_study_material).model_dump())
+    await emit_to_user(str(current_user.id), "study_material_created", json.loads(StudyMaterialResponse.from_orm(db_study_material).json()))
     return db_study_material
 
 @router.get("/{study_material_id}", response_model=StudyMaterialResponse)
-def read_study_material(
+async def read_study_material(
     study_material_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Retrieve details of a specific study material by ID.
     """
-    db_study_material = get_user_study_material(db, study_material_id, current_user.id)
+    db_study_material = await aget_user_study_material(db, study_material_id, current_user.id, generated_content_options())
     if db_study_material is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Study material not found")
     return db_study_material
@@ -192,7 +398,7 @@ def read_study_material(
 async def update_study_material(
     study_material_id: int,
     study_material_update: StudyMaterialUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -206,94 +412,100 @@ async def update_study_material(
     Returns:
         StudyMaterialResponse: The updated study material object.
     """
-    db_study_material = get_user_study_material(db, study_material_id, current_user.id)
+    db_study_material = await aget_user_study_material(db, study_material_id, current_user.id, generated_content_options())
     if db_study_material is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Study material not found")
 
-    update_data = study_material_update.model_dump(exclude_unset=True)
+    update_data = study_material_update.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_study_material, key, value)
     
     db.add(db_study_material)
-    db.commit()
-    db.refresh(db_study_material)
-    await emit_to_user(str(current_user.id), "study_material_updated", StudyMaterialResponse.from_orm(db_study_material).model_dump())
+    await db.commit()
+    await emit_to_user(str(current_user.id), "study_material_updated", json.loads(StudyMaterialResponse.from_orm(db_study_material).json()))
     return db_study_material
 
 @router.delete("/{study_material_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_study_material(
     study_material_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+    storage: StorageBackend = Depends(get_storage_backend)
 ):
     """
-    Delete a study material. This will also delete the file from S3 later.
+    Delete a study material, and its file in storage unless other materials share it.
     """
-    db_study_material = get_user_study_material(db, study_material_id, current_user.id)
+    # The session updates dependent rows on delete, which needs them loaded up front
+    db_study_material = await aget_user_study_material(
+        db, study_material_id, current_user.id, (
+            *generated_content_options(with_content=False),
+            selectinload(StudyMaterial.shares),
+            selectinload(StudyMaterial.generation_jobs).load_only(GenerationJob.id),
+        )
+    )
     if db_study_material is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Study material not found")
     
-    # Placeholder for S3 delete logic
-    # await delete_file_from_s3(db_study_material.s3_key)
-
-    db.delete(db_study_material)
-    db.commit()
+    file_store = FileStore(db, storage)
+    await db.delete(db_study_material)
+    await file_store.release(db_study_material)
+    await file_store.commit()
     await emit_to_user(str(current_user.id), "study_material_deleted", {"id": study_material_id})
     return
 
 @router.get("/{study_material_id}/summaries", response_model=List[GeneratedSummaryResponse])
-def get_summaries_for_study_material(
+async def get_summaries_for_study_material(
     study_material_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Retrieves a list of generated summaries for a specific study material.
     """
-    db_study_material = get_user_study_material(db, study_material_id, current_user.id)
+    db_study_material = await aget_user_study_material(db, study_material_id, current_user.id)
     if db_study_material is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Study material not found or user does not own it")
 
-    summaries = db.query(GeneratedSummary).filter(
-        GeneratedSummary.study_material_id == study_material_id
-    ).all()
-    return summaries
+    result = await db.execute(
+        select(GeneratedSummary).options(selectinload(GeneratedSummary.stored_content)).where(GeneratedSummary.study_material_id == study_material_id)
+    )
+    return result.scalars().all()
 
 @router.get("/{study_material_id}/flashcard-sets", response_model=List[GeneratedFlashcardSetResponse])
-def get_flashcard_sets_for_study_material(
+async def get_flashcard_sets_for_study_material(
     study_material_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Retrieves a list of generated flashcard sets for a specific study material.
     """
-    db_study_material = get_user_study_material(db, study_material_id, current_user.id)
+    db_study_material = await aget_user_study_material(db, study_material_id, current_user.id)
     if db_study_material is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Study material not found or user does not own it")
 
-    flashcard_sets = db.query(GeneratedFlashcardSet).filter(
-        GeneratedFlashcardSet.study_material_id == study_material_id
-    ).all()
-    return flashcard_sets
+    result = await db.execute(
+        select(GeneratedFlashcardSet).options(selectinload(GeneratedFlashcardSet.stored_content)).where(GeneratedFlashcardSet.study_material_id == study_material_id)
+    )
+    return result.scalars().all()
 
 @router.get("/{study_material_id}/quizzes", response_model=List[GeneratedQuizResponse])
-def get_quizzes_for_study_material(
+async def get_quizzes_for_study_material(
     study_material_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Retrieves a list of generated quizzes for a specific study material.
     """
-    db_study_material = get_user_study_material(db, study_material_id, current_user.id)
+    db_study_material = await aget_user_study_material(db, study_material_id, current_user.id)
     if db_study_material is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Study material not found or user does not own it")
 
-    quizzes = db.query(GeneratedQuiz).filter(
-        GeneratedQuiz.study_material_id == study_material_id
-    ).all()
-    return quizzes
+    result = await db.execute(
+        select(GeneratedQuiz).options(selectinload(GeneratedQuiz.stored_content)).where(GeneratedQuiz.study_material_id == study_material_id)
+    )
+    return result.scalars().all()
 
 
 
@@ -314,6 +526,12 @@ async def export_material(
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
+def sse_event(event: str, data: dict) -> str:
+    """
+    Formats one server-sent event.
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 def get_user_study_material(db: Session, study_material_id: int, user_id: int):
     """
     Retrieves a single study material by its ID, ensuring it belongs to the specified user.
@@ -322,4 +540,17 @@ def get_user_study_material(db: Session, study_material_id: int, user_id: int):
         StudyMaterial.id == study_material_id,
         StudyMaterial.user_id == user_id
     ).first()
-    return db_study_material
\ No newline at end of file
+    return db_study_material
+
+async def aget_user_study_material(db: AsyncSession, study_material_id: int, user_id: int, options=()):
+    """
+    Async variant of get_user_study_material. Pass loader options for every relationship
+    the caller reads; an AsyncSession cannot lazy-load them later.
+    """
+    result = await db.execute(
+        select(StudyMaterial).options(*options).where(
+            StudyMaterial.id == study_material_id,
+            StudyMaterial.user_id == user_id
+        )
+    )
+    return result.scalar_one_or_none()
\ No newline at end of file
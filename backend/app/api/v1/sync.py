@@ -0,0 +1,39 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.app.database import get_async_db
+from backend.app.models.user import User
+from backend.app.dependencies import get_current_user
+from backend.app.api.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from backend.app.api.schemas import SyncResponse
+from backend.app.core.config import SYNC_MAX_PAGE_SIZE, SYNC_PAGE_SIZE
+from backend.app.services.sync_service import SyncService
+
+router = APIRouter(
+    prefix="/sync",
+    tags=["sync"],
+    dependencies=[Depends(get_current_user)], # All endpoints in this router require authentication
+)
+
+@router.get("/", response_model=SyncResponse)
+async def sync_changes(
+    cursor: Optional[str] = None,
+    limit: int = Query(SYNC_PAGE_SIZE, ge=1, le=SYNC_MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Returns what changed in the user's study materials, generated content and shares
+    since cursor: the latest state of each changed entity, or a tombstone if it was deleted.
+
+    Omit cursor on the first sync to receive everything. Store the returned cursor and
+    pass it next time; while has_more is true, call again right away. limit bounds the
+    change log entries read per call, so a page never holds more than limit changes.
+    """
+    try:
+        after_id = decode_cursor(cursor, int)[0] if cursor else 0
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    changes, last_id, has_more = await SyncService(db).changes_since(current_user.id, after_id, limit)
+    return SyncResponse(changes=changes, cursor=encode_cursor(last_id), has_more=has_more)
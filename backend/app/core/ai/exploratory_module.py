@@ -1,6 +1,6 @@
 # backend/app/core/ai/exploratory_module.py
 
-from langchain_openai import ChatOpenAI
+from backend.app.core.ai.llm_client_pool import llm_client_pool
 from langchain_core.prompts import ChatPromptTemplate, SystemMessagePromptTemplate, HumanMessagePromptTemplate
 from langchain_core.messages import SystemMessage, AIMessage
 
@@ -18,7 +18,7 @@ class ExploratoryModule:
             model_name: The name of the OpenAI model to use.
             temperature: The sampling temperature for the LLM.
         """
-        self.llm = ChatOpenAI(model_name=model_name, temperature=temperature)
+        self.llm = llm_client_pool.get(model_name, temperature) # Shared with every module using the same model and temperature
         self.prompt = ChatPromptTemplate.from_messages(
             [
                 SystemMessage(
@@ -69,6 +69,25 @@ class ExploratoryModule:
         }).content
         return response_content
 
+    async def agenerate_phrasing(self, user_input: str, inferred_context: dict) -> str:
+        """
+        Async counterpart of generate_phrasing, using chain.ainvoke.
+        """
+        key_term = inferred_context.get("key_term")
+        topic = inferred_context.get("topic")
+
+        if not key_term or not topic:
+            # Fallback if context is missing
+            return "Could you please tell me more about what you're trying to understand?"
+
+        chain = self.prompt | self.llm
+        response = await chain.ainvoke({
+            "user_input": user_input,
+            "key_term": key_term,
+            "topic": topic
+        })
+        return response.content
+
 # Example of how this might be used (requires OpenAI API key to be set up)
 if __name__ == '__main__':
     # Ensure OPENAI_API_KEY environment variable is set
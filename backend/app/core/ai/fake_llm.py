@@ -0,0 +1,214 @@
+# backend/app/core/ai/fake_llm.py
+#
+# Offline stand-in for ChatOpenAI, selected with LLM_PROVIDER=fake. Answers every
+# prompt the generation modules send with well-formed, deterministic output derived
+# from the prompt text, after a simulated latency, so the whole app can be load
+# tested without network access or API costs.
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+import httpx
+import openai
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.pydantic_v1 import PrivateAttr
+from langchain_core.runnables import Runnable, RunnableLambda
+
+from backend.app.core.config import (
+    FAKE_LLM_ERROR_KIND,
+    FAKE_LLM_ERROR_RATE,
+    FAKE_LLM_LATENCY_DISTRIBUTION,
+    FAKE_LLM_LATENCY_SECONDS,
+    FAKE_LLM_LATENCY_SPREAD,
+    FAKE_LLM_SEED,
+    FAKE_LLM_TOKENS_PER_SECOND,
+)
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_STREAM_TOKEN = re.compile(r"\S+\s*")
+_FAKE_REQUEST = httpx.Request("POST", "https://fake-llm.invalid/v1/chat/completions")
+
+
+def _sentences(text: str) -> List[str]:
+    return [sentence.strip() for sentence in _SENTENCE_END.split(text.strip()) if sentence.strip()]
+
+
+def _prompt_body(prompt: str) -> str:
+    """The study text inside a module prompt: everything between the instruction and the answer label."""
+    parts = prompt.split("\n\n")
+    return "\n\n".join(parts[1:-1]) if len(parts) >= 3 else prompt
+
+
+def _topic(sentence: str) -> str:
+    return " ".join(sentence.rstrip(".!?").split()[:6])
+
+
+class FakeStudyChatModel(BaseChatModel):
+    """
+    Chat model that answers summary, section/combine summary, flashcard and quiz
+    prompts (free text or structured) and the clarity prompts without a network call.
+
+    Latency to the first token is drawn from latency_distribution ("constant",
+    "uniform" or "lognormal" around latency_seconds), streams are paced at
+    tokens_per_second, and error_rate of the calls fail with the retryable OpenAI
+    error named by error_kind ("timeout", "connection", "rate_limit", "server_error").
+    The answer only depends on the prompt; seed fixes the latency and error draws.
+    """
+
+    latency_seconds: float = FAKE_LLM_LATENCY_SECONDS
+    latency_distribution: str = FAKE_LLM_LATENCY_DISTRIBUTION
+    latency_spread: float = FAKE_LLM_LATENCY_SPREAD
+    tokens_per_second: float = FAKE_LLM_TOKENS_PER_SECOND
+    error_rate: float = FAKE_LLM_ERROR_RATE
+    error_kind: str = FAKE_LLM_ERROR_KIND
+    seed: Optional[int] = FAKE_LLM_SEED
+    structured_schema: Optional[Any] = None
+
+    _rng: random.Random = PrivateAttr()
+    _rng_lock: threading.Lock = PrivateAttr()
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._rng = random.Random(self.seed)
+        self._rng_lock = threading.Lock()
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-study"
+
+    def with_structured_output(self, schema: Any, **kwargs: Any) -> Runnable:
+        """Answers with JSON matching schema (a FlashcardList or QuizQuestionList) and parses it into the model."""
+        structured = FakeStudyChatModel(
+            latency_seconds=self.latency_seconds,
+            latency_distribution=self.latency_distribution,
+            latency_spread=self.latency_spread,
+            tokens_per_second=self.tokens_per_second,
+            error_rate=self.error_rate,
+            error_kind=self.error_kind,
+            seed=self.seed,
+            structured_schema=schema,
+        )
+        # Keep drawing from the same sequence, so a seeded run stays reproducible
+        structured._rng = self._rng
+        structured._rng_lock = self._rng_lock
+        return structured | RunnableLambda(lambda message: schema.parse_raw(message.content))
+
+    def sample_latency(self) -> float:
+        """Draws the time to the first token."""
+        with self._rng_lock:
+            if self.latency_distribution == "constant" or self.latency_seconds <= 0:
+                return max(0.0, self.latency_seconds)
+            if self.latency_distribution == "uniform":
+                spread = self.latency_seconds * self.latency_spread
+                return max(0.0, self._rng.uniform(self.latency_seconds - spread, self.latency_seconds + spread))
+            # Lognormal with latency_seconds as its median gives the long tail real providers show
+            return self._rng.lognormvariate(math.log(self.latency_seconds), self.latency_spread)
+
+    def _maybe_fail(self):
+        with self._rng_lock:
+            failed = self.error_rate > 0 and self._rng.random() < self.error_rate
+        if not failed:
+            return
+        if self.error_kind == "timeout":
+            raise openai.APITimeoutError(request=_FAKE_REQUEST)
+        if self.error_kind == "connection":
+            raise openai.APIConnectionError(request=_FAKE_REQUEST)
+        if self.error_kind == "rate_limit":
+            raise openai.RateLimitError(
+                "Fake rate limit", response=httpx.Response(429, request=_FAKE_REQUEST), body=None
+            )
+        raise openai.InternalServerError(
+            "Fake server error", response=httpx.Response(500, request=_FAKE_REQUEST), body=None
+        )
+
+    def respond(self, messages: List[BaseMessage]) -> str:
+        """The deterministic answer to a prompt."""
+        prompt = next(
+            (str(message.content) for message in reversed(messages) if isinstance(message, HumanMessage)),
+            str(messages[-1].content) if messages else "",
+        )
+        sentences = _sentences(_prompt_body(prompt)) or ["The text is empty."]
+        digest = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16)
+
+        schema_fields = getattr(self.structured_schema, "__fields__", {})
+        if "flashcards" in schema_fields:
+            return json.dumps({"flashcards": self._flashcards(sentences)})
+        if "questions" in schema_fields:
+            return json.dumps({"questions": self._quiz(sentences, digest)})
+
+        stripped = prompt.rstrip()
+        if stripped.endswith("Flashcards:"):
+            return "\n".join(
+                f"{i}. Question: {card['question']}\nAnswer: {card['answer']}"
+                for i, card in enumerate(self._flashcards(sentences), start=1)
+            )
+        if stripped.endswith("Quiz Questions:"):
+            blocks = []
+            for i, question in enumerate(self._quiz(sentences, digest), start=1):
+                options = "\n".join(f"  {letter}. {option}" for letter, option in zip("ABCD", question["options"]))
+                letter = "ABCD"[question["options"].index(question["correct_answer"])]
+                blocks.append(f"{i}. Question: {question['question']}\nOptions:\n{options}\nCorrect Answer: {letter}")
+            return "\n\n".join(blocks)
+        if stripped.endswith("Brief Summary:"):
+            return " ".join(sentences[:1])
+        if stripped.endswith("Summary:"):
+            return " ".join(sentences[:3])
+        return f"Could you tell me more about {_topic(sentences[0]).lower()}?"
+
+    def _flashcards(self, sentences: List[str]) -> List[dict]:
+        return [
+            {"question": f"What does the text say about {_topic(sentence).lower()}?", "answer": sentence}
+            for sentence in sentences[:5]
+        ]
+
+    def _quiz(self, sentences: List[str], digest: int) -> List[dict]:
+        questions = []
+        for i, sentence in enumerate(sentences[:3]):
+            options = [f"It is unrelated to {_topic(sentence).lower()}.", "The text does not mention it.", "None of the above."]
+            options.insert((digest >> (2 * i)) % 4, sentence)
+            questions.append({
+                "question": f"Which statement about {_topic(sentence).lower()} matches the text?",
+                "options": options,
+                "correct_answer": sentence,
+            })
+        return questions
+
+    def _stream_delays(self, content: str) -> Iterator[tuple]:
+        delay = 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+        for i, token in enumerate(_STREAM_TOKEN.findall(content)):
+            yield (delay if i else 0.0), token
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.sample_latency())
+        self._maybe_fail()
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.respond(messages)))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.sample_latency())
+        self._maybe_fail()
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.respond(messages)))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.sample_latency())
+        self._maybe_fail()
+        for delay, token in self._stream_delays(self.respond(messages)):
+            if delay:
+                time.sleep(delay)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.sample_latency())
+        self._maybe_fail()
+        for delay, token in self._stream_delays(self.respond(messages)):
+            if delay:
+                await asyncio.sleep(delay)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
@@ -1,27 +1,39 @@
 import os
-import re # Added this line
 from typing import List
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_openai import ChatOpenAI
-from pydantic import BaseModel, Field
+from backend.app.core.ai.llm_client_pool import llm_client_pool
+from pydantic import BaseModel, Field, ValidationError
+from backend.app.core.ai.generation_cache import generation_cache
+from backend.app.core.ai.output_parsing import load_json_items, parse_flashcard_text
+from backend.app.core.config import LLM_STRUCTURED_OUTPUT
 
 class Flashcard(BaseModel):
     """Represents a single flashcard with a question and an answer."""
     question: str = Field(..., description="The question side of the flashcard.")
     answer: str = Field(..., description="The answer side of the flashcard.")
 
+class FlashcardList(BaseModel):
+    """The flashcards generated from a text."""
+    flashcards: List[Flashcard] = Field(..., description="The flashcards, one per key concept.")
+
 class FlashcardGenerationModule:
-    def __init__(self, model_name: str = "gpt-4o", temperature: float = 0.5):
+    # Bump whenever the prompt template or parser changes so cached flashcards are not reused
+    PROMPT_TEMPLATE_VERSION = "2"
+
+    def __init__(self, model_name: str = "gpt-4o", temperature: float = 0.5, structured_output: bool = LLM_STRUCTURED_OUTPUT):
         """
         Initializes the FlashcardGenerationModule with an LLM and prompt template.
         Args:
             model_name: The name of the OpenAI model to use.
             temperature: The sampling temperature for the LLM (lower for more factual/less creative).
+            structured_output: Whether to request the flashcards through a JSON schema (function calling)
+                               instead of parsing them out of free text.
         """
         self.llm = None
         self.model_name = model_name
         self.temperature = temperature
+        self.structured_output = structured_output
         # Using StrOutputParser for initial output, will parse string into Flashcard objects
         self.output_parser = StrOutputParser() 
 
@@ -50,35 +62,73 @@ class FlashcardGenerationModule:
         if "OPENAI_API_KEY" not in os.environ:
             raise ValueError("OPENAI_API_KEY environment variable is not set.")
 
-        if self.llm is None:
-            self.llm = ChatOpenAI(model_name=self.model_name, temperature=self.temperature)
+        cache_key = self._cache_key(text)
+        cached_flashcards = generation_cache.get(cache_key)
+        if cached_flashcards is not None:
+            return [Flashcard(**fc) for fc in cached_flashcards]
 
-        chain = self.flashcard_prompt_template | self.llm | self.output_parser
-        llm_output = chain.invoke({"text": text})
-        
-        return self._parse_llm_output_to_flashcards(llm_output)
+        llm_output = self._build_chain().invoke({"text": text})
+        return self._parse_and_cache(cache_key, llm_output)
 
-    def _parse_llm_output_to_flashcards(self, llm_output: str) -> List[Flashcard]:
+    async def agenerate_flashcards(self, text: str) -> List[Flashcard]:
         """
-        Parses the LLM's raw string output into a list of Flashcard objects.
-        Uses regex to find "Question: ... Answer: ..." blocks to handle varied formatting.
+        Async variant of generate_flashcards that awaits the LLM through chain.ainvoke.
         """
-        flashcards = []
-        # Regex to find blocks starting with optional numbering, "Question:", and containing "Answer:"
-        # It's designed to be flexible with whitespace and numbering.
-        flashcard_blocks = re.findall(
-            r"(?m)^\s*\d*[\.\)]?\s*Question:\s*(.*?)\s*Answer:\s*(.*?)(?=\n^\s*\d*[\.\)]?\s*Question:|\Z)",
-            llm_output,
-            re.DOTALL
+        if "OPENAI_API_KEY" not in os.environ:
+            raise ValueError("OPENAI_API_KEY environment variable is not set.")
+
+        cache_key = self._cache_key(text)
+        cached_flashcards = await generation_cache.aget(cache_key)
+        if cached_flashcards is not None:
+            return [Flashcard(**fc) for fc in cached_flashcards]
+
+        llm_output = await self._build_chain().ainvoke({"text": text})
+        return await self._aparse_and_cache(cache_key, llm_output)
+
+    def _cache_key(self, text: str) -> str:
+        return generation_cache.make_key(
+            "flashcard_generation", self.PROMPT_TEMPLATE_VERSION, self.model_name, self.temperature, text
         )
 
-        for question, answer in flashcard_blocks:
-            question = question.strip()
-            answer = answer.strip()
-            
-            if question and answer:
-                flashcards.append(Flashcard(question=question, answer=answer))
-        
+    def _build_chain(self):
+        if self.llm is None:
+            self.llm = llm_client_pool.get(self.model_name, self.temperature)
+        if self.structured_output:
+            return self.flashcard_prompt_template | self.llm.with_structured_output(FlashcardList)
+        return self.flashcard_prompt_template | self.llm | self.output_parser
+
+    def _parse_and_cache(self, cache_key: str, llm_output) -> List[Flashcard]:
+        flashcards = self._parse_llm_output_to_flashcards(llm_output)
+        # Empty results usually mean malformed output; let the next request retry
+        if flashcards:
+            generation_cache.set(cache_key, [fc.dict() for fc in flashcards])
+        return flashcards
+
+    async def _aparse_and_cache(self, cache_key: str, llm_output) -> List[Flashcard]:
+        flashcards = self._parse_llm_output_to_flashcards(llm_output)
+        if flashcards:
+            await generation_cache.aset(cache_key, [fc.dict() for fc in flashcards])
+        return flashcards
+
+    def _parse_llm_output_to_flashcards(self, llm_output) -> List[Flashcard]:
+        """
+        Converts the LLM's output into Flashcard objects. Structured output (a FlashcardList,
+        a list of dicts or a JSON string) is used as-is; free text falls back to the
+        single-pass "Question: ... Answer: ..." parser. Invalid items are skipped
+        rather than discarding the whole generation.
+        """
+        items = load_json_items(llm_output, "flashcards")
+        if items is None:
+            items = parse_flashcard_text(llm_output) if isinstance(llm_output, str) else []
+
+        flashcards = []
+        for item in items:
+            try:
+                flashcard = Flashcard(**item)
+            except (TypeError, ValidationError):
+                continue
+            if flashcard.question.strip() and flashcard.answer.strip():
+                flashcards.append(flashcard)
         return flashcards
 
 if __name__ == "__main__":
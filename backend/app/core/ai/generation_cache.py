@@ -0,0 +1,278 @@
+# backend/app/core/ai/generation_cache.py
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from backend.app.core.config import (
+    GENERATION_CACHE_ENABLED,
+    GENERATION_CACHE_MAX_ENTRIES,
+    GENERATION_CACHE_TTL_SECONDS,
+    REDIS_URL,
+)
+
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+KEY_PREFIX = "gen:"
+
+
+def normalize_text(text: str) -> str:
+    """Collapses whitespace so that reformatted copies of a text share a cache entry."""
+    return " ".join(text.split())
+
+
+class LRUTier:
+    """
+    In-process cache tier. Entries expire after ttl_seconds and the least
+    recently used entry is evicted once max_entries is reached.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisTier:
+    """
+    Shared cache tier backed by Redis. Values are stored as JSON with a TTL;
+    memory-based eviction is left to the server's maxmemory policy.
+    Redis errors are logged and treated as cache misses.
+
+    get/set block on the synchronous client; coroutines use aget/aset, which go through
+    async_client (a redis.asyncio client) when given, or the threadpool otherwise.
+    """
+
+    def __init__(self, client, ttl_seconds: int, async_client=None):
+        self.client = client
+        self.async_client = async_client
+        self.ttl_seconds = ttl_seconds
+        self.errors = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = self.client.get(key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Generation cache read from Redis failed: {e}")
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any):
+        try:
+            self.client.set(key, json.dumps(value), ex=self.ttl_seconds)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Generation cache write to Redis failed: {e}")
+
+    async def aget(self, key: str) -> Optional[Any]:
+        if self.async_client is None:
+            return await run_in_threadpool(self.get, key)
+        try:
+            raw = await self.async_client.get(key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Generation cache read from Redis failed: {e}")
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    async def aset(self, key: str, value: Any):
+        if self.async_client is None:
+            return await run_in_threadpool(self.set, key, value)
+        try:
+            await self.async_client.set(key, json.dumps(value), ex=self.ttl_seconds)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Generation cache write to Redis failed: {e}")
+
+
+def create_redis_client(url: str):
+    """Creates a Redis client. redis is an optional dependency, only needed when REDIS_URL is set."""
+    import redis
+    return redis.Redis.from_url(url, socket_timeout=1, socket_connect_timeout=1)
+
+
+def create_async_redis_client(url: str):
+    """Creates a redis.asyncio client, for lookups from coroutines that must not block the event loop."""
+    import redis.asyncio
+    return redis.asyncio.Redis.from_url(url, socket_timeout=1, socket_connect_timeout=1)
+
+
+class GenerationCache:
+    """
+    Content-addressed cache for LLM generations.
+
+    Keys hash everything that determines a generation: the module, its prompt
+    template version, the model, the temperature, the normalised input text and
+    any generation parameters. Lookups check the in-process LRU tier first, then
+    Redis; Redis hits are copied into the LRU tier. Values must be JSON-serialisable.
+    Coroutines use aget/aset, so a Redis round trip never blocks the event loop.
+    """
+
+    def __init__(self, memory_tier: LRUTier, redis_tier: Optional[RedisTier] = None, enabled: bool = True):
+        self.memory_tier = memory_tier
+        self.redis_tier = redis_tier
+        self.enabled = enabled
+        self.memory_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.sets = 0
+
+    @staticmethod
+    def make_key(
+        module: str,
+        template_version: str,
+        model_name: str,
+        temperature: float,
+        text: str,
+        **params
+    ) -> str:
+        payload = json.dumps(
+            {
+                "module": module,
+                "template_version": template_version,
+                "model_name": model_name,
+                "temperature": temperature,
+                "text": normalize_text(text),
+                "params": params,
+            },
+            sort_keys=True,
+        )
+        return f"{KEY_PREFIX}{module}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+    def get(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+
+        value = self.memory_tier.get(key)
+        if value is not None:
+            self.memory_hits += 1
+            return value
+
+        if self.redis_tier is not None:
+            value = self.redis_tier.get(key)
+            if value is not None:
+                self.redis_hits += 1
+                self.memory_tier.set(key, value)
+                return value
+
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any):
+        if not self.enabled:
+            return
+        self.sets += 1
+        self.memory_tier.set(key, value)
+        if self.redis_tier is not None:
+            self.redis_tier.set(key, value)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """Async variant of get; the in-process tier is still read directly."""
+        if not self.enabled:
+            return None
+
+        value = self.memory_tier.get(key)
+        if value is not None:
+            self.memory_hits += 1
+            return value
+
+        if self.redis_tier is not None:
+            value = await self.redis_tier.aget(key)
+            if value is not None:
+                self.redis_hits += 1
+                self.memory_tier.set(key, value)
+                return value
+
+        self.misses += 1
+        return None
+
+    async def aset(self, key: str, value: Any):
+        if not self.enabled:
+            return
+        self.sets += 1
+        self.memory_tier.set(key, value)
+        if self.redis_tier is not None:
+            await self.redis_tier.aset(key, value)
+
+    def clear(self):
+        """Empties the in-process tier and resets the counters. Redis entries expire on their own."""
+        self.memory_tier.clear()
+        self.memory_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.memory_tier.evictions = 0
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.redis_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "memory_hits": self.memory_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.memory_hits + self.redis_hits) / lookups if lookups else 0.0,
+            "sets": self.sets,
+            "memory_entries": len(self.memory_tier),
+            "memory_evictions": self.memory_tier.evictions,
+            "redis_enabled": self.redis_tier is not None,
+            "redis_errors": self.redis_tier.errors if self.redis_tier is not None else 0,
+        }
+
+
+def _build_generation_cache() -> GenerationCache:
+    redis_tier = None
+    if REDIS_URL:
+        try:
+            redis_tier = RedisTier(
+                create_redis_client(REDIS_URL), GENERATION_CACHE_TTL_SECONDS, create_async_redis_client(REDIS_URL)
+            )
+        except ImportError:
+            logger.warning("REDIS_URL is set but the redis package is not installed. Using the in-process generation cache only.")
+    return GenerationCache(
+        LRUTier(GENERATION_CACHE_MAX_ENTRIES, GENERATION_CACHE_TTL_SECONDS),
+        redis_tier,
+        enabled=GENERATION_CACHE_ENABLED,
+    )
+
+
+generation_cache = _build_generation_cache() # Instantiate once per worker
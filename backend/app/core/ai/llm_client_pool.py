@@ -0,0 +1,125 @@
+# backend/app/core/ai/llm_client_pool.py
+
+import logging
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+from backend.app.core.ai.fake_llm import FakeStudyChatModel
+from backend.app.core.ai.llm_governor import llm_governor
+from backend.app.core.ai.llm_resilience import ResilientLLM, llm_resilience
+from backend.app.core.config import (
+    LLM_CALL_TIMEOUT_SECONDS,
+    LLM_KEEPALIVE_EXPIRY_SECONDS,
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_KEEPALIVE_CONNECTIONS,
+    LLM_PROVIDER,
+)
+
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+
+class LLMClientPool:
+    """
+    Hands out shared ChatOpenAI clients keyed by (model, temperature), or
+    FakeStudyChatModel clients when LLM_PROVIDER is "fake".
+
+    Every client is built on the same pair of httpx clients, so all modules and
+    requests in a worker draw from one keep-alive connection pool instead of
+    each ChatOpenAI opening its own connections and TLS sessions. Clients are
+    handed out wrapped by the LLM governor, which rate-limits every call.
+    """
+
+    def __init__(self, max_connections: int, max_keepalive_connections: int, keepalive_expiry: float):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.hits = 0
+        self.misses = 0
+        self._clients: Dict[Tuple[str, float], ResilientLLM] = {}
+        self._http_client: Optional[httpx.Client] = None
+        self._http_async_client: Optional[httpx.AsyncClient] = None
+        self._lock = threading.Lock()
+
+    def get(self, model_name: str, temperature: float) -> ResilientLLM:
+        """
+        Returns the shared client for a model and temperature, creating it on first use.
+        """
+        key = (model_name, temperature)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self.hits += 1
+                return client
+
+            self.misses += 1
+            # Retries happen in the resilience layer, above the governor, so every attempt is admitted
+            client = llm_resilience.wrap(llm_governor.wrap(self._build_chat_model(model_name, temperature)))
+            self._clients[key] = client
+            logger.info(f"Created shared {LLM_PROVIDER} LLM client for model '{model_name}' at temperature {temperature}")
+            return client
+
+    def _build_chat_model(self, model_name: str, temperature: float):
+        if LLM_PROVIDER == "fake":
+            return FakeStudyChatModel()
+        if LLM_PROVIDER != "openai":
+            raise ValueError(f"Unknown LLM_PROVIDER '{LLM_PROVIDER}'; expected 'openai' or 'fake'.")
+        if self._http_client is None:
+            self._http_client = httpx.Client(limits=self.limits)
+            self._http_async_client = httpx.AsyncClient(limits=self.limits)
+        return ChatOpenAI(
+            model_name=model_name,
+            temperature=temperature,
+            timeout=LLM_CALL_TIMEOUT_SECONDS,
+            max_retries=0,
+            http_client=self._http_client,
+            http_async_client=self._http_async_client,
+        )
+
+    async def aclose(self):
+        """Closes the pooled connections and forgets every client."""
+        with self._lock:
+            http_client, http_async_client = self._http_client, self._http_async_client
+            self._clients.clear()
+            self._http_client = None
+            self._http_async_client = None
+        if http_client is not None:
+            http_client.close()
+        if http_async_client is not None:
+            await http_async_client.aclose()
+
+    def reset(self):
+        """Forgets every client and resets the counters. Intended for tests."""
+        with self._lock:
+            self._clients.clear()
+            self._http_client = None
+            self._http_async_client = None
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        return {
+            "provider": LLM_PROVIDER,
+            "clients": [
+                {"model_name": model_name, "temperature": temperature}
+                for model_name, temperature in self._clients
+            ],
+            "hits": self.hits,
+            "misses": self.misses,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "keepalive_expiry": self.limits.keepalive_expiry,
+        }
+
+
+llm_client_pool = LLMClientPool(
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_KEEPALIVE_CONNECTIONS,
+    LLM_KEEPALIVE_EXPIRY_SECONDS,
+) # Instantiate once per worker
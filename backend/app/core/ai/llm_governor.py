@@ -0,0 +1,262 @@
+# backend/app/core/ai/llm_governor.py
+
+import asyncio
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Iterator, Optional
+
+from langchain_core.runnables import Runnable
+
+from backend.app.core.ai.text_chunking import estimate_tokens
+from backend.app.core.config import (
+    LLM_COMPLETION_TOKENS_ESTIMATE,
+    LLM_MAX_INFLIGHT_PER_USER,
+    LLM_MAX_QUEUE_WAIT_SECONDS,
+    LLM_REQUESTS_PER_MINUTE,
+    LLM_TOKENS_PER_MINUTE,
+)
+
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+# The user on whose behalf LLM calls are made; set per request by bind_llm_request
+llm_user_id: ContextVar[Optional[str]] = ContextVar("llm_user_id", default=None)
+
+
+class LLMRequestSlot:
+    """
+    A top-level request's place in its user's in-flight cap. Every LLM call the request
+    fans out (map-reduce chunks, the generate-all modules, hedged duplicates) shares it,
+    so the request holds one slot while any of its calls is waiting or in flight.
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+
+# The slot of the request being served; tasks spawned by the request inherit it
+llm_request_slot: ContextVar[Optional[LLMRequestSlot]] = ContextVar("llm_request_slot", default=None)
+
+
+def bind_llm_request(user_id: str):
+    """Attributes the LLM calls made from here on to user_id, counted as one request against the per-user cap."""
+    llm_user_id.set(user_id)
+    llm_request_slot.set(LLMRequestSlot())
+
+
+class LLMRateLimitExceeded(Exception):
+    """Raised when an LLM call cannot be admitted within the maximum queue wait."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"LLM capacity exceeded ({reason}). Retry after {math.ceil(retry_after)} seconds.")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at capacity_per_minute / 60 per second.
+    Callers reserve capacity up front and then wait out any deficit, so
+    concurrent callers are served in the order they reserved.
+    """
+
+    def __init__(self, capacity_per_minute: int):
+        self.capacity = capacity_per_minute
+        self.rate = capacity_per_minute / 60.0
+        self.level = float(capacity_per_minute)
+        self.updated = time.monotonic()
+
+    def wait_for(self, amount: float, now: float) -> float:
+        """Returns how long a reservation of amount would have to wait, without making it."""
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        # A request larger than the whole budget waits for a full bucket rather than forever
+        deficit = min(amount, self.capacity) - self.level
+        return max(0.0, deficit / self.rate)
+
+    def reserve(self, amount: float):
+        self.level -= min(amount, self.capacity)
+
+
+class LLMGovernor:
+    """
+    Central admission control for LLM calls.
+
+    Enforces a requests-per-minute and an estimated tokens-per-minute budget
+    shared by every module in the worker, and caps the requests a single user may
+    have making LLM calls at once so one user cannot take the whole budget. Calls
+    made outside a bound request each count as a request of their own. A call
+    that would wait longer than max_wait_seconds is rejected with
+    LLMRateLimitExceeded, which the API turns into a 429 with Retry-After,
+    instead of queueing until the request times out. A limit of 0 disables it.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_inflight_per_user: int,
+        max_wait_seconds: float,
+        completion_tokens_estimate: int = LLM_COMPLETION_TOKENS_ESTIMATE
+    ):
+        self.max_inflight_per_user = max_inflight_per_user
+        self.max_wait_seconds = max_wait_seconds
+        self.completion_tokens_estimate = completion_tokens_estimate
+        self._request_bucket = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self._token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self._inflight_by_user = {}
+        self._lock = threading.Lock()
+        self.admitted = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+
+    def estimate_call_tokens(self, prompt: Any) -> int:
+        """Estimates the tokens a call consumes: its prompt plus an allowance for the completion."""
+        text = prompt.to_string() if hasattr(prompt, "to_string") else str(prompt)
+        return estimate_tokens(text) + self.completion_tokens_estimate
+
+    def _admit(self, tokens: int, user_id: Optional[str], slot: Optional[LLMRequestSlot]) -> float:
+        """Reserves budget for one call and returns how long it must wait before starting."""
+        with self._lock:
+            # Only the first concurrent call of a request takes a per-user slot
+            takes_user_slot = user_id is not None and (slot is None or slot.calls == 0)
+            if takes_user_slot and self.max_inflight_per_user > 0:
+                if self._inflight_by_user.get(user_id, 0) >= self.max_inflight_per_user:
+                    self.rejected += 1
+                    raise LLMRateLimitExceeded("too many concurrent requests for this user", 1.0)
+
+            now = time.monotonic()
+            wait = 0.0
+            if self._request_bucket is not None:
+                wait = max(wait, self._request_bucket.wait_for(1, now))
+            if self._token_bucket is not None:
+                wait = max(wait, self._token_bucket.wait_for(tokens, now))
+            if wait > self.max_wait_seconds:
+                self.rejected += 1
+                raise LLMRateLimitExceeded("provider rate limit budget exhausted", wait)
+
+            if self._request_bucket is not None:
+                self._request_bucket.reserve(1)
+            if self._token_bucket is not None:
+                self._token_bucket.reserve(tokens)
+            if slot is not None:
+                slot.calls += 1
+            if takes_user_slot:
+                self._inflight_by_user[user_id] = self._inflight_by_user.get(user_id, 0) + 1
+            self.admitted += 1
+            self.total_wait_seconds += wait
+            return wait
+
+    def _release(self, user_id: Optional[str], slot: Optional[LLMRequestSlot]):
+        if user_id is None:
+            return
+        with self._lock:
+            if slot is not None:
+                slot.calls -= 1
+                if slot.calls > 0:
+                    return
+            remaining = self._inflight_by_user.get(user_id, 0) - 1
+            if remaining > 0:
+                self._inflight_by_user[user_id] = remaining
+            else:
+                self._inflight_by_user.pop(user_id, None)
+
+    @contextmanager
+    def admit(self, prompt: Any) -> Iterator[None]:
+        """Blocks until a call may start; for the sync invoke/stream paths."""
+        user_id, slot = llm_user_id.get(), llm_request_slot.get()
+        wait = self._admit(self.estimate_call_tokens(prompt), user_id, slot)
+        try:
+            if wait > 0:
+                time.sleep(wait)
+            yield
+        finally:
+            self._release(user_id, slot)
+
+    @asynccontextmanager
+    async def aadmit(self, prompt: Any) -> AsyncIterator[None]:
+        """Awaits until a call may start, without blocking the event loop."""
+        user_id, slot = llm_user_id.get(), llm_request_slot.get()
+        wait = self._admit(self.estimate_call_tokens(prompt), user_id, slot)
+        try:
+            if wait > 0:
+                await asyncio.sleep(wait)
+            yield
+        finally:
+            self._release(user_id, slot)
+
+    def wrap(self, llm: Runnable) -> "GovernedLLM":
+        return GovernedLLM(llm, self)
+
+    def reset(self):
+        """Refills the budgets and resets the counters. Intended for tests."""
+        with self._lock:
+            for bucket in (self._request_bucket, self._token_bucket):
+                if bucket is not None:
+                    bucket.level = float(bucket.capacity)
+                    bucket.updated = time.monotonic()
+            self._inflight_by_user.clear()
+            self.admitted = 0
+            self.rejected = 0
+            self.total_wait_seconds = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "requests_per_minute": self._request_bucket.capacity if self._request_bucket else 0,
+            "tokens_per_minute": self._token_bucket.capacity if self._token_bucket else 0,
+            "max_inflight_per_user": self.max_inflight_per_user,
+            "max_wait_seconds": self.max_wait_seconds,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "total_wait_seconds": self.total_wait_seconds,
+            "users_in_flight": len(self._inflight_by_user),
+        }
+
+
+class GovernedLLM(Runnable):
+    """
+    Wraps a chat model so that every invoke, ainvoke, stream and astream call
+    (and the batch variants built on them) is admitted by the governor first.
+    Any other attribute is read from the wrapped model.
+    """
+
+    def __init__(self, llm: Runnable, governor: LLMGovernor):
+        self.llm = llm
+        self.governor = governor
+
+    def __getattr__(self, name: str):
+        return getattr(self.llm, name)
+
+    def with_structured_output(self, schema: Any, **kwargs) -> "GovernedLLM":
+        # The structured runnable calls the model directly, so it needs its own governed wrapper
+        return GovernedLLM(self.llm.with_structured_output(schema, **kwargs), self.governor)
+
+    def invoke(self, input: Any, config=None, **kwargs) -> Any:
+        with self.governor.admit(input):
+            return self.llm.invoke(input, config, **kwargs)
+
+    async def ainvoke(self, input: Any, config=None, **kwargs) -> Any:
+        async with self.governor.aadmit(input):
+            return await self.llm.ainvoke(input, config, **kwargs)
+
+    def stream(self, input: Any, config=None, **kwargs) -> Iterator[Any]:
+        with self.governor.admit(input):
+            yield from self.llm.stream(input, config, **kwargs)
+
+    async def astream(self, input: Any, config=None, **kwargs) -> AsyncIterator[Any]:
+        async with self.governor.aadmit(input):
+            async for chunk in self.llm.astream(input, config, **kwargs):
+                yield chunk
+
+
+llm_governor = LLMGovernor(
+    LLM_REQUESTS_PER_MINUTE,
+    LLM_TOKENS_PER_MINUTE,
+    LLM_MAX_INFLIGHT_PER_USER,
+    LLM_MAX_QUEUE_WAIT_SECONDS,
+) # Instantiate once per worker
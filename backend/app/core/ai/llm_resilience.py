@@ -0,0 +1,415 @@
+# backend/app/core/ai/llm_resilience.py
+
+import asyncio
+import logging
+import math
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, Optional
+
+import httpx
+import openai
+from langchain_core.runnables import Runnable
+
+from backend.app.core.config import (
+    LLM_CALL_TIMEOUT_SECONDS,
+    LLM_CIRCUIT_FAILURE_THRESHOLD,
+    LLM_CIRCUIT_RESET_SECONDS,
+    LLM_HEDGE_MIN_SAMPLES,
+    LLM_HEDGE_PERCENTILE,
+    LLM_HEDGE_REQUESTS,
+    LLM_MAX_RETRIES,
+    LLM_RETRY_BACKOFF_MAX_SECONDS,
+    LLM_RETRY_BACKOFF_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+# Errors that mean the provider is slow, unreachable or overloaded, so another attempt may succeed.
+# Anything else (bad requests, authentication, our own rate limiter) is raised at once.
+RETRYABLE_ERRORS = (
+    asyncio.TimeoutError,
+    TimeoutError,
+    httpx.TransportError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+class LLMUnavailableError(Exception):
+    """Raised when the LLM provider is degraded: the circuit is open or every attempt failed."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"LLM provider unavailable ({reason}). Retry after {math.ceil(retry_after)} seconds.")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failed attempts and then rejects calls
+    for reset_seconds. After that the circuit is half-open: a single trial attempt decides
+    whether it closes again or re-opens for another reset_seconds, and every other call
+    is rejected while it is in flight. A trial that never reports back (cancelled, or
+    failed with an error that says nothing about the provider) gives up its slot after
+    probe_timeout seconds.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float, probe_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.probe_timeout = probe_timeout
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe_started_at: Optional[float] = None
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at < self.reset_seconds:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def retry_after(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_seconds - (time.monotonic() - self.opened_at))
+
+    def allow(self) -> bool:
+        """Whether an attempt may start now. While half-open, the first caller becomes the trial attempt."""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.OPEN:
+            return False
+        now = time.monotonic()
+        if self.probe_started_at is not None and now - self.probe_started_at < self.probe_timeout:
+            return False
+        self.probe_started_at = now
+        return True
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probe_started_at = None
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self.probe_started_at = None
+        if self.failure_threshold <= 0:
+            return
+        # A failed half-open attempt re-opens the circuit straight away
+        if self.opened_at is not None or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+                logger.warning(f"LLM circuit opened after {self.consecutive_failures} consecutive failures")
+            self.opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """Keeps the latencies of the most recent successful calls to derive the hedging threshold."""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+
+    def add(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, percent: float, min_samples: int) -> Optional[float]:
+        if len(self._samples) < max(1, min_samples):
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(percent / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+
+class LLMResilience:
+    """
+    Retry, hedging and circuit-breaker policy for LLM calls.
+
+    Every attempt gets a deadline of timeout seconds. Attempts that fail with a
+    retryable error are retried up to max_retries times with exponential backoff
+    and full jitter. With hedging enabled, an async call that has not answered
+    within the hedge_percentile latency of recent calls gets a second, identical
+    request and the first answer wins. Consecutive failures open the circuit, after
+    which calls fail fast with LLMUnavailableError so callers can fall back to
+    cached or heuristic output instead of waiting on a degraded provider.
+    """
+
+    def __init__(
+        self,
+        timeout: float,
+        max_retries: int,
+        backoff_seconds: float,
+        backoff_max_seconds: float,
+        hedge: bool,
+        hedge_percentile: float,
+        hedge_min_samples: int,
+        failure_threshold: int,
+        reset_seconds: float
+    ):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = CircuitBreaker(failure_threshold, reset_seconds, probe_timeout=timeout)
+        self.latencies = LatencyTracker()
+        self._lock = threading.Lock()
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self.calls = 0
+        self.succeeded = 0
+        self.retried = 0
+        self.timed_out = 0
+        self.failed = 0
+        self.short_circuited = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.fallbacks = 0
+
+    def wrap(self, llm: Runnable) -> "ResilientLLM":
+        return ResilientLLM(llm, self)
+
+    def hedge_delay(self) -> Optional[float]:
+        """How long an async call runs before it is hedged, or None while hedging is off or unprimed."""
+        if not self.hedge:
+            return None
+        with self._lock:
+            return self.latencies.percentile(self.hedge_percentile, self.hedge_min_samples)
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry number attempt + 1."""
+        return random.uniform(0, min(self.backoff_max_seconds, self.backoff_seconds * 2 ** attempt))
+
+    def before_attempt(self):
+        """Fails fast while the circuit is open, or half-open with its trial attempt still in flight."""
+        with self._lock:
+            if not self.breaker.allow():
+                self.short_circuited += 1
+                if self.breaker.state == CircuitBreaker.OPEN:
+                    raise LLMUnavailableError("circuit open", self.breaker.retry_after())
+                raise LLMUnavailableError("circuit half-open, trial call in flight", self.timeout)
+
+    def after_success(self, started: float):
+        with self._lock:
+            self.latencies.add(time.monotonic() - started)
+            self.breaker.record_success()
+            self.succeeded += 1
+
+    def after_failure(self, attempt: int, error: Exception) -> float:
+        """
+        Records a failed attempt and returns how long to back off before the next one.
+        Re-raises error if it is not retryable, and raises LLMUnavailableError once the
+        retries are spent or the failure opened the circuit.
+        """
+        if not isinstance(error, RETRYABLE_ERRORS):
+            raise error
+        with self._lock:
+            if isinstance(error, (asyncio.TimeoutError, TimeoutError, httpx.TimeoutException, openai.APITimeoutError)):
+                self.timed_out += 1
+            self.breaker.record_failure()
+            if attempt >= self.max_retries or self.breaker.state == CircuitBreaker.OPEN:
+                self.failed += 1
+                retry_after = self.breaker.retry_after() or self.backoff_max_seconds
+                raise LLMUnavailableError(f"{type(error).__name__} after {attempt + 1} attempts", retry_after) from error
+            self.retried += 1
+        logger.info(f"Retrying LLM call after {type(error).__name__} (attempt {attempt + 1} of {self.max_retries + 1})")
+        return self.backoff(attempt)
+
+    def record_call(self):
+        with self._lock:
+            self.calls += 1
+
+    def record_fallback(self):
+        """Counts a result that was served by a fallback because the provider was unavailable."""
+        with self._lock:
+            self.fallbacks += 1
+
+    def call(self, attempt: Callable[[], Any]) -> Any:
+        """
+        Runs a sync call under the policy. The deadline of each attempt is enforced by
+        the HTTP client's timeout, and there is no hedging on the sync path.
+        """
+        self.record_call()
+        attempt_number = 0
+        while True:
+            self.before_attempt()
+            started = time.monotonic()
+            try:
+                result = attempt()
+            except Exception as e:
+                time.sleep(self.after_failure(attempt_number, e))
+                attempt_number += 1
+                continue
+            self.after_success(started)
+            return result
+
+    async def acall(self, attempt: Callable[[], Awaitable[Any]]) -> Any:
+        """Runs an async call under the policy, hedging slow attempts if enabled."""
+        self.record_call()
+        attempt_number = 0
+        while True:
+            self.before_attempt()
+            started = time.monotonic()
+            try:
+                result = await asyncio.wait_for(self._ahedged(attempt), self.timeout)
+            except Exception as e:
+                await asyncio.sleep(self.after_failure(attempt_number, e))
+                attempt_number += 1
+                continue
+            self.after_success(started)
+            return result
+
+    async def _ahedged(self, attempt: Callable[[], Awaitable[Any]]) -> Any:
+        """Starts one request, and a second one if the first is slower than the hedge delay."""
+        delay = self.hedge_delay()
+        tasks = [asyncio.ensure_future(attempt())]
+        try:
+            if delay is None:
+                return await tasks[0]
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                with self._lock:
+                    self.hedged += 1
+                tasks.append(asyncio.ensure_future(attempt()))
+
+            error = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not tasks[0]:
+                            with self._lock:
+                                self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def reset(self):
+        """Closes the circuit, forgets the latencies and resets the counters. Intended for tests."""
+        with self._lock:
+            self.breaker.record_success()
+            self.breaker.times_opened = 0
+            self.latencies = LatencyTracker()
+            self._reset_counters()
+
+    def stats(self) -> dict:
+        return {
+            "timeout_seconds": self.timeout,
+            "max_retries": self.max_retries,
+            "hedging": self.hedge,
+            "hedge_delay_seconds": self.hedge_delay(),
+            "circuit_state": self.breaker.state,
+            "circuit_opened": self.breaker.times_opened,
+            "calls": self.calls,
+            "succeeded": self.succeeded,
+            "retried": self.retried,
+            "timed_out": self.timed_out,
+            "failed": self.failed,
+            "short_circuited": self.short_circuited,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "fallbacks": self.fallbacks,
+        }
+
+
+class ResilientLLM(Runnable):
+    """
+    Wraps a (governed) chat model so that invoke and ainvoke run under the
+    resilience policy. Streams are retried only until their first chunk arrives,
+    since a partially delivered answer cannot be replayed.
+    Any other attribute is read from the wrapped model.
+    """
+
+    def __init__(self, llm: Runnable, resilience: LLMResilience):
+        self.llm = llm
+        self.resilience = resilience
+
+    def __getattr__(self, name: str):
+        return getattr(self.llm, name)
+
+    def with_structured_output(self, schema: Any, **kwargs) -> "ResilientLLM":
+        return ResilientLLM(self.llm.with_structured_output(schema, **kwargs), self.resilience)
+
+    def invoke(self, input: Any, config=None, **kwargs) -> Any:
+        return self.resilience.call(lambda: self.llm.invoke(input, config, **kwargs))
+
+    async def ainvoke(self, input: Any, config=None, **kwargs) -> Any:
+        return await self.resilience.acall(lambda: self.llm.ainvoke(input, config, **kwargs))
+
+    def stream(self, input: Any, config=None, **kwargs) -> Iterator[Any]:
+        self.resilience.record_call()
+        attempt = 0
+        while True:
+            self.resilience.before_attempt()
+            started = time.monotonic()
+            chunks = iter(self.llm.stream(input, config, **kwargs))
+            try:
+                first = next(chunks)
+            except StopIteration:
+                self.resilience.after_success(started)
+                return
+            except Exception as e:
+                time.sleep(self.resilience.after_failure(attempt, e))
+                attempt += 1
+                continue
+            break
+        self.resilience.after_success(started)
+        yield first
+        yield from chunks
+
+    async def astream(self, input: Any, config=None, **kwargs) -> AsyncIterator[Any]:
+        self.resilience.record_call()
+        attempt = 0
+        while True:
+            self.resilience.before_attempt()
+            started = time.monotonic()
+            chunks = self.llm.astream(input, config, **kwargs).__aiter__()
+            try:
+                # The deadline covers the wait for the first chunk
+                first = await asyncio.wait_for(chunks.__anext__(), self.resilience.timeout)
+            except StopAsyncIteration:
+                self.resilience.after_success(started)
+                return
+            except Exception as e:
+                await asyncio.sleep(self.resilience.after_failure(attempt, e))
+                attempt += 1
+                continue
+            break
+        self.resilience.after_success(started)
+        yield first
+        async for chunk in chunks:
+            yield chunk
+
+
+llm_resilience = LLMResilience(
+    LLM_CALL_TIMEOUT_SECONDS,
+    LLM_MAX_RETRIES,
+    LLM_RETRY_BACKOFF_SECONDS,
+    LLM_RETRY_BACKOFF_MAX_SECONDS,
+    LLM_HEDGE_REQUESTS,
+    LLM_HEDGE_PERCENTILE,
+    LLM_HEDGE_MIN_SAMPLES,
+    LLM_CIRCUIT_FAILURE_THRESHOLD,
+    LLM_CIRCUIT_RESET_SECONDS,
+) # Instantiate once per worker
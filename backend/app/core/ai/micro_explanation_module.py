@@ -1,6 +1,6 @@
 # backend/app/core/ai/micro_explanation_module.py
 
-from langchain_openai import ChatOpenAI
+from backend.app.core.ai.llm_client_pool import llm_client_pool
 from langchain_core.prompts import ChatPromptTemplate, SystemMessagePromptTemplate, HumanMessagePromptTemplate
 from langchain_core.messages import SystemMessage, AIMessage
 
@@ -18,7 +18,7 @@ class MicroExplanationModule:
             model_name: The name of the OpenAI model to use.
             temperature: The sampling temperature for the LLM (lower for more factual/less creative).
         """
-        self.llm = ChatOpenAI(model_name=model_name, temperature=temperature)
+        self.llm = llm_client_pool.get(model_name, temperature) # Shared with every module using the same model and temperature
         self.prompt = ChatPromptTemplate.from_messages(
             [
                 SystemMessage(
@@ -68,6 +68,25 @@ class MicroExplanationModule:
         }).content
         return response_content
 
+    async def agenerate_micro_explanation(self, user_input: str, inferred_context: dict) -> str:
+        """
+        Async counterpart of generate_micro_explanation.
+        """
+        key_term = inferred_context.get("key_term")
+        topic = inferred_context.get("topic")
+
+        if not key_term or not topic:
+            # Fallback if context is missing or incomplete
+            return "I can provide a micro-explanation if you specify the term and topic more clearly."
+
+        chain = self.prompt | self.llm
+        response = await chain.ainvoke({
+            "user_input": user_input,
+            "key_term": key_term,
+            "topic": topic
+        })
+        return response.content
+
 # Example of how this might be used (requires OpenAI API key to be set up)
 if __name__ == '__main__':
     # Ensure OPENAI_API_KEY environment variable is set
@@ -0,0 +1,150 @@
+# backend/app/core/ai/output_parsing.py
+#
+# Fallback parsers for flashcard and quiz generations. Used when the model answers
+# in free text instead of through the structured-output schema, and for outputs
+# that are already JSON (lists of dicts, JSON strings, fenced JSON blocks).
+
+import json
+import re
+from typing import Any, List, Optional
+
+# Optional list numbering or bullet, e.g. "1.", "2)", "-", "*"
+_ITEM_PREFIX = r"^\s*(?:\d+\s*[.)]|[-*])?\s*(?:\*\*)?"
+_QUESTION_LINE = re.compile(_ITEM_PREFIX + r"question\s*(?:\d+\s*)?:(?:\*\*)?\s*(.*)$", re.IGNORECASE)
+_ANSWER_LINE = re.compile(_ITEM_PREFIX + r"answer\s*:(?:\*\*)?\s*(.*)$", re.IGNORECASE)
+_OPTIONS_LINE = re.compile(r"^\s*(?:\*\*)?options\s*:(?:\*\*)?\s*$", re.IGNORECASE)
+_OPTION_LINE = re.compile(r"^\s*(?:[-*]\s*)?\(?([A-Ha-h])[.)]\s+(.*)$")
+_CORRECT_ANSWER_LINE = re.compile(_ITEM_PREFIX + r"correct\s+answer\s*:(?:\*\*)?\s*(.*)$", re.IGNORECASE)
+# A bare option letter, optionally followed by the option's text: "C", "C.", "C)", "(C)", "C: Paris"
+_OPTION_LETTER = re.compile(r"^\(?([A-Ha-h])(?:[.):]\)?(?:\s.*)?)?$")
+_CODE_FENCE = re.compile(r"^\s*```(?:json)?\s*(.*?)\s*```\s*$", re.DOTALL)
+
+
+def load_json_items(output: Any, list_key: str) -> Optional[List[dict]]:
+    """
+    Extracts a list of item dicts from output that is already structured: a list of
+    dicts or models, a model or dict holding the list under list_key, or a JSON string
+    (optionally inside a ```json fence) of either shape.
+    Returns None when the output is free text that needs the line parser.
+    """
+    if hasattr(output, "dict") and not isinstance(output, dict):
+        output = output.dict()
+
+    if isinstance(output, str):
+        fenced = _CODE_FENCE.match(output)
+        text = fenced.group(1) if fenced else output.strip()
+        if not text or text[0] not in "[{":
+            return None
+        try:
+            output = json.loads(text)
+        except ValueError:
+            return None
+
+    if isinstance(output, dict):
+        output = output.get(list_key)
+    if not isinstance(output, list):
+        return None
+    return [item.dict() if hasattr(item, "dict") else item for item in output if isinstance(item, dict) or hasattr(item, "dict")]
+
+
+def parse_flashcard_text(text: str) -> List[dict]:
+    """
+    Parses "Question: ... / Answer: ..." pairs in a single pass over the lines.
+    Lines that follow a question or answer without a new label continue it, so
+    multi-line answers are kept whole. Pairs missing either side are dropped.
+    """
+    cards = []
+    question = None
+    answer = None
+    current = None # The field that unlabelled lines continue
+
+    for line in text.splitlines():
+        match = _QUESTION_LINE.match(line)
+        if match:
+            if question and answer:
+                cards.append({"question": " ".join(question), "answer": " ".join(answer)})
+            question = [match.group(1).strip()] if match.group(1).strip() else []
+            answer = None
+            current = question
+            continue
+
+        match = _ANSWER_LINE.match(line)
+        if match and question is not None:
+            answer = [match.group(1).strip()] if match.group(1).strip() else []
+            current = answer
+            continue
+
+        stripped = line.strip()
+        if stripped and current is not None:
+            current.append(stripped)
+
+    if question and answer:
+        cards.append({"question": " ".join(question), "answer": " ".join(answer)})
+    return cards
+
+
+def resolve_correct_answer(correct_answer: str, options: List[str]) -> str:
+    """
+    Maps an answer given as an option letter (e.g. "C" or "C. Paris") to the option's text.
+    An answer that already is one of the options is returned unchanged, as is any other
+    text, even if it starts with a letter ("A cell wall").
+    """
+    if correct_answer in options:
+        return correct_answer
+    match = _OPTION_LETTER.match(correct_answer)
+    if match:
+        index = ord(match.group(1).upper()) - ord("A")
+        if index < len(options):
+            return options[index]
+    return correct_answer
+
+
+def parse_quiz_text(text: str) -> List[dict]:
+    """
+    Parses multiple-choice questions ("Question:", lettered options, "Correct Answer:")
+    in a single pass over the lines. Questions without options or a correct answer
+    are dropped.
+    """
+    questions = []
+    question = None
+    options = []
+    correct_answer = None
+
+    def flush():
+        if question and options and correct_answer:
+            questions.append({
+                "question": question,
+                "options": options,
+                "correct_answer": resolve_correct_answer(correct_answer, options),
+            })
+
+    for line in text.splitlines():
+        if not line.strip() or _OPTIONS_LINE.match(line):
+            continue
+
+        match = _QUESTION_LINE.match(line)
+        if match:
+            flush()
+            question = match.group(1).strip()
+            options = []
+            correct_answer = None
+            continue
+        if question is None:
+            continue
+
+        match = _CORRECT_ANSWER_LINE.match(line)
+        if match:
+            correct_answer = match.group(1).strip()
+            continue
+
+        match = _OPTION_LINE.match(line)
+        if match and correct_answer is None:
+            options.append(match.group(2).strip())
+            continue
+
+        if not options and correct_answer is None:
+            # The question text wraps onto the next line
+            question = f"{question} {line.strip()}".strip()
+
+    flush()
+    return questions
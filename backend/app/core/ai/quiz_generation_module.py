@@ -2,8 +2,11 @@ import os
 from typing import List
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_openai import ChatOpenAI
-from pydantic import BaseModel, Field
+from backend.app.core.ai.llm_client_pool import llm_client_pool
+from pydantic import BaseModel, Field, ValidationError
+from backend.app.core.ai.generation_cache import generation_cache
+from backend.app.core.ai.output_parsing import load_json_items, parse_quiz_text, resolve_correct_answer
+from backend.app.core.config import LLM_STRUCTURED_OUTPUT
 
 class QuizQuestion(BaseModel):
     """Represents a single quiz question with multiple-choice options and a correct answer."""
@@ -11,17 +14,27 @@ class QuizQuestion(BaseModel):
     options: List[str] = Field(..., description="A list of possible answers for the multiple-choice question.")
     correct_answer: str = Field(..., description="The correct answer among the options.")
 
+class QuizQuestionList(BaseModel):
+    """The quiz questions generated from a text."""
+    questions: List[QuizQuestion] = Field(..., description="The multiple-choice questions.")
+
 class QuizGenerationModule:
-    def __init__(self, model_name: str = "gpt-4o", temperature: float = 0.5):
+    # Bump whenever the prompt template or parser changes so cached quizzes are not reused
+    PROMPT_TEMPLATE_VERSION = "3"
+
+    def __init__(self, model_name: str = "gpt-4o", temperature: float = 0.5, structured_output: bool = LLM_STRUCTURED_OUTPUT):
         """
         Initializes the QuizGenerationModule with an LLM and prompt template.
         Args:
             model_name: The name of the OpenAI model to use.
             temperature: The sampling temperature for the LLM (lower for more factual/less creative).
+            structured_output: Whether to request the questions through a JSON schema (function calling)
+                               instead of parsing them out of free text.
         """
         self.llm = None
         self.model_name = model_name
         self.temperature = temperature
+        self.structured_output = structured_output
         self.output_parser = StrOutputParser()
 
         self.quiz_prompt_template = ChatPromptTemplate.from_messages(
@@ -63,70 +76,77 @@ class QuizGenerationModule:
         if "OPENAI_API_KEY" not in os.environ:
             raise ValueError("OPENAI_API_KEY environment variable is not set.")
 
+        cache_key = self._cache_key(text)
+        cached_questions = generation_cache.get(cache_key)
+        if cached_questions is not None:
+            return [QuizQuestion(**qq) for qq in cached_questions]
+
+        llm_output = self._build_chain().invoke({"text": text})
+        return self._parse_and_cache(cache_key, llm_output)
+
+    async def agenerate_quiz(self, text: str) -> List[QuizQuestion]:
+        """
+        Same as generate_quiz, but awaits chain.ainvoke instead of blocking on chain.invoke.
+        """
+        if "OPENAI_API_KEY" not in os.environ:
+            raise ValueError("OPENAI_API_KEY environment variable is not set.")
+
+        cache_key = self._cache_key(text)
+        cached_questions = await generation_cache.aget(cache_key)
+        if cached_questions is not None:
+            return [QuizQuestion(**qq) for qq in cached_questions]
+
+        llm_output = await self._build_chain().ainvoke({"text": text})
+        return await self._aparse_and_cache(cache_key, llm_output)
+
+    def _cache_key(self, text: str) -> str:
+        return generation_cache.make_key(
+            "quiz_generation", self.PROMPT_TEMPLATE_VERSION, self.model_name, self.temperature, text
+        )
+
+    def _build_chain(self):
         if self.llm is None:
-            self.llm = ChatOpenAI(model_name=self.model_name, temperature=self.temperature)
+            self.llm = llm_client_pool.get(self.model_name, self.temperature)
+        if self.structured_output:
+            return self.quiz_prompt_template | self.llm.with_structured_output(QuizQuestionList)
+        return self.quiz_prompt_template | self.llm | self.output_parser
 
-        chain = self.quiz_prompt_template | self.llm | self.output_parser
-        llm_output = chain.invoke({"text": text})
-        
-        return self._parse_llm_output_to_quiz_questions(llm_output)
+    def _parse_and_cache(self, cache_key: str, llm_output) -> List[QuizQuestion]:
+        quiz_questions = self._parse_llm_output_to_quiz_questions(llm_output)
+        # Empty results usually mean malformed output; let the next request retry
+        if quiz_questions:
+            generation_cache.set(cache_key, [qq.dict() for qq in quiz_questions])
+        return quiz_questions
 
-    def _parse_llm_output_to_quiz_questions(self, llm_output: str) -> List[QuizQuestion]:
+    async def _aparse_and_cache(self, cache_key: str, llm_output) -> List[QuizQuestion]:
+        quiz_questions = self._parse_llm_output_to_quiz_questions(llm_output)
+        if quiz_questions:
+            await generation_cache.aset(cache_key, [qq.dict() for qq in quiz_questions])
+        return quiz_questions
+
+    def _parse_llm_output_to_quiz_questions(self, llm_output) -> List[QuizQuestion]:
         """
-        Parses the LLM's raw string output into a list of QuizQuestion objects.
-        Assumes the format: "1. Question: ...\nOptions:\n  A. ...\n  B. ...\n  C. ...\n  D. ...\nCorrect Answer: ..."
+        Converts the LLM's output into QuizQuestion objects. Structured output (a QuizQuestionList,
+        a list of dicts or a JSON string) is used as-is; free text falls back to the single-pass
+        parser for "Question: / Options: / Correct Answer:" blocks. In text output, a correct answer
+        given as an option letter is replaced by the option's text; the structured-output schema
+        asks for the text itself, so its answers are kept as they are. Invalid items are skipped.
         """
+        free_text = isinstance(llm_output, str)
+        items = load_json_items(llm_output, "questions")
+        if items is None:
+            items = parse_quiz_text(llm_output) if isinstance(llm_output, str) else []
+
         quiz_questions = []
-        question_blocks = llm_output.split("Question:")
-        
-        for block in question_blocks:
-            block = block.strip()
-            if not block:
+        for item in items:
+            try:
+                quiz_question = QuizQuestion(**item)
+            except (TypeError, ValidationError):
                 continue
-
-            # Remove numbering like "1. "
-            import re
-            match_num = re.match(r"^\d+[\.\)]?\s*", block)
-            if match_num:
-                block = block[match_num.end():].strip()
-            
-            question_text = ""
-            options = []
-            correct_answer = ""
-
-            # Split the block into lines and parse
-            lines = block.split('\n')
-            
-            i = 0
-            # Parse Question
-            if lines[i].strip().endswith('?'): # Simple heuristic for question line
-                question_text = lines[i].strip()
-                i += 1
-            
-            # Parse Options
-            if i < len(lines) and lines[i].strip() == "Options:":
-                i += 1
-                while i < len(lines) and re.match(r"^[A-D]\.\s", lines[i].strip()):
-                    options.append(lines[i].strip()[3:].strip()) # Remove "A. ", "B. " etc.
-                    i += 1
-            
-            # Parse Correct Answer
-            if i < len(lines) and lines[i].strip().startswith("Correct Answer:"):
-                correct_answer_raw = lines[i].strip()[len("Correct Answer:"):].strip()
-                # Extract just the letter (e.g., "C" from "C. Paris")
-                match_correct_letter = re.match(r"^[A-D]", correct_answer_raw)
-                if match_correct_letter:
-                    correct_answer = match_correct_letter.group(0)
-                    
-                    # Find the full correct answer from the options
-                    for opt_idx, opt_text in enumerate(options):
-                        if chr(65 + opt_idx) == correct_answer: # 'A' is ASCII 65
-                            correct_answer = opt_text # Store the full text of the correct answer
-                            break
-                    
-            if question_text and options and correct_answer:
-                quiz_questions.append(QuizQuestion(question=question_text, options=options, correct_answer=correct_answer))
-        
+            if quiz_question.question.strip() and quiz_question.options and quiz_question.correct_answer:
+                if free_text:
+                    quiz_question.correct_answer = resolve_correct_answer(quiz_question.correct_answer, quiz_question.options)
+                quiz_questions.append(quiz_question)
         return quiz_questions
 
 if __name__ == "__main__":
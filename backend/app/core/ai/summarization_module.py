@@ -1,9 +1,16 @@
 import os
+from typing import AsyncIterator, List
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_openai import ChatOpenAI
+from backend.app.core.ai.llm_client_pool import llm_client_pool
+from backend.app.core.ai.generation_cache import generation_cache
+from backend.app.core.ai.text_chunking import estimate_tokens, group_by_budget
+from backend.app.core.config import SUMMARY_CHUNK_TOKENS, SUMMARY_MAX_CONCURRENCY
 
 class SummarizationModule:
+    # Bump whenever the prompt templates change so cached summaries are not reused
+    PROMPT_TEMPLATE_VERSION = "1"
+
     def __init__(self, model_name: str = "gpt-4o", temperature: float = 0.5):
         """
         Initializes the SummarizationModule with an LLM and prompt templates.
@@ -30,6 +37,29 @@ class SummarizationModule:
             ]
         )
 
+        # Map step of chunked summarization: one section of a longer document
+        self.section_summary_prompt_template = ChatPromptTemplate.from_messages(
+            [
+                ("system", "You are an expert summarizer. Your goal is to condense complex information into clear, concise, and accurate summaries."),
+                ("user", "The following text is one section of a longer document. Summarize it, keeping every key concept, definition and fact:\n\n{text}\n\nSection Summary:")
+            ]
+        )
+
+        # Reduce step of chunked summarization: merge consecutive section summaries
+        self.combine_summary_prompt_template = ChatPromptTemplate.from_messages(
+            [
+                ("system", "You are an expert summarizer. Your goal is to condense complex information into clear, concise, and accurate summaries."),
+                ("user", "The following are summaries of consecutive sections of one document, in order. Combine them into a single coherent summary:\n\n{text}\n\nSummary:")
+            ]
+        )
+
+        self.brief_combine_summary_prompt_template = ChatPromptTemplate.from_messages(
+            [
+                ("system", "You are an expert summarizer. Your goal is to condense complex information into very brief, clear, and accurate summaries, focusing only on the most critical points."),
+                ("user", "The following are summaries of consecutive sections of one document, in order. Combine them into a brief summary:\n\n{text}\n\nBrief Summary:")
+            ]
+        )
+
     def generate_summary(self, text: str, detail_level: str = "normal") -> str:
         """
         Generates a summary of the provided text using an LLM.
@@ -42,16 +72,187 @@ class SummarizationModule:
         if "OPENAI_API_KEY" not in os.environ:
             raise ValueError("OPENAI_API_KEY environment variable is not set.")
 
+        cache_key = self._cache_key(text, detail_level)
+        cached_summary = generation_cache.get(cache_key)
+        if cached_summary is not None:
+            return cached_summary
+
+        summary = self._build_chain(detail_level).invoke({"text": text})
+        generation_cache.set(cache_key, summary)
+        return summary
+
+    async def agenerate_summary(self, text: str, detail_level: str = "normal") -> str:
+        """
+        Async variant of generate_summary. Awaits the LLM with chain.ainvoke so the
+        event loop keeps serving other requests during the round trip.
+        """
+        if "OPENAI_API_KEY" not in os.environ:
+            raise ValueError("OPENAI_API_KEY environment variable is not set.")
+
+        cache_key = self._cache_key(text, detail_level)
+        cached_summary = await generation_cache.aget(cache_key)
+        if cached_summary is not None:
+            return cached_summary
+
+        summary = await self._build_chain(detail_level).ainvoke({"text": text})
+        await generation_cache.aset(cache_key, summary)
+        return summary
+
+    def generate_chunked_summary(
+        self,
+        chunks: List[str],
+        detail_level: str = "normal",
+        max_tokens: int = SUMMARY_CHUNK_TOKENS,
+        max_concurrency: int = SUMMARY_MAX_CONCURRENCY
+    ) -> str:
+        """
+        Summarizes a document that does not fit in one prompt, map-reduce style.
+        Every chunk is summarized on its own (at most max_concurrency LLM calls at a time),
+        then the partial summaries are combined in document order, level by level,
+        until they fit into a single prompt of max_tokens.
+        Args:
+            chunks: The document split into chunks of at most max_tokens, in order.
+            detail_level: The desired detail level for the final summary ('normal' or 'brief').
+            max_tokens: The token budget of each combine prompt.
+            max_concurrency: The maximum number of concurrent LLM calls.
+        Returns:
+            A summary of the whole document.
+        """
+        if "OPENAI_API_KEY" not in os.environ:
+            raise ValueError("OPENAI_API_KEY environment variable is not set.")
+
+        cache_key = self._chunked_cache_key(chunks, detail_level, max_tokens)
+        cached_summary = generation_cache.get(cache_key)
+        if cached_summary is not None:
+            return cached_summary
+
+        config = {"max_concurrency": max_concurrency}
+        # batch returns results in input order, whatever order the calls finish in
+        summaries = self._build_chain("section").batch([{"text": chunk} for chunk in chunks], config=config)
+        while len(summaries) > 1 and estimate_tokens("\n\n".join(summaries)) > max_tokens:
+            groups = group_by_budget(summaries, max_tokens)
+            summaries = self._build_chain("combine").batch([{"text": "\n\n".join(group)} for group in groups], config=config)
+
+        summary = self._build_chain(f"combine_{detail_level}").invoke({"text": "\n\n".join(summaries)})
+        generation_cache.set(cache_key, summary)
+        return summary
+
+    async def agenerate_chunked_summary(
+        self,
+        chunks: List[str],
+        detail_level: str = "normal",
+        max_tokens: int = SUMMARY_CHUNK_TOKENS,
+        max_concurrency: int = SUMMARY_MAX_CONCURRENCY
+    ) -> str:
+        """
+        Async variant of generate_chunked_summary. The chunk summaries of each level
+        are awaited concurrently with chain.abatch, bounded by max_concurrency.
+        """
+        if "OPENAI_API_KEY" not in os.environ:
+            raise ValueError("OPENAI_API_KEY environment variable is not set.")
+
+        cache_key = self._chunked_cache_key(chunks, detail_level, max_tokens)
+        cached_summary = await generation_cache.aget(cache_key)
+        if cached_summary is not None:
+            return cached_summary
+
+        combined = await self._areduce_chunks(chunks, max_tokens, max_concurrency)
+        summary = await self._build_chain(f"combine_{detail_level}").ainvoke({"text": combined})
+        await generation_cache.aset(cache_key, summary)
+        return summary
+
+    async def astream_summary(self, text: str, detail_level: str = "normal") -> AsyncIterator[str]:
+        """
+        Streams a summary as the LLM produces it, built on chain.astream.
+        Yields the text deltas in order; a cached summary is yielded as a single delta.
+        The full summary is cached once the stream completes.
+        """
+        if "OPENAI_API_KEY" not in os.environ:
+            raise ValueError("OPENAI_API_KEY environment variable is not set.")
+
+        cache_key = self._cache_key(text, detail_level)
+        cached_summary = await generation_cache.aget(cache_key)
+        if cached_summary is not None:
+            yield cached_summary
+            return
+
+        parts = []
+        async for delta in self._build_chain(detail_level).astream({"text": text}):
+            parts.append(delta)
+            yield delta
+        await generation_cache.aset(cache_key, "".join(parts))
+
+    async def astream_chunked_summary(
+        self,
+        chunks: List[str],
+        detail_level: str = "normal",
+        max_tokens: int = SUMMARY_CHUNK_TOKENS,
+        max_concurrency: int = SUMMARY_MAX_CONCURRENCY
+    ) -> AsyncIterator[str]:
+        """
+        Streaming variant of agenerate_chunked_summary. The section summaries are
+        generated as usual; only the final combine step is streamed.
+        """
+        if "OPENAI_API_KEY" not in os.environ:
+            raise ValueError("OPENAI_API_KEY environment variable is not set.")
+
+        cache_key = self._chunked_cache_key(chunks, detail_level, max_tokens)
+        cached_summary = await generation_cache.aget(cache_key)
+        if cached_summary is not None:
+            yield cached_summary
+            return
+
+        combined = await self._areduce_chunks(chunks, max_tokens, max_concurrency)
+        parts = []
+        async for delta in self._build_chain(f"combine_{detail_level}").astream({"text": combined}):
+            parts.append(delta)
+            yield delta
+        await generation_cache.aset(cache_key, "".join(parts))
+
+    async def _areduce_chunks(self, chunks: List[str], max_tokens: int, max_concurrency: int) -> str:
+        """
+        Runs the map step and any intermediate combine levels, returning the
+        partial summaries joined into text that fits the final combine prompt.
+        """
+        config = {"max_concurrency": max_concurrency}
+        summaries = await self._build_chain("section").abatch([{"text": chunk} for chunk in chunks], config=config)
+        while len(summaries) > 1 and estimate_tokens("\n\n".join(summaries)) > max_tokens:
+            groups = group_by_budget(summaries, max_tokens)
+            summaries = await self._build_chain("combine").abatch([{"text": "\n\n".join(group)} for group in groups], config=config)
+        return "\n\n".join(summaries)
+
+    def _cache_key(self, text: str, detail_level: str) -> str:
+        return generation_cache.make_key(
+            "summarization", self.PROMPT_TEMPLATE_VERSION, self.model_name, self.temperature, text,
+            detail_level=detail_level
+        )
+
+    def _chunked_cache_key(self, chunks: List[str], detail_level: str, max_tokens: int) -> str:
+        return generation_cache.make_key(
+            "summarization", self.PROMPT_TEMPLATE_VERSION, self.model_name, self.temperature, "\n\n".join(chunks),
+            detail_level=detail_level, chunks=len(chunks), max_tokens=max_tokens
+        )
+
+    def _build_chain(self, detail_level: str):
+        """
+        Builds the chain for a prompt: 'normal' or 'brief' for single-prompt summaries,
+        'section', 'combine', 'combine_normal' or 'combine_brief' for the chunked ones.
+        """
         if self.llm is None:
-            self.llm = ChatOpenAI(model_name=self.model_name, temperature=self.temperature)
+            self.llm = llm_client_pool.get(self.model_name, self.temperature)
 
         if detail_level == "brief":
             prompt = self.brief_summary_prompt_template
+        elif detail_level == "section":
+            prompt = self.section_summary_prompt_template
+        elif detail_level == "combine_brief":
+            prompt = self.brief_combine_summary_prompt_template
+        elif detail_level.startswith("combine"):
+            prompt = self.combine_summary_prompt_template
         else:
             prompt = self.summary_prompt_template
 
-        chain = prompt | self.llm | self.output_parser
-        return chain.invoke({"text": text})
+        return prompt | self.llm | self.output_parser
 
 if __name__ == "__main__":
     # Example usage (requires OPENAI_API_KEY environment variable to be set)
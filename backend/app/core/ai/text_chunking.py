@@ -0,0 +1,106 @@
+# backend/app/core/ai/text_chunking.py
+
+from typing import List
+
+# Rough characters-per-token ratio of OpenAI tokenizers on English prose
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the number of LLM tokens in a text. This avoids loading a tokenizer;
+    the estimate only has to be good enough to keep chunks well inside the context window.
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _split_words(text: str, max_tokens: int) -> List[str]:
+    """Splits a single over-long sentence at word boundaries."""
+    pieces = []
+    current = []
+    current_tokens = 0
+    for word in text.split():
+        word_tokens = estimate_tokens(word) + 1
+        if current and current_tokens + word_tokens > max_tokens:
+            pieces.append(" ".join(current))
+            current = []
+            current_tokens = 0
+        current.append(word)
+        current_tokens += word_tokens
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def pack_chunks(paragraphs: List[List[str]], max_tokens: int) -> List[str]:
+    """
+    Packs sentences into chunks of at most max_tokens, in document order.
+
+    Args:
+        paragraphs: The document as a list of paragraphs, each a list of sentences.
+        max_tokens: The token budget of a chunk.
+    Returns:
+        The chunks. Whole paragraphs are kept together where they fit; a paragraph
+        that exceeds the budget is split between sentences, and a sentence that
+        exceeds it on its own is split between words.
+    """
+    chunks = []
+    current = []
+    current_tokens = 0
+
+    def flush():
+        nonlocal current, current_tokens
+        if current:
+            chunks.append(" ".join(current))
+        current = []
+        current_tokens = 0
+
+    for sentences in paragraphs:
+        paragraph_tokens = sum(estimate_tokens(sentence) + 1 for sentence in sentences)
+        if paragraph_tokens <= max_tokens:
+            # Start a new chunk rather than break the paragraph across two
+            if current_tokens + paragraph_tokens > max_tokens:
+                flush()
+            current.extend(sentences)
+            current_tokens += paragraph_tokens
+            continue
+
+        for sentence in sentences:
+            sentence_tokens = estimate_tokens(sentence) + 1
+            if sentence_tokens > max_tokens:
+                flush()
+                chunks.extend(_split_words(sentence, max_tokens))
+                continue
+            if current_tokens + sentence_tokens > max_tokens:
+                flush()
+            current.append(sentence)
+            current_tokens += sentence_tokens
+        flush()
+
+    flush()
+    return chunks
+
+
+def group_by_budget(texts: List[str], max_tokens: int) -> List[List[str]]:
+    """
+    Groups consecutive texts so each group fits in max_tokens. Texts are never split,
+    and every group holds at least two texts where possible, so repeatedly combining
+    the groups of a list of partial summaries always converges.
+    """
+    groups = []
+    current = []
+    current_tokens = 0
+    for text in texts:
+        text_tokens = estimate_tokens(text) + 1
+        if len(current) >= 2 and current_tokens + text_tokens > max_tokens:
+            groups.append(current)
+            current = []
+            current_tokens = 0
+        current.append(text)
+        current_tokens += text_tokens
+    if current:
+        if len(current) == 1 and groups:
+            groups[-1].append(current[0])
+        else:
+            groups.append(current)
+    return groups
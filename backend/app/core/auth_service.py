@@ -1,7 +1,8 @@
 import os
 import uuid
-from sqlalchemy.orm import Session
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from backend.app.models.user import User
 from fastapi import HTTPException, status
 from auth0.management import Auth0
@@ -59,13 +60,13 @@ class AuthService:
             self._auth0_configured = True
             logger.info(f"Auth0 management client initialized for domain: {self.auth0_domain}")
 
-    async def register_user(self, email: str, password: str, db: Session):
+    async def register_user(self, email: str, password: str, db: AsyncSession):
         is_cypress_testing_active = os.getenv("CYPRESS_TESTING_ACTIVE", "false").lower() == "true"
         if not self._auth0_configured:
             raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Auth0 service is not configured. User registration is currently unavailable.")
 
         # Check if user already exists in our database
-        existing_user = db.query(User).filter(User.email == email).first()
+        existing_user = await db.scalar(select(User).where(User.email == email))
         if existing_user:
             raise DuplicateUserException("User with this email already exists")
         
@@ -99,10 +100,9 @@ class AuthService:
 
         db.add(new_user)
         try:
-            db.commit()
-            db.refresh(new_user)
+            await db.commit()
         except IntegrityError:
-            db.rollback()
+            await db.rollback()
             raise DuplicateUserException("User with this email already exists (DB constraint)") # Should be caught by Auth0 or earlier check
 
         frontend_verification_url = os.getenv("NEXT_PUBLIC_EMAIL_VERIFICATION_URL", "http://localhost:3000")
@@ -116,8 +116,8 @@ class AuthService:
             response_data["verification_token"] = new_user.verification_token
         return response_data
 
-    async def verify_email(self, email: str, token: str, db: Session):
-        user = db.query(User).filter(User.email == email).first()
+    async def verify_email(self, email: str, token: str, db: AsyncSession):
+        user = await db.scalar(select(User).where(User.email == email))
         if not user:
             raise UserNotFoundException("User not found")
         
@@ -134,13 +134,12 @@ class AuthService:
         user.verification_token = None
         user.verification_token_expires_at = None
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
         
         logger.info(f"User email verified: {email}")
         return True
 
-    async def login(self, email: str, password: str, db: Session) -> dict:
+    async def login(self, email: str, password: str, db: AsyncSession) -> dict:
         """Authenticates user with Auth0 and returns access token."""
         if not self._auth0_configured:
             raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Auth0 service is not configured. User login is currently unavailable.")
@@ -166,7 +165,7 @@ class AuthService:
                     raise IncorrectLoginCredentialsException("Auth0 did not return an access token.")
                 
                 # Verify or create user in our database if not exists
-                user = db.query(User).filter(User.email == email).first()
+                user = await db.scalar(select(User).where(User.email == email))
                 if user:
                     if not user.is_verified:
                         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User email not verified.")
@@ -185,8 +184,7 @@ class AuthService:
                     
                     new_user = User(auth_provider_id=auth_provider_id, email=email, is_verified=True) # Assume verified if logged in
                     db.add(new_user)
-                    db.commit()
-                    db.refresh(new_user)
+                    await db.commit()
                     logger.info(f"Created local user entry for {email} after successful Auth0 login.")
 
                 logger.info(f"User {email} logged in successfully via Auth0.")
@@ -1,6 +1,150 @@
 # backend/app/core/config.py
 
+import os
+
 # Confidence threshold for AI interpretation
 # If the confidence score from intent detection or user state inference
 # falls below this value, the system will trigger uncertainty handling.
 CONFIDENCE_THRESHOLD = 0.7
+
+# spaCy pipeline shared by every NLPService in a worker process.
+SPACY_MODEL_NAME = os.getenv("SPACY_MODEL_NAME", "en_core_web_sm")
+# Load the spaCy pipeline at application startup instead of on the first request.
+NLP_PRELOAD_MODEL = os.getenv("NLP_PRELOAD_MODEL", "false").lower() == "true"
+# Run a short warmup document through the pipeline after preloading it.
+NLP_WARMUP_MODEL = os.getenv("NLP_WARMUP_MODEL", "true").lower() == "true"
+
+# Defaults for batch processing through Language.pipe.
+NLP_PIPE_BATCH_SIZE = int(os.getenv("NLP_PIPE_BATCH_SIZE", "64"))
+# Worker processes Language.pipe forks for a batch. Each one loads its own copy of the model,
+# so multiprocessing is opt-in and set per deployment, never by the client.
+NLP_PIPE_PROCESSES = int(os.getenv("NLP_PIPE_PROCESSES", "1"))
+# Maximum number of texts accepted by one /nlp/process-batch request.
+NLP_BATCH_MAX_TEXTS = int(os.getenv("NLP_BATCH_MAX_TEXTS", "1000"))
+
+# Redis connection shared by caches and queues; leave unset to run without Redis.
+REDIS_URL = os.getenv("REDIS_URL")
+
+# Content-addressed cache for LLM generations (summaries, flashcards, quizzes).
+GENERATION_CACHE_ENABLED = os.getenv("GENERATION_CACHE_ENABLED", "true").lower() == "true"
+GENERATION_CACHE_MAX_ENTRIES = int(os.getenv("GENERATION_CACHE_MAX_ENTRIES", "1024"))
+GENERATION_CACHE_TTL_SECONDS = int(os.getenv("GENERATION_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+# Reuse the stored result of an identical earlier generation (same artifact, text, options, provider, model and
+# temperature, from any study material) instead of calling the LLM. Unlike the cache above it is durable and needs no Redis.
+GENERATION_REUSE_ENABLED = os.getenv("GENERATION_REUSE_ENABLED", "true").lower() == "true"
+
+# Background generation jobs: "memory" runs an in-process asyncio queue, "redis" shares one queue across workers.
+JOB_QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "memory").lower()
+JOB_QUEUE_NAME = os.getenv("JOB_QUEUE_NAME", "generation_jobs")
+# Number of asyncio workers consuming the job queue in each process.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+# A job deferred because the LLM is rate limited or unavailable waits at least the provider's
+# retry_after, doubling per deferral up to the maximum delay, and fails after this many deferrals.
+JOB_MAX_DEFERRALS = int(os.getenv("JOB_MAX_DEFERRALS", "5"))
+JOB_DEFER_MAX_SECONDS = float(os.getenv("JOB_DEFER_MAX_SECONDS", "300"))
+
+# Map-reduce summarization: texts estimated above this many tokens are split into chunks of at most this size.
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "3000"))
+# Maximum number of chunk summaries requested from the LLM at the same time.
+SUMMARY_MAX_CONCURRENCY = int(os.getenv("SUMMARY_MAX_CONCURRENCY", "4"))
+
+# Per-module timeout for the concurrent LLM calls of /study-materials/{id}/generate-all.
+GENERATION_TIMEOUT_SECONDS = float(os.getenv("GENERATION_TIMEOUT_SECONDS", "120"))
+
+# Connection pool shared by every ChatOpenAI client in a worker.
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+LLM_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("LLM_KEEPALIVE_EXPIRY_SECONDS", "30"))
+
+# Admission control for LLM calls, shared by every module in a worker. 0 disables a limit.
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "200000"))
+# Requests one user may have making LLM calls at the same time. The calls a request fans out share its slot.
+LLM_MAX_INFLIGHT_PER_USER = int(os.getenv("LLM_MAX_INFLIGHT_PER_USER", "8"))
+# Calls that would wait longer than this for budget are rejected with 429 instead of queued.
+LLM_MAX_QUEUE_WAIT_SECONDS = float(os.getenv("LLM_MAX_QUEUE_WAIT_SECONDS", "10"))
+# Completion tokens assumed per call when estimating its share of the tokens-per-minute budget.
+LLM_COMPLETION_TOKENS_ESTIMATE = int(os.getenv("LLM_COMPLETION_TOKENS_ESTIMATE", "512"))
+
+# Request flashcards and quizzes through a JSON schema (function calling) instead of parsing free text.
+LLM_STRUCTURED_OUTPUT = os.getenv("LLM_STRUCTURED_OUTPUT", "true").lower() == "true"
+
+# Resilience policy for LLM calls. Deadline of one attempt; on the sync paths the HTTP client enforces it.
+LLM_CALL_TIMEOUT_SECONDS = float(os.getenv("LLM_CALL_TIMEOUT_SECONDS", "60"))
+# Retries after a timeout, connection error, provider 429 or 5xx, with exponential backoff and full jitter.
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BACKOFF_SECONDS = float(os.getenv("LLM_RETRY_BACKOFF_SECONDS", "0.5"))
+LLM_RETRY_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_RETRY_BACKOFF_MAX_SECONDS", "8"))
+# Send a second request when an async call is slower than this latency percentile of recent calls.
+LLM_HEDGE_REQUESTS = os.getenv("LLM_HEDGE_REQUESTS", "false").lower() == "true"
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+# Successful calls to observe before hedging starts.
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+# Consecutive failed attempts that open the circuit, after which calls fail fast for LLM_CIRCUIT_RESET_SECONDS. 0 disables it.
+LLM_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "5"))
+LLM_CIRCUIT_RESET_SECONDS = float(os.getenv("LLM_CIRCUIT_RESET_SECONDS", "30"))
+
+# LLM backend used by every module: "openai", or "fake" for the offline model in fake_llm.py (load tests, CI).
+# The modules still require OPENAI_API_KEY to be set; any value works with the fake provider.
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai").lower()
+# Fake provider: median time to the first token and its distribution ("constant", "uniform" or "lognormal").
+FAKE_LLM_LATENCY_SECONDS = float(os.getenv("FAKE_LLM_LATENCY_SECONDS", "0.2"))
+FAKE_LLM_LATENCY_DISTRIBUTION = os.getenv("FAKE_LLM_LATENCY_DISTRIBUTION", "lognormal").lower()
+# Sigma of the lognormal distribution, or the +/- fraction of the uniform one.
+FAKE_LLM_LATENCY_SPREAD = float(os.getenv("FAKE_LLM_LATENCY_SPREAD", "0.5"))
+# Streaming pace after the first token; 0 streams the whole answer at once.
+FAKE_LLM_TOKENS_PER_SECOND = float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "50"))
+# Fraction of calls that fail, and how: "timeout", "connection", "rate_limit" or "server_error".
+FAKE_LLM_ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+FAKE_LLM_ERROR_KIND = os.getenv("FAKE_LLM_ERROR_KIND", "server_error").lower()
+# Seed for the latency and error draws; unset, they differ on every run.
+FAKE_LLM_SEED = int(os.getenv("FAKE_LLM_SEED")) if os.getenv("FAKE_LLM_SEED") else None
+
+# SQLAlchemy connection pools of each worker: one for sync sessions and one for async sessions.
+# A worker holds at most DB_POOL_SIZE + DB_MAX_OVERFLOW + DB_ASYNC_POOL_SIZE + DB_ASYNC_MAX_OVERFLOW connections,
+# so size them together against the workers per host and the Postgres max_connections.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_ASYNC_POOL_SIZE = int(os.getenv("DB_ASYNC_POOL_SIZE", "5"))
+DB_ASYNC_MAX_OVERFLOW = int(os.getenv("DB_ASYNC_MAX_OVERFLOW", "10"))
+# Seconds a request waits for a free connection before failing.
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+# Replace connections older than this, before the server or a proxy drops them. -1 keeps them forever.
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+# Test each connection on checkout and transparently replace stale ones.
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Postgres statement_timeout set on every connection, in milliseconds. 0 disables it.
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+
+# Study materials returned per page by GET /study-materials/ when no limit is given, and the largest limit accepted.
+STUDY_MATERIALS_PAGE_SIZE = int(os.getenv("STUDY_MATERIALS_PAGE_SIZE", "50"))
+STUDY_MATERIALS_MAX_PAGE_SIZE = int(os.getenv("STUDY_MATERIALS_MAX_PAGE_SIZE", "200"))
+# Shares returned per page by the /sharing/my-shares and /sharing/shared-with-me listings, and the largest limit accepted.
+SHARES_PAGE_SIZE = int(os.getenv("SHARES_PAGE_SIZE", "50"))
+SHARES_MAX_PAGE_SIZE = int(os.getenv("SHARES_MAX_PAGE_SIZE", "200"))
+# Frontend origin that share links point to, as {SHARE_LINK_BASE_URL}/share/{token}.
+SHARE_LINK_BASE_URL = os.getenv("SHARE_LINK_BASE_URL", "http://localhost:3000").rstrip("/")
+
+# Change log entries scanned per /sync call when no limit is given, and the largest limit accepted.
+SYNC_PAGE_SIZE = int(os.getenv("SYNC_PAGE_SIZE", "500"))
+SYNC_MAX_PAGE_SIZE = int(os.getenv("SYNC_MAX_PAGE_SIZE", "2000"))
+# /sync holds back entries younger than this. Concurrent transactions can commit their log ids out
+# of order, and a cursor that moved past an id not yet committed would skip that change for good.
+SYNC_SETTLE_SECONDS = float(os.getenv("SYNC_SETTLE_SECONDS", "2"))
+
+# Codec for generated content at rest: "zstd" (needs the zstandard package) or "none". Rows record their
+# own codec, so changing this only affects content written afterwards.
+CONTENT_COMPRESSION = os.getenv("CONTENT_COMPRESSION", "zstd").lower()
+CONTENT_COMPRESSION_LEVEL = int(os.getenv("CONTENT_COMPRESSION_LEVEL", "3"))
+# Content shorter than this is stored uncompressed; the frame overhead outweighs the savings.
+CONTENT_COMPRESSION_MIN_BYTES = int(os.getenv("CONTENT_COMPRESSION_MIN_BYTES", "256"))
+
+# Where uploaded study material files are stored: "local" (a directory) or "s3" (any S3-compatible service).
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local").lower()
+STORAGE_LOCAL_ROOT = os.getenv("STORAGE_LOCAL_ROOT", "./storage")
+S3_BUCKET = os.getenv("S3_BUCKET")
+# Set for MinIO or another S3-compatible service; leave unset for AWS.
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")
+S3_REGION = os.getenv("S3_REGION")
+# Uploads are streamed in parts of this size, the most held in memory per upload. S3 needs at least 5 MiB.
+STORAGE_PART_BYTES = int(os.getenv("STORAGE_PART_BYTES", str(8 * 1024 * 1024)))
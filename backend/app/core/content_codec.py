@@ -0,0 +1,61 @@
+import logging
+from typing import Tuple
+
+from backend.app.core.config import CONTENT_COMPRESSION, CONTENT_COMPRESSION_LEVEL, CONTENT_COMPRESSION_MIN_BYTES
+
+logger = logging.getLogger(__name__)
+
+# Codecs recorded with each stored blob
+IDENTITY = "identity"
+ZSTD = "zstd"
+
+
+class UnsupportedCodecError(RuntimeError):
+    """Raised when a stored blob uses a codec this worker cannot decode."""
+
+
+def _load_zstd():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def _write_codec() -> str:
+    if CONTENT_COMPRESSION == ZSTD:
+        if _zstd is None:
+            logger.warning("CONTENT_COMPRESSION is zstd but the zstandard package is not installed. Storing generated content uncompressed.")
+            return IDENTITY
+        return ZSTD
+    if CONTENT_COMPRESSION not in ("none", IDENTITY):
+        logger.warning("Unknown CONTENT_COMPRESSION %r. Storing generated content uncompressed.", CONTENT_COMPRESSION)
+    return IDENTITY
+
+
+_zstd = _load_zstd()
+WRITE_CODEC = _write_codec() # Resolved once per worker
+
+
+def encode(raw: bytes) -> Tuple[str, bytes]:
+    """
+    Compresses raw with the configured codec.
+
+    Returns:
+        The codec used and the bytes to store. Short payloads are kept as they are.
+    """
+    if WRITE_CODEC == ZSTD and len(raw) >= CONTENT_COMPRESSION_MIN_BYTES:
+        # Compressors are not safe to share between threads, and building one is cheap next to the write
+        return ZSTD, _zstd.ZstdCompressor(level=CONTENT_COMPRESSION_LEVEL).compress(raw)
+    return IDENTITY, raw
+
+
+def decode(codec: str, data: bytes) -> bytes:
+    """Reverses encode for a blob stored with codec."""
+    if codec == IDENTITY:
+        return bytes(data)
+    if codec == ZSTD:
+        if _zstd is None:
+            raise UnsupportedCodecError("Generated content is zstd-compressed but the zstandard package is not installed.")
+        return _zstd.ZstdDecompressor().decompress(data)
+    raise UnsupportedCodecError(f"Unknown generated content codec: {codec}")
@@ -0,0 +1,115 @@
+# backend/app/core/nlp_model_registry.py
+
+import resource
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+import spacy
+from spacy.language import Language
+
+from backend.app.core.config import SPACY_MODEL_NAME
+
+WARMUP_TEXT = "What is photosynthesis? Plants convert light energy into chemical energy."
+
+
+def _current_rss_bytes() -> int:
+    """
+    Returns the resident set size of the current process in bytes.
+    Reads /proc on Linux and falls back to the peak RSS reported by getrusage elsewhere.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * resource.getpagesize()
+    except (OSError, IndexError, ValueError):
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class NLPModelRegistry:
+    """
+    Process-wide registry of spaCy pipelines.
+
+    Each pipeline is loaded at most once per worker and the same Language object
+    is handed out to every caller. Callers must treat it as read-only: adding or
+    removing pipeline components would affect every request in the worker.
+    """
+
+    def __init__(self, default_model_name: str = SPACY_MODEL_NAME):
+        self.default_model_name = default_model_name
+        self._models: Dict[str, Language] = {}
+        self._stats: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_name: Optional[str] = None) -> Language:
+        """
+        Returns the shared pipeline for model_name, loading it on first use.
+        """
+        model_name = model_name or self.default_model_name
+        nlp = self._models.get(model_name)
+        if nlp is not None:
+            return nlp
+
+        with self._lock:
+            # Another thread may have finished loading while we waited for the lock
+            nlp = self._models.get(model_name)
+            if nlp is None:
+                nlp = self._load(model_name)
+        return nlp
+
+    def _load(self, model_name: str) -> Language:
+        rss_before = _current_rss_bytes()
+        started = time.perf_counter()
+        nlp = spacy.load(model_name)
+        load_seconds = time.perf_counter() - started
+
+        self._models[model_name] = nlp
+        self._stats[model_name] = {
+            "model_name": model_name,
+            "pipe_names": list(getattr(nlp, "pipe_names", [])),
+            "load_seconds": load_seconds,
+            "rss_delta_bytes": max(_current_rss_bytes() - rss_before, 0),
+            "warmup_seconds": None,
+            "loaded_at": time.time(),
+        }
+        return nlp
+
+    def preload(self, model_name: Optional[str] = None, warmup: bool = True) -> Language:
+        """
+        Loads the pipeline eagerly, optionally running a warmup document through it
+        so that lazily initialised vocab and tables are ready before the first request.
+        """
+        model_name = model_name or self.default_model_name
+        nlp = self.get(model_name)
+        if warmup:
+            started = time.perf_counter()
+            nlp(WARMUP_TEXT)
+            self._stats[model_name]["warmup_seconds"] = time.perf_counter() - started
+        return nlp
+
+    def is_loaded(self, model_name: Optional[str] = None) -> bool:
+        return (model_name or self.default_model_name) in self._models
+
+    def stats(self) -> dict:
+        """
+        Returns load time and memory figures for every loaded pipeline.
+        """
+        return {
+            "default_model": self.default_model_name,
+            "process_rss_bytes": _current_rss_bytes(),
+            "models": [dict(stats) for stats in self._stats.values()],
+        }
+
+    def reset(self):
+        """
+        Drops every loaded pipeline. Intended for tests that patch spacy.load.
+        """
+        with self._lock:
+            self._models.clear()
+            self._stats.clear()
+
+
+nlp_model_registry = NLPModelRegistry() # Instantiate once per worker
@@ -1,9 +1,12 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from backend.app.database import get_db
+from backend.app.database import get_async_db
 from backend.app.models.user import User
+from backend.app.core.ai.llm_governor import bind_llm_request
 
 # TODO: Load these from environment variables in a production setting
 SECRET_KEY = "your-secret-key" # Placeholder
@@ -11,7 +14,7 @@ ALGORITHM = "HS256" # Placeholder
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -24,13 +27,21 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         user_id: str = payload.get("sub")
         if user_id is None:
             raise credentials_exception
-        user = db.query(User).filter(User.id == user_id).first()
+        user = (await db.execute(select(User).where(User.id == int(user_id)))).scalar_one_or_none()
         if user is None:
             raise credentials_exception
         return user
-    except JWTError:
+    except (JWTError, ValueError):
         raise credentials_exception
 
+async def bind_llm_user(current_user: User = Depends(get_current_user)):
+    """
+    Attributes the request's LLM calls to the current user for per-user rate limiting.
+    Declared async so the context variables are set in the request's own context.
+    """
+    bind_llm_request(str(current_user.id))
+    return current_user
+
 async def get_current_user_websocket(token: str, db: Session):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
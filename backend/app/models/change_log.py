@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from backend.app.database import Base
+import datetime
+
+class ChangeLogEntry(Base):
+    """
+    One create, update or delete of a study material, generated artifact or share,
+    appended in the same transaction as the change itself. The id orders the log
+    and is the sync cursor; rows are never updated.
+    """
+    __tablename__ = "change_log"
+    __table_args__ = (
+        # Serves /sync: one user's entries after a cursor, in order
+        Index("ix_change_log_user_id_id", "user_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False) # Whose sync feed the entry belongs to; no foreign key, so it outlives the user's rows
+    entity_type = Column(String, nullable=False) # e.g., 'study_material', 'summary', 'flashcard_set', 'quiz', 'share'
+    entity_id = Column(Integer, nullable=False)
+    operation = Column(String, nullable=False) # 'upsert' or 'delete'
+    changed_at = Column(DateTime, nullable=False, default=datetime.datetime.utcnow)
@@ -7,7 +7,7 @@ class Feedback(Base):
     __tablename__ = "feedback"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     material_id = Column(Integer, nullable=False)
     material_type = Column(String, nullable=False)
     rating = Column(Integer, nullable=False)
@@ -0,0 +1,45 @@
+from sqlalchemy import Column, Integer, String, LargeBinary
+from backend.app.database import Base
+from backend.app.core import content_codec
+import json
+
+class GeneratedContent(Base):
+    """
+    The content of a generated summary, flashcard set or quiz, kept apart from the
+    artifact's own row so that queries over artifacts never read it. Artifacts expose
+    it as their content attribute and only load it through their stored_content relationship.
+    """
+    __tablename__ = "generated_contents"
+
+    id = Column(Integer, primary_key=True, index=True)
+    codec = Column(String, nullable=False) # 'identity' or 'zstd', see backend.app.core.content_codec
+    data = Column(LargeBinary, nullable=False)
+    size = Column(Integer, nullable=False) # Uncompressed size in bytes
+    # Fingerprint of the generation input, so identical requests can reuse the content; null if it must not be reused
+    source_sha256 = Column(String(64), nullable=True, index=True)
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "GeneratedContent":
+        codec, data = content_codec.encode(raw)
+        return cls(codec=codec, data=data, size=len(raw))
+
+    @classmethod
+    def from_text(cls, text: str) -> "GeneratedContent":
+        return cls.from_bytes(text.encode("utf-8"))
+
+    @classmethod
+    def from_json(cls, value) -> "GeneratedContent":
+        return cls.from_bytes(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+
+    def copy(self) -> "GeneratedContent":
+        """A new row with the same stored bytes, for another artifact with identical content."""
+        return GeneratedContent(codec=self.codec, data=self.data, size=self.size, source_sha256=self.source_sha256)
+
+    def as_bytes(self) -> bytes:
+        return content_codec.decode(self.codec, self.data)
+
+    def as_text(self) -> str:
+        return self.as_bytes().decode("utf-8")
+
+    def as_json(self):
+        return json.loads(self.as_bytes())
@@ -1,16 +1,28 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 from backend.app.database import Base
+from backend.app.models.generated_content import GeneratedContent
 import datetime
 
 class GeneratedQuiz(Base):
     __tablename__ = "generated_quizzes"
 
     id = Column(Integer, primary_key=True, index=True)
-    study_material_id = Column(Integer, ForeignKey("study_materials.id"), nullable=False)
-    # Storing quiz as a JSON array of {question: string, options: string[], correct_answer: string}
-    content = Column(JSON, nullable=False) 
+    study_material_id = Column(Integer, ForeignKey("study_materials.id"), nullable=False, index=True)
+    # The quiz is a JSON array of {question: string, options: string[], correct_answer: string}, stored in generated_contents
+    content_id = Column(Integer, ForeignKey("generated_contents.id"), nullable=False, index=True)
     generated_at = Column(DateTime, default=datetime.datetime.utcnow)
 
     # Relationship to StudyMaterial
-    study_material = relationship("StudyMaterial", back_populates="generated_quizzes")
\ No newline at end of file
+    study_material = relationship("StudyMaterial", back_populates="generated_quizzes")
+
+    # The quiz questions, stored apart from the row. Load them with the query wherever content is returned.
+    stored_content = relationship(GeneratedContent, cascade="all, delete-orphan", single_parent=True)
+
+    @property
+    def content(self) -> list:
+        return self.stored_content.as_json()
+
+    @content.setter
+    def content(self, value: list):
+        self.stored_content = GeneratedContent.from_json(value)
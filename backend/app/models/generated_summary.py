@@ -1,16 +1,28 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 from backend.app.database import Base
+from backend.app.models.generated_content import GeneratedContent
 import datetime
 
 class GeneratedSummary(Base):
     __tablename__ = "generated_summaries"
 
     id = Column(Integer, primary_key=True, index=True)
-    study_material_id = Column(Integer, ForeignKey("study_materials.id"), nullable=False)
-    content = Column(Text, nullable=False)
+    study_material_id = Column(Integer, ForeignKey("study_materials.id"), nullable=False, index=True)
+    content_id = Column(Integer, ForeignKey("generated_contents.id"), nullable=False, index=True)
     detail_level = Column(String, nullable=True) # e.g., 'normal', 'brief', 'detailed'
     generated_at = Column(DateTime, default=datetime.datetime.utcnow)
 
     # Relationship to StudyMaterial
-    study_material = relationship("StudyMaterial", back_populates="generated_summaries")
\ No newline at end of file
+    study_material = relationship("StudyMaterial", back_populates="generated_summaries")
+
+    # The summary text, stored apart from the row. Load it with the query wherever content is returned.
+    stored_content = relationship(GeneratedContent, cascade="all, delete-orphan", single_parent=True)
+
+    @property
+    def content(self) -> str:
+        return self.stored_content.as_text()
+
+    @content.setter
+    def content(self, value: str):
+        self.stored_content = GeneratedContent.from_text(value)
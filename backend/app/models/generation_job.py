@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON
+from backend.app.database import Base
+import datetime
+import uuid
+
+class GenerationJob(Base):
+    __tablename__ = "generation_jobs"
+
+    id = Column(String, primary_key=True, default=lambda: uuid.uuid4().hex)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # Jobs go with their material; the database cascades too, for deletes that bypass the ORM
+    study_material_id = Column(Integer, ForeignKey("study_materials.id", ondelete="CASCADE"), nullable=False, index=True)
+    job_type = Column(String, nullable=False) # e.g., 'summary', 'flashcards', 'quiz'
+    status = Column(String, default="queued") # e.g., 'queued', 'running', 'complete', 'failed'
+    # Generation inputs, e.g. {"text": ..., "detail_level": ...}
+    params = Column(JSON, nullable=False)
+    result_id = Column(Integer, nullable=True) # id of the generated summary, flashcard set or quiz
+    error = Column(Text, nullable=True)
+    deferrals = Column(Integer, nullable=False, default=0) # Times the job was put back because the LLM was unavailable
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, func, Boolean
 from sqlalchemy.orm import relationship
 from backend.app.database import Base
 import datetime
@@ -6,13 +6,17 @@ import uuid
 
 class SharedStudyMaterial(Base):
     __tablename__ = "shared_study_materials"
+    __table_args__ = (
+        # Looks up an existing share before sharing again; also serves filters on study_material_id alone
+        Index("ix_shared_study_materials_study_material_id_shared_with_user_id", "study_material_id", "shared_with_user_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     study_material_id = Column(Integer, ForeignKey("study_materials.id"), nullable=False)
-    shared_by_user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    shared_with_user_id = Column(Integer, ForeignKey("users.id"), nullable=True) # Nullable for public links
+    shared_by_user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    shared_with_user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True) # Nullable for public links
     share_token = Column(String, unique=True, index=True, default=lambda: str(uuid.uuid4())) # For public links
-    permissions = Column(String, default="view") # e.g., "view", "edit"
+    permissions = Column(String, default="view_only") # "view_only" or "edit", see schemas.Permissions
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     expires_at = Column(DateTime, nullable=True) # Optional expiration for links
 
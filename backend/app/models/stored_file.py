@@ -0,0 +1,18 @@
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime
+from backend.app.database import Base
+import datetime
+
+class StoredFile(Base):
+    """
+    One uploaded file's content, kept once in storage however many study materials
+    were uploaded with it. ref_count is the number of materials pointing at it; the
+    object is deleted from storage together with the last of them.
+    """
+    __tablename__ = "stored_files"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), nullable=False, unique=True) # Hex digest of the content
+    storage_key = Column(String, nullable=False)
+    size_bytes = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False, default=datetime.datetime.utcnow)
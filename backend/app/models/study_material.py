@@ -1,11 +1,17 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 from backend.app.database import Base
 from backend.app.models.user import User # Import User for relationship
+from backend.app.models.stored_file import StoredFile # Registers the table stored_file_id refers to
+from backend.app.models.generation_job import GenerationJob # Import GenerationJob for relationship
 import datetime
 
 class StudyMaterial(Base):
     __tablename__ = "study_materials"
+    __table_args__ = (
+        # Serves the keyset-paginated listing and every other filter on user_id
+        Index("ix_study_materials_user_id_upload_date_id", "user_id", "upload_date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -13,14 +19,22 @@ class StudyMaterial(Base):
     s3_key = Column(String, nullable=False)
     upload_date = Column(DateTime, default=datetime.datetime.utcnow)
     processing_status = Column(String, default="pending") # e.g., 'pending', 'processing', 'complete', 'failed'
+    # Computed while the upload streamed to storage; null for materials created before that
+    size_bytes = Column(BigInteger, nullable=True)
+    content_sha256 = Column(String(64), nullable=True) # Hex digest
+    # The deduplicated file in storage; null for materials uploaded before deduplication, which own s3_key outright
+    stored_file_id = Column(Integer, ForeignKey("stored_files.id"), nullable=True, index=True)
 
     # Relationship to User
     owner = relationship("User", back_populates="study_materials")
 
     # Relationship to SharedStudyMaterial
-    shares = relationship("SharedStudyMaterial", back_populates="study_material")
+    shares = relationship("SharedStudyMaterial", back_populates="study_material", cascade="all, delete-orphan")
 
-    # Relationships to generated materials
-    generated_summaries = relationship("GeneratedSummary", back_populates="study_material")
-    generated_flashcard_sets = relationship("GeneratedFlashcardSet", back_populates="study_material")
-    generated_quizzes = relationship("GeneratedQuiz", back_populates="study_material")
\ No newline at end of file
+    # Relationships to generated materials. They are deleted with the material, so sync clients get their tombstones too.
+    generated_summaries = relationship("GeneratedSummary", back_populates="study_material", cascade="all, delete-orphan")
+    generated_flashcard_sets = relationship("GeneratedFlashcardSet", back_populates="study_material", cascade="all, delete-orphan")
+    generated_quizzes = relationship("GeneratedQuiz", back_populates="study_material", cascade="all, delete-orphan")
+
+    # Generation jobs run for the material, deleted with it
+    generation_jobs = relationship(GenerationJob, cascade="all, delete-orphan", passive_deletes=True)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from backend.app.services.nlp_service import NLPService
+from backend.app.services.nlp_service import NLPService, SignalProfile
 from backend.app.services.planner_service import PlannerService
 from backend.app.models.planner import NextStep
 from sqlalchemy.orm import Session # Import Session
@@ -13,8 +13,8 @@ class ClarityService:
         """
         Determines the next step based on the input text.
         """
-        # 1. Process the text to get signals
-        signals = self.nlp_service.process_text(self.db, text) # Pass db session
+        # 1. Process the text to get signals; intent and user state only need tokens
+        signals = self.nlp_service.process_text(text, profile=SignalProfile.INTENT_ONLY)
 
         # 2. Extract intent and user state
         intent = signals["detected_intent"]
@@ -0,0 +1,122 @@
+# backend/app/services/file_store_service.py
+
+import datetime
+import logging
+import os
+import uuid
+from typing import AsyncIterator, List, Tuple
+
+from sqlalchemy import delete, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.models.stored_file import StoredFile
+from backend.app.models.study_material import StudyMaterial
+from backend.app.services.storage_service import StorageBackend, StoredObject
+
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+# INSERT ... ON CONFLICT for each supported database
+UPSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+class StoredUpload:
+    """The stored file an upload resolved to, with the size and SHA-256 of its content."""
+
+    def __init__(self, stored_file_id: int, storage_key: str, size: int, sha256: str, duplicate: bool):
+        self.stored_file_id = stored_file_id
+        self.storage_key = storage_key
+        self.size = size
+        self.sha256 = sha256
+        self.duplicate = duplicate # True if the content was already stored and this upload was discarded
+
+
+class FileStore:
+    """
+    Keeps each distinct uploaded file once in storage, with a reference count per
+    study material using it. Works on an AsyncSession, so every method must be awaited.
+
+    Reference counts change in the caller's transaction; commit it with commit(), which
+    also removes objects from storage once nothing refers to them any more.
+    """
+
+    def __init__(self, db: AsyncSession, storage: StorageBackend):
+        self.db = db
+        self.storage = storage
+        self._delete_on_commit: List[str] = []
+        self._delete_on_rollback: List[str] = []
+
+    async def add(self, chunks: AsyncIterator[bytes]) -> StoredUpload:
+        """
+        Streams an upload to storage and takes a reference to its content. The content
+        is only known once the upload has been hashed, so it is always written under a
+        fresh key first; if the same content is already stored, that copy is deleted.
+        """
+        stored = await self.storage.save(f"blobs/{uuid.uuid4().hex}", chunks)
+        try:
+            stored_file_id, storage_key = await self._take_reference(stored)
+        except BaseException:
+            # Nothing refers to the new object yet
+            await self._delete([stored.key])
+            raise
+
+        duplicate = storage_key != stored.key
+        if duplicate:
+            await self._delete([stored.key])
+        else:
+            self._delete_on_rollback.append(stored.key)
+        return StoredUpload(stored_file_id, storage_key, stored.size, stored.sha256, duplicate)
+
+    async def _take_reference(self, stored: StoredObject) -> Tuple[int, str]:
+        """Returns the id and storage key of the row for the stored content, creating it or counting one more reference."""
+        # One atomic statement, so concurrent uploads of the same new content agree on a single row
+        statement = UPSERTS[(await self.db.connection()).dialect.name](StoredFile).values(
+            sha256=stored.sha256,
+            storage_key=stored.key,
+            size_bytes=stored.size,
+            ref_count=1,
+            created_at=datetime.datetime.utcnow()
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[StoredFile.sha256], set_={"ref_count": StoredFile.ref_count + 1}
+        ).returning(StoredFile.id, StoredFile.storage_key)
+        stored_file_id, storage_key = (await self.db.execute(statement)).one()
+        return stored_file_id, storage_key
+
+    async def release(self, study_material: StudyMaterial):
+        """Drops the reference a study material being deleted holds on its file."""
+        if study_material.stored_file_id is None:
+            # Uploaded before deduplication: the material owns its object outright
+            self._delete_on_commit.append(study_material.s3_key)
+            return
+        # The material's own DELETE must reach the database before its stored file's
+        await self.db.flush()
+        ref_count, storage_key = (await self.db.execute(
+            update(StoredFile).where(StoredFile.id == study_material.stored_file_id)
+            .values(ref_count=StoredFile.ref_count - 1)
+            .returning(StoredFile.ref_count, StoredFile.storage_key)
+        )).one()
+        if ref_count <= 0:
+            await self.db.execute(delete(StoredFile).where(StoredFile.id == study_material.stored_file_id))
+            self._delete_on_commit.append(storage_key)
+
+    async def commit(self):
+        """Commits the session, then deletes the objects it left unreferenced."""
+        try:
+            await self.db.commit()
+        except BaseException:
+            await self._delete(self._delete_on_rollback)
+            raise
+        finally:
+            self._delete_on_rollback = []
+        keys, self._delete_on_commit = self._delete_on_commit, []
+        await self._delete(keys)
+
+    async def _delete(self, keys: List[str]):
+        # A failure leaves an unreferenced object behind, never a reference without its object
+        for key in keys:
+            try:
+                await self.storage.delete(key)
+            except Exception:
+                logger.exception("Could not delete %s from storage", key)
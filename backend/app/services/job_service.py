@@ -0,0 +1,258 @@
+# backend/app/services/job_service.py
+
+import asyncio
+import json
+import logging
+import os
+from typing import Callable, List, Optional, Set
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from backend.app.api.schemas import (
+    GeneratedFlashcardSetResponse,
+    GeneratedQuizResponse,
+    GeneratedSummaryResponse,
+    JobResponse,
+    JobStatus,
+    JobType,
+)
+from backend.app.core.ai.llm_governor import LLMRateLimitExceeded, bind_llm_request
+from backend.app.core.ai.llm_resilience import LLMUnavailableError
+from backend.app.core.config import (
+    JOB_DEFER_MAX_SECONDS,
+    JOB_MAX_DEFERRALS,
+    JOB_QUEUE_BACKEND,
+    JOB_QUEUE_NAME,
+    JOB_WORKERS,
+    REDIS_URL,
+)
+from backend.app.core.websockets import emit_to_user
+from backend.app.database import SessionLocal
+from backend.app.models.generation_job import GenerationJob
+from backend.app.services.nlp_service import NLPService
+
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+
+def _event_payload(schema, obj) -> dict:
+    """Serialises an ORM object through its response schema into JSON-safe data for Socket.IO."""
+    return json.loads(schema.from_orm(obj).json())
+
+
+class InMemoryJobQueue:
+    """Job queue local to this process. Jobs are lost if the process exits."""
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def queue(self) -> asyncio.Queue:
+        # An asyncio.Queue is tied to one event loop, so recreate it if the app is restarted on a new loop
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            self._queue = asyncio.Queue()
+            self._loop = loop
+        return self._queue
+
+    async def put(self, job_id: str):
+        await self.queue.put(job_id)
+
+    async def get(self) -> str:
+        return await self.queue.get()
+
+
+class RedisJobQueue:
+    """Job queue stored in a Redis list, shared by every worker process."""
+
+    def __init__(self, url: str, name: str = JOB_QUEUE_NAME):
+        # redis is an optional dependency, only needed for this backend
+        import redis.asyncio
+        self.client = redis.asyncio.Redis.from_url(url, decode_responses=True)
+        self.name = name
+
+    async def put(self, job_id: str):
+        await self.client.lpush(self.name, job_id)
+
+    async def get(self) -> str:
+        _, job_id = await self.client.brpop(self.name)
+        return job_id
+
+
+class JobService:
+    """
+    Runs summary, flashcard and quiz generation outside the request cycle.
+
+    Jobs are persisted as GenerationJob rows so their status can be polled from
+    any worker; only job ids travel through the queue. Each worker opens its own
+    database session, runs the generation, stores the result and notifies the
+    owner over Socket.IO.
+    """
+
+    # Maps a job type to the NLPService coroutine, the response schema and the Socket.IO event
+    GENERATORS = {
+        JobType.summary: ("aget_summary", GeneratedSummaryResponse, "summary_created"),
+        JobType.flashcards: ("aget_flashcards", GeneratedFlashcardSetResponse, "flashcards_created"),
+        JobType.quiz: ("aget_quiz_questions", GeneratedQuizResponse, "quiz_created"),
+    }
+
+    def __init__(self, queue, session_factory: Callable[[], Session] = SessionLocal, num_workers: int = JOB_WORKERS):
+        self.queue = queue
+        self.session_factory = session_factory
+        self.num_workers = num_workers
+        self._workers: List[asyncio.Task] = []
+        # Pending requeues of deferred jobs. Kept referenced so they are not garbage collected before they run.
+        self._requeues: Set[asyncio.Task] = set()
+
+    async def start(self):
+        """Starts the worker tasks on the running event loop."""
+        if self._workers:
+            return
+        self._workers = [asyncio.create_task(self._worker_loop()) for _ in range(self.num_workers)]
+
+    async def stop(self):
+        tasks = [*self._workers, *self._requeues]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._requeues.clear()
+
+    async def submit(self, db: Session, user_id: int, study_material_id: int, job_type: JobType, params: dict) -> GenerationJob:
+        """
+        Records a queued job and hands its id to the workers.
+        """
+        db_job = GenerationJob(
+            user_id=user_id,
+            study_material_id=study_material_id,
+            job_type=job_type.value,
+            status=JobStatus.queued.value,
+            params=params
+        )
+        await run_in_threadpool(self._save_job, db, db_job)
+        await self.queue.put(db_job.id)
+        return db_job
+
+    @staticmethod
+    def _save_job(db: Session, db_job: GenerationJob):
+        # Runs in the threadpool so the commit does not block the event loop
+        db.add(db_job)
+        db.commit()
+        db.refresh(db_job)
+
+    def get_job(self, db: Session, job_id: str, user_id: int) -> Optional[GenerationJob]:
+        return db.query(GenerationJob).filter(
+            GenerationJob.id == job_id,
+            GenerationJob.user_id == user_id
+        ).first()
+
+    async def _worker_loop(self):
+        while True:
+            job_id = await self.queue.get()
+            try:
+                await self.run_job(job_id)
+            except Exception:
+                logger.exception(f"Generation job {job_id} crashed")
+
+    async def _requeue_later(self, job_id: str, delay: float):
+        await asyncio.sleep(delay)
+        await self.queue.put(job_id)
+
+    def _schedule_requeue(self, job_id: str, delay: float):
+        task = asyncio.create_task(self._requeue_later(job_id, delay))
+        self._requeues.add(task)
+        task.add_done_callback(self._requeues.discard)
+
+    async def run_job(self, job_id: str):
+        """
+        Executes a single queued job. Jobs that are missing or no longer queued are skipped,
+        so a job id delivered twice is only run once. Every query and commit runs in the
+        threadpool; only the generation itself and the notifications run on the event loop.
+        """
+        db = self.session_factory()
+        try:
+            db_job = await run_in_threadpool(self._claim_job, db, job_id)
+            if db_job is None:
+                return
+
+            method_name, response_schema, event = self.GENERATORS[JobType(db_job.job_type)]
+            bind_llm_request(str(db_job.user_id))
+            try:
+                generate = getattr(NLPService(db), method_name)
+                result = await generate(db_job.study_material_id, **db_job.params)
+            except (LLMRateLimitExceeded, LLMUnavailableError) as e:
+                # The LLM budget is exhausted or the provider is degraded for now; put the job back instead of
+                # failing it, unless it has already been put back too often
+                if db_job.deferrals >= JOB_MAX_DEFERRALS:
+                    logger.warning(f"Generation job {job_id} failed after {db_job.deferrals} deferrals: {e}")
+                    job_payload = await run_in_threadpool(self._fail_job, db, db_job, str(e))
+                    await emit_to_user(str(db_job.user_id), "job_failed", job_payload)
+                    return
+                await run_in_threadpool(self._requeue_job, db, db_job)
+                delay = max(e.retry_after, min(JOB_DEFER_MAX_SECONDS, e.retry_after * 2 ** (db_job.deferrals - 1)))
+                logger.info(f"Generation job {job_id} deferred ({db_job.deferrals}/{JOB_MAX_DEFERRALS}) for {delay:.1f}s: {e}")
+                self._schedule_requeue(job_id, delay)
+                return
+            except Exception as e:
+                logger.error(f"Generation job {job_id} failed: {e}", exc_info=True)
+                job_payload = await run_in_threadpool(self._fail_job, db, db_job, str(e))
+                await emit_to_user(str(db_job.user_id), "job_failed", job_payload)
+                return
+
+            result_payload, job_payload = await run_in_threadpool(self._complete_job, db, db_job, result, response_schema)
+            await emit_to_user(str(db_job.user_id), event, result_payload)
+            await emit_to_user(str(db_job.user_id), "job_completed", job_payload)
+        finally:
+            await run_in_threadpool(db.close)
+
+    # The helpers below run in the threadpool. Each refreshes what it committed, so the
+    # event loop never reads an expired attribute and queries the database itself.
+
+    @staticmethod
+    def _claim_job(db: Session, job_id: str) -> Optional[GenerationJob]:
+        # One conditional UPDATE, so when two workers pop the same job only one of them moves it out of queued
+        claimed = db.query(GenerationJob).filter(
+            GenerationJob.id == job_id, GenerationJob.status == JobStatus.queued.value
+        ).update({GenerationJob.status: JobStatus.running.value}, synchronize_session=False)
+        db.commit()
+        if claimed == 0:
+            return None
+        return db.query(GenerationJob).filter(GenerationJob.id == job_id).one()
+
+    @staticmethod
+    def _requeue_job(db: Session, db_job: GenerationJob):
+        db.rollback()
+        db_job.status = JobStatus.queued.value
+        db_job.deferrals += 1
+        db.commit()
+        db.refresh(db_job)
+
+    @staticmethod
+    def _fail_job(db: Session, db_job: GenerationJob, error: str) -> dict:
+        db.rollback()
+        db_job.status = JobStatus.failed.value
+        db_job.error = error
+        db.commit()
+        return _event_payload(JobResponse, db_job)
+
+    @staticmethod
+    def _complete_job(db: Session, db_job: GenerationJob, result, response_schema) -> tuple:
+        # Serialised before the commit expires the result
+        result_payload = _event_payload(response_schema, result)
+        db_job.status = JobStatus.complete.value
+        db_job.result_id = result.id
+        db.commit()
+        return result_payload, _event_payload(JobResponse, db_job)
+
+
+def _build_job_queue():
+    if JOB_QUEUE_BACKEND == "redis":
+        if not REDIS_URL:
+            raise RuntimeError("JOB_QUEUE_BACKEND is 'redis' but REDIS_URL is not set.")
+        return RedisJobQueue(REDIS_URL)
+    return InMemoryJobQueue()
+
+
+job_service = JobService(_build_job_queue()) # Instantiate once per worker
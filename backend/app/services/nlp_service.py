@@ -1,14 +1,34 @@
-import spacy
+import asyncio
+import hashlib
+import json
 from enum import Enum
-from typing import List
+from functools import lru_cache
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Tuple, Union
+from spacy.language import Language
+from spacy.tokens import Doc
+from sqlalchemy import select
 from sqlalchemy.orm import Session # Import Session
+from starlette.concurrency import run_in_threadpool
 
 from backend.app.core.ai.summarization_module import SummarizationModule
 from backend.app.core.ai.flashcard_generation_module import FlashcardGenerationModule, Flashcard
 from backend.app.core.ai.quiz_generation_module import QuizGenerationModule, QuizQuestion
+from backend.app.core.ai.llm_resilience import LLMUnavailableError, llm_resilience
+from backend.app.core.ai.text_chunking import estimate_tokens, pack_chunks
+from backend.app.core.ai.generation_cache import normalize_text
 from backend.app.models.generated_summary import GeneratedSummary # Import GeneratedSummary
 from backend.app.models.generated_flashcard_set import GeneratedFlashcardSet # Import GeneratedFlashcardSet
 from backend.app.models.generated_quiz import GeneratedQuiz # Import GeneratedQuiz
+from backend.app.models.generated_content import GeneratedContent
+from backend.app.core.nlp_model_registry import nlp_model_registry
+from backend.app.core.config import (
+    GENERATION_REUSE_ENABLED,
+    GENERATION_TIMEOUT_SECONDS,
+    LLM_PROVIDER,
+    NLP_PIPE_BATCH_SIZE,
+    NLP_PIPE_PROCESSES,
+    SUMMARY_CHUNK_TOKENS,
+)
 
 # Define Intent categories
 class Intent(str, Enum):
@@ -29,13 +49,167 @@ class UserState(str, Enum):
     UNCERTAIN = "Uncertain"
     NEUTRAL = "Neutral" # Default state if no specific state is inferred
 
+# Define signal profiles: named subsets of signals a caller needs
+class SignalProfile(str, Enum):
+    INTENT_ONLY = "intent_only" # Tokens and question words for intent/state detection
+    STRUCTURE = "structure" # Adds sentence segmentation
+    FULL = "full" # Every signal, including lemmas, POS tags and named entities
+
+# Pipeline components each profile runs on top of the tokenizer. None runs the whole pipeline.
+PROFILE_COMPONENTS = {
+    SignalProfile.INTENT_ONLY: frozenset(),
+    SignalProfile.STRUCTURE: frozenset(["tok2vec", "parser", "senter", "sentencizer"]),
+    SignalProfile.FULL: None,
+}
+
+# Signals that only need the tokenizer and are computed for every profile
+LEXICAL_FIELDS = ("tokens", "found_question_words", "num_paragraphs", "num_alphanumeric_tokens", "unique_words", "average_word_length")
+SENTENCE_FIELDS = ("sentences", "num_sentences", "average_sentence_length")
+ANNOTATION_FIELDS = ("lemmas", "pos_tags", "named_entities")
+
+# Sentences kept by the extractive summary served while the LLM provider is unavailable
+FALLBACK_SUMMARY_SENTENCES = {"brief": 3, "normal": 6}
+
+PROFILE_FIELDS = {
+    SignalProfile.INTENT_ONLY: LEXICAL_FIELDS,
+    SignalProfile.STRUCTURE: LEXICAL_FIELDS + SENTENCE_FIELDS,
+    SignalProfile.FULL: LEXICAL_FIELDS + SENTENCE_FIELDS + ANNOTATION_FIELDS,
+}
+
+# Identify question words (simple heuristic)
+QUESTION_WORDS = frozenset(["who", "what", "where", "when", "why", "how", "which", "whom", "whose"])
+
+def extract_document_features(doc: Doc, profile: SignalProfile = SignalProfile.FULL) -> dict:
+    """
+    Computes the lexical, structural and density signals of a parsed document
+    in a single pass over its tokens. Signals outside the profile are None.
+
+    Sentence boundaries are taken from the tokens' sentence-start flags, so
+    sentences are sliced out of the existing Doc rather than re-parsed. A
+    document without sentence boundaries is treated as a single sentence.
+    """
+    fields = PROFILE_FIELDS[profile]
+    with_sentences = "sentences" in fields
+    with_annotations = "lemmas" in fields
+
+    tokens = []
+    lemmas = []
+    pos_tags = []
+    found_question_words = {} # Ordered set of lower-cased question words
+    sentences = []
+    unique_words = set()
+    num_alphanumeric_tokens = 0
+    total_word_length = 0
+    sentence_start = 0
+
+    for i, token in enumerate(doc):
+        # 1. Lexical Indicators (keywords, question words)
+        text = token.text
+        lower = text.lower()
+        tokens.append(text)
+        if with_annotations:
+            lemmas.append(token.lemma_)
+            pos_tags.append(token.pos_)
+        if lower in QUESTION_WORDS:
+            found_question_words[lower] = None
+
+        # 2. Structural Elements (sentences)
+        if with_sentences and i > 0 and token.is_sent_start:
+            sentences.append(doc[sentence_start:i].text)
+            sentence_start = i
+
+        # 3. Content Density and Complexity
+        if token.is_alpha:
+            num_alphanumeric_tokens += 1
+            total_word_length += len(text)
+            unique_words.add(lower)
+
+    features = {
+        "tokens": tokens,
+        "lemmas": None,
+        "pos_tags": None,
+        "found_question_words": list(found_question_words),
+        "sentences": None,
+        "num_sentences": None,
+        "num_alphanumeric_tokens": num_alphanumeric_tokens,
+        "unique_words": len(unique_words),
+        "average_word_length": total_word_length / num_alphanumeric_tokens if num_alphanumeric_tokens > 0 else 0,
+        "average_sentence_length": None,
+        "named_entities": None,
+    }
+
+    if with_sentences:
+        if tokens:
+            sentences.append(doc[sentence_start:len(tokens)].text)
+        num_sentences = len(sentences)
+        features["sentences"] = sentences
+        features["num_sentences"] = num_sentences
+        # Every token belongs to exactly one sentence, so the per-sentence
+        # alphabetic counts sum to the document total
+        features["average_sentence_length"] = num_alphanumeric_tokens / num_sentences if num_sentences > 0 else 0
+
+    if with_annotations:
+        features["lemmas"] = lemmas
+        features["pos_tags"] = pos_tags
+        # More advanced: Named Entity Recognition (NER)
+        features["named_entities"] = [(ent.text, ent.label_) for ent in doc.ents]
+
+    return features
+
+class GenerationTimeoutError(Exception):
+    """Raised when a generation module does not finish within its timeout."""
+
+    def __init__(self, artifact: str, timeout: float):
+        super().__init__(f"Generating the {artifact} timed out after {timeout} seconds.")
+        self.artifact = artifact
+        self.timeout = timeout
+
+def generation_fingerprint(
+    artifact: str,
+    template_version: str,
+    model_name: str,
+    temperature: float,
+    text: str,
+    **params
+) -> str:
+    """
+    Identifies a generation by everything its result depends on, as the generation cache key
+    does plus the LLM provider, so that an identical request, for any study material, can
+    reuse the stored result instead of calling the LLM. Stored results never expire, so a
+    change of provider, model or temperature must change the fingerprint.
+    """
+    payload = json.dumps(
+        {
+            "artifact": artifact,
+            "template_version": template_version,
+            "provider": LLM_PROVIDER,
+            "model_name": model_name,
+            "temperature": temperature,
+            "text": normalize_text(text),
+            "params": params,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+@lru_cache(maxsize=1)
+def get_shared_generation_modules() -> tuple:
+    """
+    Returns the generation modules shared by every NLPService in this worker.
+    The modules hold no per-request state, so building them once avoids
+    re-creating prompt templates and LLM clients on every request.
+    """
+    return SummarizationModule(), FlashcardGenerationModule(), QuizGenerationModule()
+
 class NLPService:
-    def __init__(self, db: Session): # Accept db session
-        # Load the English spaCy model
-        self.nlp = spacy.load("en_core_web_sm")
-        self.summarization_module = SummarizationModule()
-        self.flashcard_generation_module = FlashcardGenerationModule()
-        self.quiz_generation_module = QuizGenerationModule()
+    def __init__(self, db: Optional[Session] = None, nlp: Optional[Language] = None): # Accept db session
+        # Reuse the worker-wide spaCy pipeline instead of loading it per request
+        self.nlp = nlp if nlp is not None else nlp_model_registry.get()
+        (
+            self.summarization_module,
+            self.flashcard_generation_module,
+            self.quiz_generation_module,
+        ) = get_shared_generation_modules()
         self.db = db # Store db session
 
     def detect_intent(self, text: str, tokens: list[str], found_question_words: list[str]) -> tuple[Intent, float]:
@@ -107,62 +281,68 @@ class NLPService:
         return UserState.NEUTRAL, 0.1 # Default if no specific state is inferred
 
 
-    def process_text(self, text: str) -> dict:
-        doc = self.nlp(text)
-
-        # 1. Lexical Indicators (keywords, question words)
-        tokens = [token.text for token in doc]
-        lemmas = [token.lemma_ for token in doc]
-        pos_tags = [token.pos_ for token in doc]
-        
-        # Identify question words (simple heuristic)
-        question_words = ["who", "what", "where", "when", "why", "how", "which", "whom", "whose"]
-        found_question_words = [token.text.lower() for token in doc if token.text.lower() in question_words]
-
-        # 2. Structural Elements (sentences/paragraphs)
-        sentences = [sent.text for sent in doc.sents]
-        num_sentences = len(sentences)
-        num_paragraphs = text.count('\n\n') + 1 # Simple heuristic for paragraphs
+    def process_text(self, text: str, profile: SignalProfile = SignalProfile.FULL) -> dict:
+        """
+        Analyses a single text, running only the pipeline components the profile needs.
+        """
+        doc = self.nlp(text, disable=self._disabled_components(profile))
+        return self._build_signals(text, doc, profile)
 
-        # 3. Content Density and Complexity
-        # Number of alphanumeric tokens
-        alphanumeric_tokens = [token for token in doc if token.is_alpha]
-        num_alphanumeric_tokens = len(alphanumeric_tokens)
-        
-        # Number of unique words (ignoring case)
-        unique_words = len(set([token.text.lower() for token in alphanumeric_tokens]))
+    def process_texts(
+        self,
+        texts: Iterable[str],
+        batch_size: int = NLP_PIPE_BATCH_SIZE,
+        n_process: Optional[int] = None,
+        profile: SignalProfile = SignalProfile.FULL
+    ) -> Iterator[dict]:
+        """
+        Processes many texts through Language.pipe, yielding each text's signals
+        as soon as its Doc is ready. Results are yielded in input order.
+        Args:
+            texts: The texts to analyse.
+            batch_size: The number of texts spaCy buffers per batch.
+            n_process: The number of worker processes spaCy uses; defaults to NLP_PIPE_PROCESSES.
+            profile: The signal profile that decides which pipeline components run.
+        """
+        n_process = max(1, n_process or NLP_PIPE_PROCESSES)
+        # Texts are consumed by nlp.pipe and needed again to build the signals
+        texts = list(texts)
+        docs = self.nlp.pipe(
+            texts,
+            batch_size=batch_size,
+            n_process=n_process,
+            disable=self._disabled_components(profile)
+        )
+        for text, doc in zip(texts, docs):
+            yield self._build_signals(text, doc, profile)
 
-        # Average word length
-        total_word_length = sum(len(token.text) for token in alphanumeric_tokens)
-        average_word_length = total_word_length / num_alphanumeric_tokens if num_alphanumeric_tokens > 0 else 0
+    def _disabled_components(self, profile: SignalProfile) -> list[str]:
+        """
+        Returns the pipeline components a profile can skip.
+        The components are disabled per call rather than with nlp.select_pipes,
+        which would mutate the Language object shared by every request in the worker.
+        """
+        needed = PROFILE_COMPONENTS[profile]
+        if needed is None:
+            return []
+        return [name for name in self.nlp.pipe_names if name not in needed]
 
-        # Average sentence length (in words)
-        sentence_lengths = [len([token for token in self.nlp(sent).doc if token.is_alpha]) for sent in sentences]
-        average_sentence_length = sum(sentence_lengths) / num_sentences if num_sentences > 0 else 0
-        
-        # More advanced: Named Entity Recognition (NER)
-        named_entities = [(ent.text, ent.label_) for ent in doc.ents]
+    def _build_signals(self, text: str, doc: Doc, profile: SignalProfile) -> dict:
+        features = extract_document_features(doc, profile)
+        tokens = features["tokens"]
 
         # Detect intent
-        detected_intent, intent_confidence = self.detect_intent(text, tokens, found_question_words)
+        detected_intent, intent_confidence = self.detect_intent(text, tokens, features["found_question_words"])
 
         # Infer user state
         inferred_user_state, user_state_confidence = self.infer_user_state(text, tokens, detected_intent)
 
         signals = {
             "original_text": text,
-            "tokens": tokens,
-            "lemmas": lemmas,
-            "pos_tags": pos_tags,
-            "found_question_words": list(set(found_question_words)), # Remove duplicates
-            "sentences": sentences,
-            "num_sentences": num_sentences,
-            "num_paragraphs": num_paragraphs,
-            "num_alphanumeric_tokens": num_alphanumeric_tokens,
-            "unique_words": unique_words,
-            "average_word_length": average_word_length,
-            "average_sentence_length": average_sentence_length,
-            "named_entities": named_entities,
+            "profile": profile.value,
+            "computed_fields": list(PROFILE_FIELDS[profile]),
+            **features,
+            "num_paragraphs": text.count('\n\n') + 1, # Simple heuristic for paragraphs
             "detected_intent": detected_intent.value, # Store as string for Pydantic
             "intent_confidence": intent_confidence,
             "inferred_user_state": inferred_user_state.value, # Store as string for Pydantic
@@ -170,48 +350,328 @@ class NLPService:
         }
         return signals
 
+    def split_into_chunks(self, text: str, max_tokens: int = SUMMARY_CHUNK_TOKENS) -> List[str]:
+        """
+        Splits a long text into chunks of at most max_tokens for map-reduce summarization.
+        Paragraphs are separated on blank lines and segmented into sentences by the
+        spaCy pipeline, so chunks only break between sentences (or between words for
+        a sentence that is longer than a whole chunk).
+        """
+        paragraphs = [paragraph for paragraph in text.split("\n\n") if paragraph.strip()]
+        docs = self.nlp.pipe(paragraphs, disable=self._disabled_components(SignalProfile.STRUCTURE))
+        paragraph_sentences = [
+            extract_document_features(doc, SignalProfile.STRUCTURE)["sentences"] for doc in docs
+        ]
+        return pack_chunks(paragraph_sentences, max_tokens)
+
     def get_summary(self, study_material_id: int, text: str, detail_level: str = "normal") -> GeneratedSummary:
         """
         Generates a summary of the given text using the SummarizationModule and saves it to the database.
+        Texts longer than SUMMARY_CHUNK_TOKENS are summarized chunk by chunk. While the LLM
+        provider is unavailable, an extractive summary is saved instead.
         """
-        summary_content = self.summarization_module.generate_summary(text, detail_level)
-        
-        db_summary = GeneratedSummary(
-            study_material_id=study_material_id,
-            content=summary_content,
-            detail_level=detail_level
+        fingerprint = self._summary_fingerprint(text, detail_level)
+        reused = self._save_reused(GeneratedSummary, fingerprint, study_material_id=study_material_id, detail_level=detail_level)
+        if reused is not None:
+            return reused
+        try:
+            if estimate_tokens(text) > SUMMARY_CHUNK_TOKENS:
+                chunks = self.split_into_chunks(text, SUMMARY_CHUNK_TOKENS)
+                summary_content = self.summarization_module.generate_chunked_summary(chunks, detail_level, SUMMARY_CHUNK_TOKENS)
+            else:
+                summary_content = self.summarization_module.generate_summary(text, detail_level)
+        except LLMUnavailableError:
+            summary_content = self.fallback_summary(text, detail_level)
+            fingerprint = None # Not reusable: an identical request should get the LLM's summary once it is back
+        return self._save_summary(study_material_id, summary_content, detail_level, fingerprint)
+
+    async def aget_summary(self, study_material_id: int, text: str, detail_level: str = "normal") -> GeneratedSummary:
+        """
+        Async variant of get_summary; the LLM calls do not block the event loop.
+        """
+        fingerprint = self._summary_fingerprint(text, detail_level)
+        reused = await run_in_threadpool(
+            self._save_reused, GeneratedSummary, fingerprint, study_material_id=study_material_id, detail_level=detail_level
         )
-        self.db.add(db_summary)
-        self.db.commit()
-        self.db.refresh(db_summary)
-        return db_summary
+        if reused is not None:
+            return reused
+        summary_content, reusable = await self._agenerate_summary_content(text, detail_level)
+        return await run_in_threadpool(
+            self._save_summary, study_material_id, summary_content, detail_level, fingerprint if reusable else None
+        )
+
+    async def _agenerate_summary_content(self, text: str, detail_level: str) -> Tuple[str, bool]:
+        """Returns the summary and whether it may be reused, which the extractive fallback may not."""
+        try:
+            if estimate_tokens(text) > SUMMARY_CHUNK_TOKENS:
+                # Sentence segmentation is CPU-bound, so run it off the event loop
+                chunks = await run_in_threadpool(self.split_into_chunks, text, SUMMARY_CHUNK_TOKENS)
+                return await self.summarization_module.agenerate_chunked_summary(chunks, detail_level, SUMMARY_CHUNK_TOKENS), True
+            return await self.summarization_module.agenerate_summary(text, detail_level), True
+        except LLMUnavailableError:
+            return await run_in_threadpool(self.fallback_summary, text, detail_level), False
+
+    def fallback_summary(self, text: str, detail_level: str = "normal") -> str:
+        """
+        Extractive summary used while the LLM provider is unavailable: the leading
+        sentence of each paragraph, then the second ones and so on, until the
+        sentence budget for the detail level is spent, in document order.
+        """
+        llm_resilience.record_fallback()
+        budget = FALLBACK_SUMMARY_SENTENCES.get(detail_level, FALLBACK_SUMMARY_SENTENCES["normal"])
+        paragraphs = [paragraph for paragraph in text.split("\n\n") if paragraph.strip()]
+        docs = self.nlp.pipe(paragraphs, disable=self._disabled_components(SignalProfile.STRUCTURE))
+        paragraph_sentences = [
+            extract_document_features(doc, SignalProfile.STRUCTURE)["sentences"] for doc in docs
+        ]
+
+        picked = []
+        depth = 0
+        while len(picked) < budget and any(depth < len(sentences) for sentences in paragraph_sentences):
+            for paragraph_index, sentences in enumerate(paragraph_sentences):
+                if depth < len(sentences) and len(picked) < budget:
+                    picked.append((paragraph_index, depth))
+            depth += 1
+        return " ".join(paragraph_sentences[p][d].strip() for p, d in sorted(picked))
+
+    async def astream_summary(
+        self, study_material_id: int, text: str, detail_level: str = "normal"
+    ) -> AsyncIterator[Union[str, GeneratedSummary]]:
+        """
+        Streams a summary of the given text and saves it to the database once complete.
+        Yields the text deltas as the LLM produces them, then the saved GeneratedSummary
+        as the last item.
+        """
+        fingerprint = self._summary_fingerprint(text, detail_level)
+        reused = await run_in_threadpool(
+            self._save_reused, GeneratedSummary, fingerprint, study_material_id=study_material_id, detail_level=detail_level
+        )
+        if reused is not None:
+            yield reused.content
+            yield reused
+            return
+
+        if estimate_tokens(text) > SUMMARY_CHUNK_TOKENS:
+            chunks = await run_in_threadpool(self.split_into_chunks, text, SUMMARY_CHUNK_TOKENS)
+            deltas = self.summarization_module.astream_chunked_summary(chunks, detail_level, SUMMARY_CHUNK_TOKENS)
+        else:
+            deltas = self.summarization_module.astream_summary(text, detail_level)
+
+        parts = []
+        try:
+            async for delta in deltas:
+                parts.append(delta)
+                yield delta
+        except LLMUnavailableError:
+            # A stream that already delivered text cannot be swapped for the fallback
+            if parts:
+                raise
+            fallback = await run_in_threadpool(self.fallback_summary, text, detail_level)
+            parts.append(fallback)
+            fingerprint = None
+            yield fallback
+        yield await run_in_threadpool(self._save_summary, study_material_id, "".join(parts), detail_level, fingerprint)
 
     def get_flashcards(self, study_material_id: int, text: str) -> GeneratedFlashcardSet:
         """
         Generates flashcards from the given text using the FlashcardGenerationModule and saves them to the database.
         """
+        fingerprint = self._flashcards_fingerprint(text)
+        reused = self._save_reused(GeneratedFlashcardSet, fingerprint, study_material_id=study_material_id)
+        if reused is not None:
+            return reused
         flashcards_list = self.flashcard_generation_module.generate_flashcards(text)
-        
-        db_flashcard_set = GeneratedFlashcardSet(
-            study_material_id=study_material_id,
-            content=[fc.dict() for fc in flashcards_list] # Convert Pydantic models to dicts for JSON storage
-        )
-        self.db.add(db_flashcard_set)
-        self.db.commit()
-        self.db.refresh(db_flashcard_set)
-        return db_flashcard_set
+        return self._save_flashcards(study_material_id, flashcards_list, fingerprint)
+
+    async def aget_flashcards(self, study_material_id: int, text: str) -> GeneratedFlashcardSet:
+        """
+        Async variant of get_flashcards.
+        """
+        fingerprint = self._flashcards_fingerprint(text)
+        reused = await run_in_threadpool(self._save_reused, GeneratedFlashcardSet, fingerprint, study_material_id=study_material_id)
+        if reused is not None:
+            return reused
+        flashcards_list = await self.flashcard_generation_module.agenerate_flashcards(text)
+        return await run_in_threadpool(self._save_flashcards, study_material_id, flashcards_list, fingerprint)
 
     def get_quiz_questions(self, study_material_id: int, text: str) -> GeneratedQuiz:
         """
         Generates quiz questions from the given text using the QuizGenerationModule and saves them to the database.
         """
+        fingerprint = self._quiz_fingerprint(text)
+        reused = self._save_reused(GeneratedQuiz, fingerprint, study_material_id=study_material_id)
+        if reused is not None:
+            return reused
         quiz_questions_list = self.quiz_generation_module.generate_quiz(text)
-        
-        db_quiz = GeneratedQuiz(
+        return self._save_quiz(study_material_id, quiz_questions_list, fingerprint)
+
+    async def aget_quiz_questions(self, study_material_id: int, text: str) -> GeneratedQuiz:
+        """
+        Async variant of get_quiz_questions.
+        """
+        fingerprint = self._quiz_fingerprint(text)
+        reused = await run_in_threadpool(self._save_reused, GeneratedQuiz, fingerprint, study_material_id=study_material_id)
+        if reused is not None:
+            return reused
+        quiz_questions_list = await self.quiz_generation_module.agenerate_quiz(text)
+        return await run_in_threadpool(self._save_quiz, study_material_id, quiz_questions_list, fingerprint)
+
+    async def agenerate_all(
+        self,
+        study_material_id: int,
+        text: str,
+        detail_level: str = "normal",
+        timeout: float = GENERATION_TIMEOUT_SECONDS
+    ) -> Tuple[GeneratedSummary, GeneratedFlashcardSet, GeneratedQuiz]:
+        """
+        Generates a summary, flashcards and a quiz for the same text concurrently, so the
+        total latency is that of the slowest module rather than the sum of all three.
+        The three artifacts are committed in one transaction: if any module fails or
+        exceeds its timeout, nothing is saved. The modules that did finish still cache
+        their output, so a retry only waits on the one that failed.
+        Raises:
+            GenerationTimeoutError: If a module does not finish within timeout seconds.
+        """
+        async def with_timeout(artifact: str, generate, reused: Optional[GeneratedContent]):
+            if reused is not None:
+                return None
+            try:
+                return await asyncio.wait_for(generate(), timeout)
+            except asyncio.TimeoutError:
+                raise GenerationTimeoutError(artifact, timeout)
+
+        fingerprints = (self._summary_fingerprint(text, detail_level), self._flashcards_fingerprint(text), self._quiz_fingerprint(text))
+        summary_reused, flashcards_reused, quiz_reused = await run_in_threadpool(
+            lambda: [self._find_reusable(fingerprint) for fingerprint in fingerprints]
+        )
+        results = await asyncio.gather(
+            with_timeout("summary", lambda: self._agenerate_summary_content(text, detail_level), summary_reused),
+            with_timeout("flashcards", lambda: self.flashcard_generation_module.agenerate_flashcards(text), flashcards_reused),
+            with_timeout("quiz", lambda: self.quiz_generation_module.agenerate_quiz(text), quiz_reused),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        summary_result, flashcards_list, quiz_questions_list = results
+
+        if summary_reused is not None:
+            summary = GeneratedSummary(study_material_id=study_material_id, detail_level=detail_level, stored_content=summary_reused)
+        else:
+            summary_content, reusable = summary_result
+            summary = self._build_summary(study_material_id, summary_content, detail_level, fingerprints[0] if reusable else None)
+        artifacts = (
+            summary,
+            GeneratedFlashcardSet(study_material_id=study_material_id, stored_content=flashcards_reused)
+            if flashcards_reused is not None else self._build_flashcards(study_material_id, flashcards_list, fingerprints[1]),
+            GeneratedQuiz(study_material_id=study_material_id, stored_content=quiz_reused)
+            if quiz_reused is not None else self._build_quiz(study_material_id, quiz_questions_list, fingerprints[2]),
+        )
+        return await run_in_threadpool(self._save_all, artifacts)
+
+    def _summary_fingerprint(self, text: str, detail_level: str) -> str:
+        module = self.summarization_module
+        return generation_fingerprint(
+            "summary", module.PROMPT_TEMPLATE_VERSION, module.model_name, module.temperature, text, detail_level=detail_level
+        )
+
+    def _flashcards_fingerprint(self, text: str) -> str:
+        module = self.flashcard_generation_module
+        return generation_fingerprint("flashcards", module.PROMPT_TEMPLATE_VERSION, module.model_name, module.temperature, text)
+
+    def _quiz_fingerprint(self, text: str) -> str:
+        module = self.quiz_generation_module
+        return generation_fingerprint("quiz", module.PROMPT_TEMPLATE_VERSION, module.model_name, module.temperature, text)
+
+    def _find_reusable(self, fingerprint: str) -> Optional[GeneratedContent]:
+        """A copy of the content stored by an earlier generation with this fingerprint, if any."""
+        if not GENERATION_REUSE_ENABLED:
+            return None
+        stored = self.db.scalar(
+            select(GeneratedContent).where(GeneratedContent.source_sha256 == fingerprint)
+            .order_by(GeneratedContent.id.desc()).limit(1)
+        )
+        return stored.copy() if stored is not None else None
+
+    def _save_reused(self, model, fingerprint: str, **fields):
+        """Saves a new artifact with the content of an identical earlier generation, or returns None if there was none."""
+        reused = self._find_reusable(fingerprint)
+        if reused is None:
+            return None
+        artifact = model(stored_content=reused, **fields)
+        self.db.add(artifact)
+        self.db.commit()
+        self._refresh(artifact)
+        return artifact
+
+    def _build_summary(
+        self, study_material_id: int, summary_content: str, detail_level: str, fingerprint: Optional[str] = None
+    ) -> GeneratedSummary:
+        summary = GeneratedSummary(
+            study_material_id=study_material_id,
+            content=summary_content,
+            detail_level=detail_level
+        )
+        summary.stored_content.source_sha256 = fingerprint
+        return summary
+
+    def _build_flashcards(
+        self, study_material_id: int, flashcards_list: List[Flashcard], fingerprint: Optional[str] = None
+    ) -> GeneratedFlashcardSet:
+        flashcard_set = GeneratedFlashcardSet(
+            study_material_id=study_material_id,
+            content=[fc.dict() for fc in flashcards_list] # Convert Pydantic models to dicts for JSON storage
+        )
+        flashcard_set.stored_content.source_sha256 = fingerprint
+        return flashcard_set
+
+    def _build_quiz(
+        self, study_material_id: int, quiz_questions_list: List[QuizQuestion], fingerprint: Optional[str] = None
+    ) -> GeneratedQuiz:
+        quiz = GeneratedQuiz(
             study_material_id=study_material_id,
             content=[qq.dict() for qq in quiz_questions_list] # Convert Pydantic models to dicts for JSON storage
         )
+        quiz.stored_content.source_sha256 = fingerprint
+        return quiz
+
+    # The async methods run the _save_* helpers in the threadpool, so the sync session's I/O never blocks the event loop
+
+    def _save_all(self, artifacts: tuple) -> tuple:
+        self.db.add_all(artifacts)
+        self.db.commit()
+        for artifact in artifacts:
+            self._refresh(artifact)
+        return artifacts
+
+    def _refresh(self, artifact):
+        # Reload the content too, so building a response from the artifact never queries from the event loop
+        self.db.refresh(artifact)
+        self.db.refresh(artifact.stored_content)
+
+    def _save_summary(
+        self, study_material_id: int, summary_content: str, detail_level: str, fingerprint: Optional[str] = None
+    ) -> GeneratedSummary:
+        db_summary = self._build_summary(study_material_id, summary_content, detail_level, fingerprint)
+        self.db.add(db_summary)
+        self.db.commit()
+        self._refresh(db_summary)
+        return db_summary
+
+    def _save_flashcards(
+        self, study_material_id: int, flashcards_list: List[Flashcard], fingerprint: Optional[str] = None
+    ) -> GeneratedFlashcardSet:
+        db_flashcard_set = self._build_flashcards(study_material_id, flashcards_list, fingerprint)
+        self.db.add(db_flashcard_set)
+        self.db.commit()
+        self._refresh(db_flashcard_set)
+        return db_flashcard_set
+
+    def _save_quiz(
+        self, study_material_id: int, quiz_questions_list: List[QuizQuestion], fingerprint: Optional[str] = None
+    ) -> GeneratedQuiz:
+        db_quiz = self._build_quiz(study_material_id, quiz_questions_list, fingerprint)
         self.db.add(db_quiz)
         self.db.commit()
-        self.db.refresh(db_quiz)
+        self._refresh(db_quiz)
         return db_quiz
@@ -1,32 +1,58 @@
 import secrets
-from typing import Optional, Dict
+from typing import List, Optional
 
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
 
 from backend.app.models.study_material import StudyMaterial
 from backend.app.models.user import User
 from backend.app.models.shared_study_material import SharedStudyMaterial
-from backend.app.api.schemas import Permissions
+from backend.app.api.schemas import Permissions, SharedMaterialResponse
+
+def shared_material_response(share: SharedStudyMaterial, study_material: StudyMaterial) -> SharedMaterialResponse:
+    """Projects a share and the material it shares onto the SharedMaterialResponse every sharing endpoint returns."""
+    return SharedMaterialResponse(
+        id=share.id,
+        study_material_id=share.study_material_id,
+        file_name=study_material.file_name,
+        s3_key=study_material.s3_key,
+        shared_by_user_id=share.shared_by_user_id,
+        shared_with_user_id=share.shared_with_user_id,
+        share_token=share.share_token,
+        permissions=share.permissions,
+        created_at=share.created_at,
+        expires_at=share.expires_at,
+    )
+
+def shares_with_material():
+    """
+    Selects shares joined to their study material and loads it from the same row,
+    so a listing is one query however many shares it returns. Shares of deleted
+    materials drop out with the inner join.
+    """
+    return select(SharedStudyMaterial).join(SharedStudyMaterial.study_material).options(
+        contains_eager(SharedStudyMaterial.study_material)
+    )
 
 class SharingService:
-    def __init__(self, db: Session):
+    """Share links and user-to-user shares. Works on an AsyncSession, so every method must be awaited."""
+
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def generate_share_link(
+    async def generate_share_link(
         self, user_id: int, study_material_id: int, permissions: Permissions
     ) -> str:
         """
         Generates a unique share token for a study material and stores the sharing relationship.
         """
         # Ensure the user owns the study material
-        study_material = (
-            self.db.query(StudyMaterial)
-            .filter(
+        study_material = await self.db.scalar(
+            select(StudyMaterial).where(
                 StudyMaterial.id == study_material_id,
                 StudyMaterial.user_id == user_id
             )
-            .first()
         )
         if not study_material:
             raise ValueError("Study material not found or user does not own it.")
@@ -43,50 +69,45 @@ class SharingService:
             shared_with_user_id=None # This is a public link, not shared with a specific user
         )
         self.db.add(db_shared_material)
-        self.db.commit()
-        self.db.refresh(db_shared_material)
+        await self.db.commit()
 
         return share_token
 
-    def share_with_user(
+    async def share_with_user(
         self, shared_by_user_id: int, study_material_id: int, target_user_email: str, permissions: Permissions
-    ) -> SharedStudyMaterial:
+    ) -> SharedMaterialResponse:
         """
         Shares a study material with another user within the system by their email.
         """
         # Ensure the shared_by_user_id owns the study material
-        study_material = (
-            self.db.query(StudyMaterial)
-            .filter(
+        study_material = await self.db.scalar(
+            select(StudyMaterial).where(
                 StudyMaterial.id == study_material_id,
                 StudyMaterial.user_id == shared_by_user_id
             )
-            .first()
         )
         if not study_material:
             raise ValueError("Study material not found or owner does not own it.")
 
         # Find the target user by email
-        target_user = self.db.query(User).filter(User.email == target_user_email).first()
+        target_user = await self.db.scalar(select(User).where(User.email == target_user_email))
         if not target_user:
             raise ValueError("Target user with this email not found.")
 
         # Check if already shared with this user
-        existing_share = (
-            self.db.query(SharedStudyMaterial)
-            .filter(
+        existing_share = await self.db.scalar(
+            select(SharedStudyMaterial).where(
                 SharedStudyMaterial.study_material_id == study_material_id,
                 SharedStudyMaterial.shared_with_user_id == target_user.id
             )
-            .first()
         )
         if existing_share:
             # Optionally update permissions or raise an error
             existing_share.permissions = permissions.value
             self.db.add(existing_share)
-            self.db.commit()
-            self.db.refresh(existing_share)
-            return existing_share
+            await self.db.commit()
+            await self.db.refresh(existing_share)
+            return shared_material_response(existing_share, study_material)
 
         db_shared_material = SharedStudyMaterial(
             shared_by_user_id=shared_by_user_id,
@@ -96,26 +117,24 @@ class SharingService:
             share_token=None # Not a shareable link
         )
         self.db.add(db_shared_material)
-        self.db.commit()
-        self.db.refresh(db_shared_material)
-        return db_shared_material
+        await self.db.commit()
+        await self.db.refresh(db_shared_material)
+        return shared_material_response(db_shared_material, study_material)
 
-    def get_shared_material_by_token(
+    async def get_shared_material_by_token(
         self, share_token: str, current_user_id: Optional[int] = None
-    ) -> Optional[Dict]:
+    ) -> Optional[SharedMaterialResponse]:
         """
-        Retrieves shared material details by token.
+        Retrieves the share behind a token and the material it shares.
         If current_user_id is provided, it also checks if the user is the owner or
         explicitly shared with, or if it's a public link.
         """
-        shared_entry = (
-            self.db.query(SharedStudyMaterial)
-            .filter(SharedStudyMaterial.share_token == share_token)
-            .first()
+        shared_entry = await self.db.scalar(
+            shares_with_material().where(SharedStudyMaterial.share_token == share_token)
         )
 
         if not shared_entry:
-            return None
+            return None # Unknown token, or the material has been deleted
 
         # Check permissions:
         # 1. If it's a direct share to a user, and current_user_id matches
@@ -128,18 +147,25 @@ class SharingService:
         ):
             return None # Not authorized to access this specific share
 
-        study_material = (
-            self.db.query(StudyMaterial)
-            .filter(StudyMaterial.id == shared_entry.study_material_id)
-            .first()
-        )
-        if not study_material:
-            return None # Material might have been deleted
-
-        return {
-            "study_material_id": study_material.id,
-            "file_name": study_material.file_name,
-            "s3_key": study_material.s3_key,
-            "permissions": shared_entry.permissions,
-            "owner_id": study_material.user_id,
-        }
\ No newline at end of file
+        return shared_material_response(shared_entry, shared_entry.study_material)
+
+    async def list_shares_made(self, user_id: int, limit: int, before_id: Optional[int] = None) -> List[SharedMaterialResponse]:
+        """Shares the user made, newest first. See _list_shares."""
+        return await self._list_shares(SharedStudyMaterial.shared_by_user_id == user_id, limit, before_id)
+
+    async def list_shares_received(self, user_id: int, limit: int, before_id: Optional[int] = None) -> List[SharedMaterialResponse]:
+        """Shares made with the user, newest first. See _list_shares."""
+        return await self._list_shares(SharedStudyMaterial.shared_with_user_id == user_id, limit, before_id)
+
+    async def _list_shares(self, condition, limit: int, before_id: Optional[int]) -> List[SharedMaterialResponse]:
+        """
+        One page of shares matching condition, with their study materials, in one query.
+        Pages are keyed on the share id, which grows with creation time; before_id is the
+        last id of the previous page. Returns up to limit + 1 shares, so the caller can tell
+        whether there is a next page.
+        """
+        query = shares_with_material().where(condition)
+        if before_id is not None:
+            query = query.where(SharedStudyMaterial.id < before_id)
+        result = await self.db.scalars(query.order_by(SharedStudyMaterial.id.desc()).limit(limit + 1))
+        return [shared_material_response(share, share.study_material) for share in result]
@@ -1,21 +1,184 @@
 # backend/app/services/storage_service.py
 
-# Placeholder service for cloud storage operations (e.g., AWS S3)
+import hashlib
+import logging
+import os
+from typing import AsyncIterator, Optional
 
-async def upload_file_to_s3(file_data: bytes, file_name: str, bucket_name: str) -> str:
+from starlette.concurrency import run_in_threadpool
+
+from backend.app.core.config import (
+    S3_BUCKET,
+    S3_ENDPOINT_URL,
+    S3_REGION,
+    STORAGE_BACKEND,
+    STORAGE_LOCAL_ROOT,
+    STORAGE_PART_BYTES,
+)
+
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+class StoredObject:
+    """An object written by a storage backend, with the size and SHA-256 computed while it streamed."""
+
+    def __init__(self, key: str, size: int, sha256: str):
+        self.key = key
+        self.size = size
+        self.sha256 = sha256
+
+
+async def iter_parts(chunks: AsyncIterator[bytes], part_size: int) -> AsyncIterator[bytes]:
+    """Regroups a stream of chunks of any size into parts of part_size bytes; only the last may be smaller."""
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer += chunk
+        while len(buffer) >= part_size:
+            yield bytes(buffer[:part_size])
+            del buffer[:part_size]
+    if buffer:
+        yield bytes(buffer)
+
+
+class StorageBackend:
+    """Where uploaded files are kept. Implementations stream; none may buffer a whole object."""
+
+    async def save(self, key: str, chunks: AsyncIterator[bytes]) -> StoredObject:
+        """Writes the chunks to key, replacing any object there, and returns what was stored."""
+        raise NotImplementedError
+
+    async def delete(self, key: str):
+        """Removes the object at key; a missing object is not an error."""
+        raise NotImplementedError
+
+
+class LocalStorageBackend(StorageBackend):
     """
-    Placeholder function to simulate uploading a file to S3.
-    Returns a dummy S3 key.
+    Stores objects as files under a root directory, for development and single-host
+    deployments. Each upload is written to a temporary file next to its destination
+    and renamed into place once complete, so readers never see a partial file.
     """
-    print(f"Simulating upload of {file_name} to {bucket_name}")
-    # In a real implementation, this would use boto3 to upload to S3
-    s3_key = f"uploads/{file_name}"
-    return s3_key
 
-async def delete_file_from_s3(s3_key: str, bucket_name: str):
+    def __init__(self, root: str = STORAGE_LOCAL_ROOT, part_size: int = STORAGE_PART_BYTES):
+        self.root = os.path.abspath(root)
+        self.part_size = part_size
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if os.path.commonpath([self.root, path]) != self.root:
+            raise ValueError(f"Storage key escapes the storage root: {key}")
+        return path
+
+    async def save(self, key: str, chunks: AsyncIterator[bytes]) -> StoredObject:
+        path = self._path(key)
+        partial_path = f"{path}.partial"
+        await run_in_threadpool(os.makedirs, os.path.dirname(path), exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        handle = await run_in_threadpool(open, partial_path, "wb")
+        try:
+            async for part in iter_parts(chunks, self.part_size):
+                digest.update(part)
+                size += len(part)
+                await run_in_threadpool(handle.write, part)
+            await run_in_threadpool(handle.close)
+            await run_in_threadpool(os.replace, partial_path, path)
+        except BaseException:
+            handle.close()
+            await run_in_threadpool(_remove_if_exists, partial_path)
+            raise
+        return StoredObject(key, size, digest.hexdigest())
+
+    async def delete(self, key: str):
+        await run_in_threadpool(_remove_if_exists, self._path(key))
+
+
+def _remove_if_exists(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class S3StorageBackend(StorageBackend):
     """
-    Placeholder function to simulate deleting a file from S3.
+    Stores objects in an S3-compatible bucket (AWS S3, MinIO). Uploads larger than one
+    part go through a multipart upload, one part in memory at a time; a failed upload is
+    aborted so the bucket does not keep its parts.
     """
-    print(f"Simulating deletion of {s3_key} from {bucket_name}")
-    # In a real implementation, this would use boto3 to delete from S3
-    pass
\ No newline at end of file
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: Optional[str] = S3_ENDPOINT_URL,
+        region: Optional[str] = S3_REGION,
+        part_size: int = STORAGE_PART_BYTES,
+        client=None
+    ):
+        if client is None:
+            import boto3
+            client = boto3.client("s3", endpoint_url=endpoint_url, region_name=region)
+        self.client = client
+        self.bucket = bucket
+        self.part_size = part_size
+
+    async def save(self, key: str, chunks: AsyncIterator[bytes]) -> StoredObject:
+        digest = hashlib.sha256()
+        size = 0
+        parts = iter_parts(chunks, self.part_size)
+        first = await anext(parts, b"")
+        second = await anext(parts, None)
+        digest.update(first)
+        size += len(first)
+        if second is None:
+            # Fits in one part: a single PUT is one request instead of three
+            await run_in_threadpool(self.client.put_object, Bucket=self.bucket, Key=key, Body=first)
+            return StoredObject(key, size, digest.hexdigest())
+
+        upload = await run_in_threadpool(self.client.create_multipart_upload, Bucket=self.bucket, Key=key)
+        upload_id = upload["UploadId"]
+        completed = []
+        try:
+            completed.append(await self._upload_part(key, upload_id, 1, first))
+            part = second
+            while part is not None:
+                digest.update(part)
+                size += len(part)
+                completed.append(await self._upload_part(key, upload_id, len(completed) + 1, part))
+                part = await anext(parts, None)
+            await run_in_threadpool(
+                self.client.complete_multipart_upload,
+                Bucket=self.bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": completed}
+            )
+        except BaseException:
+            try:
+                await run_in_threadpool(self.client.abort_multipart_upload, Bucket=self.bucket, Key=key, UploadId=upload_id)
+            except Exception:
+                # Keep the upload's own error; the bucket's lifecycle rules have to clean up the parts
+                logger.exception("Could not abort multipart upload %s of %s", upload_id, key)
+            raise
+        return StoredObject(key, size, digest.hexdigest())
+
+    async def _upload_part(self, key: str, upload_id: str, number: int, body: bytes) -> dict:
+        response = await run_in_threadpool(
+            self.client.upload_part, Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=body
+        )
+        return {"PartNumber": number, "ETag": response["ETag"]}
+
+    async def delete(self, key: str):
+        await run_in_threadpool(self.client.delete_object, Bucket=self.bucket, Key=key)
+
+
+def _build_storage_backend():
+    if STORAGE_BACKEND == "s3":
+        if not S3_BUCKET:
+            raise RuntimeError("STORAGE_BACKEND is 's3' but S3_BUCKET is not set.")
+        return S3StorageBackend(S3_BUCKET)
+    return LocalStorageBackend()
+
+
+storage_backend = _build_storage_backend() # Instantiate once per worker
+
+
+def get_storage_backend():
+    return storage_backend
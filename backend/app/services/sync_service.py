@@ -0,0 +1,181 @@
+import datetime
+from typing import Dict, List, Tuple
+
+from sqlalchemy import event, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.util import identity_key
+
+from backend.app.models.change_log import ChangeLogEntry
+from backend.app.models.generated_flashcard_set import GeneratedFlashcardSet
+from backend.app.models.generated_quiz import GeneratedQuiz
+from backend.app.models.generated_summary import GeneratedSummary
+from backend.app.models.shared_study_material import SharedStudyMaterial
+from backend.app.models.study_material import StudyMaterial
+from backend.app.api.schemas import (
+    GeneratedFlashcardSetResponse,
+    GeneratedQuizResponse,
+    GeneratedSummaryResponse,
+    StudyMaterialListItem,
+    SyncChange,
+    SyncEntity,
+    SyncOperation,
+)
+from backend.app.services.sharing_service import shared_material_response, shares_with_material
+from backend.app.core.config import SYNC_SETTLE_SECONDS
+
+# Models whose changes are logged, and the entity type they are synced as
+TRACKED_ENTITIES = {
+    StudyMaterial: SyncEntity.study_material,
+    GeneratedSummary: SyncEntity.summary,
+    GeneratedFlashcardSet: SyncEntity.flashcard_set,
+    GeneratedQuiz: SyncEntity.quiz,
+    SharedStudyMaterial: SyncEntity.share,
+}
+
+# Generated artifact models and the schema each is synced with
+ARTIFACTS = {
+    SyncEntity.summary: (GeneratedSummary, GeneratedSummaryResponse),
+    SyncEntity.flashcard_set: (GeneratedFlashcardSet, GeneratedFlashcardSetResponse),
+    SyncEntity.quiz: (GeneratedQuiz, GeneratedQuizResponse),
+}
+
+
+def _material_owners(session: Session, material_ids: set) -> Dict[int, int]:
+    """Owner of each study material, from the identity map where possible and one query for the rest."""
+    owners = {}
+    for material_id in material_ids:
+        material = session.identity_map.get(identity_key(StudyMaterial, material_id))
+        if material is not None:
+            owners[material_id] = material.user_id
+    missing = material_ids - owners.keys()
+    if missing:
+        rows = session.connection().execute(
+            select(StudyMaterial.id, StudyMaterial.user_id).where(StudyMaterial.id.in_(missing))
+        )
+        owners.update({material_id: user_id for material_id, user_id in rows})
+    return owners
+
+
+@event.listens_for(Session, "after_flush")
+def record_changes(session: Session, flush_context):
+    """
+    Appends a change log entry for every tracked row the flush inserted, updated or
+    deleted, in the flush's own transaction, so the log commits or rolls back with
+    the change. Shares are logged for both the sharer and the recipient.
+    Bulk query.update()/delete() bypass flushes and are not logged; use the session.
+    """
+    changes = []
+    for operation, objects in (
+        (SyncOperation.upsert, session.new),
+        (SyncOperation.upsert, (obj for obj in session.dirty if session.is_modified(obj, include_collections=False))),
+        (SyncOperation.delete, session.deleted),
+    ):
+        changes.extend((obj, operation) for obj in objects if type(obj) in TRACKED_ENTITIES)
+    if not changes:
+        return
+
+    owners = _material_owners(session, {
+        obj.study_material_id for obj, _ in changes if isinstance(obj, (GeneratedSummary, GeneratedFlashcardSet, GeneratedQuiz))
+    })
+    changed_at = datetime.datetime.utcnow()
+    rows = []
+    for obj, operation in changes:
+        if isinstance(obj, StudyMaterial):
+            user_ids = [obj.user_id]
+        elif isinstance(obj, SharedStudyMaterial):
+            user_ids = [obj.shared_by_user_id] + ([obj.shared_with_user_id] if obj.shared_with_user_id else [])
+        else:
+            user_ids = [owners[obj.study_material_id]] if obj.study_material_id in owners else []
+        rows.extend(
+            {
+                "user_id": user_id,
+                "entity_type": TRACKED_ENTITIES[type(obj)].value,
+                "entity_id": obj.id,
+                "operation": operation.value,
+                "changed_at": changed_at,
+            }
+            for user_id in user_ids
+        )
+    if rows:
+        session.connection().execute(insert(ChangeLogEntry), rows)
+
+
+class SyncService:
+    """Incremental sync over the change log. Works on an AsyncSession, so every method must be awaited."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def changes_since(self, user_id: int, after_id: int, limit: int) -> Tuple[List[SyncChange], int, bool]:
+        """
+        Reads up to limit of the user's change log entries after after_id and compacts them
+        to the latest operation per entity, with the current state of every upserted one.
+
+        Returns:
+            The changes in log order, the id of the last entry read (after_id if there were
+            none), and whether more entries are waiting.
+        """
+        settled = datetime.datetime.utcnow() - datetime.timedelta(seconds=SYNC_SETTLE_SECONDS)
+        entries = (await self.db.execute(
+            select(ChangeLogEntry.id, ChangeLogEntry.entity_type, ChangeLogEntry.entity_id, ChangeLogEntry.operation)
+            .where(ChangeLogEntry.user_id == user_id, ChangeLogEntry.id > after_id, ChangeLogEntry.changed_at <= settled)
+            .order_by(ChangeLogEntry.id)
+            .limit(limit + 1)
+        )).all()
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+        if not entries:
+            return [], after_id, False
+
+        # Later entries for the same entity replace earlier ones and move it to their position
+        latest = {}
+        for _, entity_type, entity_id, operation in entries:
+            key = (SyncEntity(entity_type), entity_id)
+            latest.pop(key, None)
+            latest[key] = SyncOperation(operation)
+
+        upserts = {}
+        for (entity_type, entity_id), operation in latest.items():
+            if operation is SyncOperation.upsert:
+                upserts.setdefault(entity_type, []).append(entity_id)
+        states = await self._current_states(user_id, upserts)
+
+        changes = []
+        for (entity_type, entity_id), operation in latest.items():
+            data = states.get((entity_type, entity_id))
+            if operation is SyncOperation.upsert and data is None:
+                # Deleted by an entry past this page, or no longer visible to the user
+                operation = SyncOperation.delete
+            changes.append(SyncChange(entity_type=entity_type, entity_id=entity_id, operation=operation, data=data))
+        return changes, entries[-1].id, has_more
+
+    async def _current_states(self, user_id: int, ids: Dict[SyncEntity, List[int]]) -> Dict[Tuple[SyncEntity, int], dict]:
+        """Loads the entities the user can still see, one query per entity type."""
+        states = {}
+        if ids.get(SyncEntity.study_material):
+            materials = await self.db.scalars(select(StudyMaterial).where(
+                StudyMaterial.id.in_(ids[SyncEntity.study_material]), StudyMaterial.user_id == user_id
+            ))
+            for material in materials:
+                states[(SyncEntity.study_material, material.id)] = StudyMaterialListItem.from_material(material).dict(exclude_unset=True)
+
+        for entity_type, (model, schema) in ARTIFACTS.items():
+            if not ids.get(entity_type):
+                continue
+            artifacts = await self.db.scalars(
+                select(model).options(selectinload(model.stored_content))
+                .join(StudyMaterial, StudyMaterial.id == model.study_material_id)
+                .where(model.id.in_(ids[entity_type]), StudyMaterial.user_id == user_id)
+            )
+            for artifact in artifacts:
+                states[(entity_type, artifact.id)] = schema.from_orm(artifact).dict()
+
+        if ids.get(SyncEntity.share):
+            shares = await self.db.scalars(shares_with_material().where(
+                SharedStudyMaterial.id.in_(ids[SyncEntity.share]),
+                or_(SharedStudyMaterial.shared_by_user_id == user_id, SharedStudyMaterial.shared_with_user_id == user_id)
+            ))
+            for share in shares:
+                states[(SyncEntity.share, share.id)] = shared_material_response(share, share.study_material).dict()
+        return states
@@ -1,9 +1,11 @@
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from backend.main import app
-from backend.app.database import Base, get_db
+from backend.app.database import Base, get_db, get_async_db
 from backend.app.dependencies import get_current_user
 from backend.app.models.user import User
 from backend.app.models.study_material import StudyMaterial
@@ -20,6 +22,10 @@ engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# The async routes reach the same file through aiosqlite. NullPool, because every
+# TestClient runs the app on its own event loop and connections cannot move between loops.
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 # Override the get_db dependency for testing
 @pytest.fixture()
@@ -42,9 +48,14 @@ def mock_current_user(session):
     app.dependency_overrides[get_current_user] = lambda: user
     return user
 
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
 @pytest.fixture()
 def client(session, mock_current_user):
     app.dependency_overrides[get_db] = lambda: session
+    app.dependency_overrides[get_async_db] = override_get_async_db
     yield TestClient(app)
     app.dependency_overrides = {} # Clear overrides
 
@@ -100,7 +111,7 @@ def test_get_study_materials(client, mock_current_user, session):
 
     response = client.get("/api/v1/study-materials/")
     assert response.status_code == 200
-    data = response.json()
+    data = response.json()["items"]
     assert len(data) == 1
     assert data[0]["file_name"] == "lecture.pdf"
 
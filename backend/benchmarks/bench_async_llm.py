@@ -0,0 +1,104 @@
+# backend/benchmarks/bench_async_llm.py
+#
+# Load test for the async LLM path of the generation modules.
+#
+# Runs N concurrent summary requests on one event loop against a local fake chat
+# model with a fixed latency, once through the blocking generate_summary (what the
+# routes used to do inside async handlers) and once through agenerate_summary.
+# The blocking path serialises requests; the async path overlaps them.
+#
+# Usage (from the repository root):
+#   python -m backend.benchmarks.bench_async_llm
+#   python -m backend.benchmarks.bench_async_llm --latency 0.5 --concurrency 1 8 32
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from backend.app.core.ai.generation_cache import generation_cache
+from backend.app.core.ai.summarization_module import SummarizationModule
+
+
+class FixedLatencyChatModel(BaseChatModel):
+    """Fake chat model that answers after a fixed delay, blocking or awaiting as the caller does."""
+
+    latency: float = 0.2
+
+    @property
+    def _llm_type(self) -> str:
+        return "fixed-latency-fake"
+
+    def _result(self) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="A short fake summary."))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency)
+        return self._result()
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return self._result()
+
+
+async def run_blocking(summarizer: SummarizationModule, concurrency: int) -> float:
+    async def handler(i: int):
+        # Mirrors the old route: a sync LLM call inside an async handler
+        return summarizer.generate_summary(f"Document {i}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(handler(i) for i in range(concurrency)))
+    return time.perf_counter() - started
+
+
+async def run_async(summarizer: SummarizationModule, concurrency: int) -> float:
+    started = time.perf_counter()
+    await asyncio.gather(*(summarizer.agenerate_summary(f"Document {i}") for i in range(concurrency)))
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare blocking and async LLM calls under concurrency.")
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake LLM latency per call, in seconds.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64], help="Concurrent requests per run.")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    generation_cache.enabled = False # Every request must reach the fake LLM
+
+    summarizer = SummarizationModule()
+    summarizer.llm = FixedLatencyChatModel(latency=args.latency)
+
+    results = []
+    for concurrency in args.concurrency:
+        blocking_seconds = asyncio.run(run_blocking(summarizer, concurrency))
+        async_seconds = asyncio.run(run_async(summarizer, concurrency))
+        results.append({
+            "concurrency": concurrency,
+            "latency": args.latency,
+            "blocking_seconds": blocking_seconds,
+            "blocking_rps": concurrency / blocking_seconds,
+            "async_seconds": async_seconds,
+            "async_rps": concurrency / async_seconds,
+        })
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'concurrency':>11} {'blocking (s)':>13} {'blocking rps':>13} {'async (s)':>10} {'async rps':>10}")
+    for row in results:
+        print(
+            f"{row['concurrency']:>11} {row['blocking_seconds']:>13.2f} {row['blocking_rps']:>13.1f} "
+            f"{row['async_seconds']:>10.2f} {row['async_rps']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
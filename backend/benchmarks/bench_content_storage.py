@@ -0,0 +1,211 @@
+# backend/benchmarks/bench_content_storage.py
+#
+# Benchmark for where generated content is stored.
+#
+# Builds the same corpus of study materials, each with a summary, a flashcard set and
+# a quiz, in three SQLite databases migrated by Alembic:
+#   inline         - content in the artifact rows, the schema before 0004_generated_contents
+#   separate       - content in generated_contents, uncompressed
+#   separate_zstd  - content in generated_contents, zstd-compressed (needs zstandard)
+# and reports the database size after VACUUM and the latency of two reads per page
+# of materials: listing the artifacts (what every query over them costs) and loading
+# them with their content (what the detail endpoints do).
+#
+# Usage (from the repository root):
+#   python -m backend.benchmarks.bench_content_storage
+#   python -m backend.benchmarks.bench_content_storage --materials 5000 --summary-words 1200 --json
+
+import argparse
+import json
+import math
+import os
+import random
+import tempfile
+import time
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import JSON, Text, create_engine, insert, select, text
+from sqlalchemy.sql import column, table
+
+from backend.app.core import content_codec
+
+ALEMBIC_INI = os.path.join(os.path.dirname(__file__), "..", "alembic.ini")
+INLINE_REVISION = "0003_change_log"
+LAYOUTS = ("inline", "separate", "separate_zstd")
+ARTIFACT_TABLES = ("generated_summaries", "generated_flashcard_sets", "generated_quizzes")
+WORDS = (
+    "photosynthesis chloroplast light energy glucose oxygen carbon dioxide water cell membrane "
+    "enzyme reaction stroma thylakoid pigment chlorophyll wavelength electron transport gradient"
+).split()
+
+
+def percentile(sorted_values, percent: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, max(0, math.ceil(percent / 100 * len(sorted_values)) - 1))]
+
+
+def make_content(rng: random.Random, summary_words: int, cards: int, questions: int) -> dict:
+    def sentence(words: int) -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+    return {
+        "generated_summaries": " ".join(sentence(15) for _ in range(max(1, summary_words // 15))),
+        "generated_flashcard_sets": [{"question": sentence(10), "answer": sentence(20)} for _ in range(cards)],
+        "generated_quizzes": [
+            {"question": sentence(12), "options": [sentence(4) for _ in range(4)], "correct_answer": sentence(4)}
+            for _ in range(questions)
+        ],
+    }
+
+
+def migrate(url: str, revision: str):
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("sqlalchemy.url", url)
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, revision)
+
+
+def artifact_table(name: str, inline: bool):
+    columns = [column("id"), column("study_material_id"), column("generated_at")]
+    if name == "generated_summaries":
+        columns.append(column("detail_level"))
+    if inline:
+        columns.append(column("content", Text() if name == "generated_summaries" else JSON()))
+    else:
+        columns.append(column("content_id"))
+    return table(name, *columns)
+
+
+CONTENTS = table("generated_contents", column("id"), column("codec"), column("data"), column("size"))
+
+
+def encode(value, layout: str) -> dict:
+    raw = (value if isinstance(value, str) else json.dumps(value, separators=(",", ":"))).encode("utf-8")
+    if layout == "separate_zstd":
+        codec, data = content_codec.encode(raw)
+    else:
+        codec, data = content_codec.IDENTITY, raw
+    return {"codec": codec, "data": data, "size": len(raw)}
+
+
+def build(layout: str, path: str, corpus: list) -> object:
+    url = f"sqlite:///{path}"
+    migrate(url, INLINE_REVISION if layout == "inline" else "head")
+    db_engine = create_engine(url)
+    with db_engine.begin() as connection:
+        connection.execute(text("INSERT INTO users (id, auth_provider_id, email) VALUES (1, 'bench', 'bench@example.com')"))
+        connection.execute(
+            text("INSERT INTO study_materials (id, user_id, file_name, s3_key, upload_date) VALUES (:id, 1, :name, :name, CURRENT_TIMESTAMP)"),
+            [{"id": material_id, "name": f"notes-{material_id}.txt"} for material_id in range(1, len(corpus) + 1)]
+        )
+        for name in ARTIFACT_TABLES:
+            rows = []
+            for material_id, content in enumerate(corpus, start=1):
+                row = {"id": material_id, "study_material_id": material_id}
+                if name == "generated_summaries":
+                    row["detail_level"] = "normal"
+                if layout == "inline":
+                    row["content"] = content[name]
+                else:
+                    row["content_id"] = connection.execute(
+                        insert(CONTENTS).values(**encode(content[name], layout)).returning(CONTENTS.c.id)
+                    ).scalar_one()
+                rows.append(row)
+            connection.execute(insert(artifact_table(name, layout == "inline")), rows)
+    with db_engine.connect() as connection:
+        connection.execute(text("VACUUM"))
+        connection.execute(text("ANALYZE"))
+    return db_engine
+
+
+def list_artifacts(connection, layout: str, material_ids: list) -> int:
+    """Every artifact row of the page, as a query over artifacts without content reads it."""
+    rows = 0
+    for name in ARTIFACT_TABLES:
+        artifacts = artifact_table(name, layout == "inline")
+        rows += len(connection.execute(select(artifacts).where(artifacts.c.study_material_id.in_(material_ids))).all())
+    return rows
+
+
+def load_artifacts(connection, layout: str, material_ids: list) -> int:
+    """Every artifact of the page with its decoded content, as the detail endpoints return them."""
+    loaded = 0
+    for name in ARTIFACT_TABLES:
+        artifacts = artifact_table(name, layout == "inline")
+        if layout == "inline":
+            for row in connection.execute(select(artifacts).where(artifacts.c.study_material_id.in_(material_ids))):
+                loaded += row.content is not None
+            continue
+        query = (
+            select(artifacts, CONTENTS.c.codec, CONTENTS.c.data)
+            .join(CONTENTS, CONTENTS.c.id == artifacts.c.content_id)
+            .where(artifacts.c.study_material_id.in_(material_ids))
+        )
+        for row in connection.execute(query):
+            raw = content_codec.decode(row.codec, row.data)
+            loaded += (json.loads(raw) if name != "generated_summaries" else raw.decode("utf-8")) is not None
+    return loaded
+
+
+def time_reads(db_engine, layout: str, pages: list, read) -> dict:
+    timings = []
+    with db_engine.connect() as connection:
+        read(connection, layout, pages[0]) # Warm the page cache
+        for material_ids in pages:
+            started = time.perf_counter()
+            read(connection, layout, material_ids)
+            timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {"p50_ms": percentile(timings, 50), "p95_ms": percentile(timings, 95)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare inline, separate and compressed storage of generated content.")
+    parser.add_argument("--materials", type=int, default=2000, help="Study materials in each database.")
+    parser.add_argument("--summary-words", type=int, default=600, help="Approximate words per summary.")
+    parser.add_argument("--cards", type=int, default=20, help="Flashcards per set.")
+    parser.add_argument("--questions", type=int, default=10, help="Questions per quiz.")
+    parser.add_argument("--page-size", type=int, default=50, help="Materials read per request.")
+    parser.add_argument("--requests", type=int, default=200, help="Pages read per layout and read.")
+    parser.add_argument("--layouts", nargs="+", choices=LAYOUTS, default=list(LAYOUTS), help="Layouts to compare.")
+    parser.add_argument("--seed", type=int, default=7, help="Seed for the generated corpus and the pages read.")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+    args = parser.parse_args()
+
+    if "separate_zstd" in args.layouts and content_codec.WRITE_CODEC != content_codec.ZSTD:
+        parser.error("separate_zstd needs the zstandard package and CONTENT_COMPRESSION=zstd.")
+
+    rng = random.Random(args.seed)
+    corpus = [make_content(rng, args.summary_words, args.cards, args.questions) for _ in range(args.materials)]
+    pages = [rng.sample(range(1, args.materials + 1), min(args.page_size, args.materials)) for _ in range(args.requests)]
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for layout in args.layouts:
+            path = os.path.join(directory, f"{layout}.db")
+            db_engine = build(layout, path, corpus)
+            results.append({
+                "layout": layout,
+                "db_bytes": os.path.getsize(path),
+                "list": time_reads(db_engine, layout, pages, list_artifacts),
+                "load": time_reads(db_engine, layout, pages, load_artifacts),
+            })
+            db_engine.dispose()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"materials: {args.materials}, page size: {args.page_size}, summary words: {args.summary_words}")
+    print(f"{'layout':>14} {'db MB':>8} {'list p50':>9} {'list p95':>9} {'load p50':>9} {'load p95':>9}")
+    for row in results:
+        print(
+            f"{row['layout']:>14} {row['db_bytes'] / 1e6:>8.2f} {row['list']['p50_ms']:>9.2f} {row['list']['p95_ms']:>9.2f} "
+            f"{row['load']['p50_ms']:>9.2f} {row['load']['p95_ms']:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# backend/benchmarks/bench_nlp_features.py
+#
+# Microbenchmark for NLPService.process_text feature extraction.
+#
+# Compares the single-pass extractor against the previous implementation, which
+# walked the Doc once per signal and re-parsed every sentence to count words.
+#
+# Usage (from the repository root):
+#   python -m backend.benchmarks.bench_nlp_features
+#   python -m backend.benchmarks.bench_nlp_features --model en_core_web_sm --sizes 1000 10000
+
+import argparse
+import json
+import statistics
+import time
+from unittest.mock import MagicMock
+
+import spacy
+
+from backend.app.services.nlp_service import NLPService
+
+SAMPLE_SENTENCES = [
+    "Photosynthesis converts light energy into chemical energy stored in sugars.",
+    "How do chloroplasts capture sunlight during the light reactions?",
+    "The Calvin cycle fixes carbon dioxide into organic molecules.",
+    "Why is oxygen released as a by-product of splitting water?",
+    "Plants, algae and cyanobacteria are called photoautotrophs.",
+]
+
+
+def build_text(num_tokens: int, nlp) -> str:
+    """Repeats the sample sentences until the text holds roughly num_tokens tokens."""
+    tokens_per_round = sum(len(nlp.make_doc(sentence)) for sentence in SAMPLE_SENTENCES)
+    rounds = max(1, num_tokens // tokens_per_round)
+    paragraphs = [" ".join(SAMPLE_SENTENCES) for _ in range(rounds)]
+    return "\n\n".join(paragraphs)
+
+
+def legacy_features(nlp, text: str) -> dict:
+    """The multi-pass extraction that process_text used before the single-pass rewrite."""
+    doc = nlp(text)
+    tokens = [token.text for token in doc]
+    lemmas = [token.lemma_ for token in doc]
+    pos_tags = [token.pos_ for token in doc]
+    question_words = ["who", "what", "where", "when", "why", "how", "which", "whom", "whose"]
+    found_question_words = [token.text.lower() for token in doc if token.text.lower() in question_words]
+    sentences = [sent.text for sent in doc.sents]
+    num_sentences = len(sentences)
+    alphanumeric_tokens = [token for token in doc if token.is_alpha]
+    num_alphanumeric_tokens = len(alphanumeric_tokens)
+    unique_words = len(set([token.text.lower() for token in alphanumeric_tokens]))
+    total_word_length = sum(len(token.text) for token in alphanumeric_tokens)
+    average_word_length = total_word_length / num_alphanumeric_tokens if num_alphanumeric_tokens > 0 else 0
+    sentence_lengths = [len([token for token in nlp(sent).doc if token.is_alpha]) for sent in sentences]
+    average_sentence_length = sum(sentence_lengths) / num_sentences if num_sentences > 0 else 0
+    named_entities = [(ent.text, ent.label_) for ent in doc.ents]
+    return {
+        "tokens": tokens,
+        "lemmas": lemmas,
+        "pos_tags": pos_tags,
+        "found_question_words": list(set(found_question_words)),
+        "sentences": sentences,
+        "num_sentences": num_sentences,
+        "num_alphanumeric_tokens": num_alphanumeric_tokens,
+        "unique_words": unique_words,
+        "average_word_length": average_word_length,
+        "average_sentence_length": average_sentence_length,
+        "named_entities": named_entities,
+    }
+
+
+def time_call(func, repeat: int) -> float:
+    """Returns the median wall-clock time of func over repeat runs, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def load_pipeline(model_name: str):
+    if model_name == "blank":
+        nlp = spacy.blank("en")
+        nlp.add_pipe("sentencizer")
+    else:
+        nlp = spacy.load(model_name)
+    nlp.max_length = max(nlp.max_length, 2_000_000)
+    return nlp
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark NLPService.process_text feature extraction.")
+    parser.add_argument("--model", default="blank", help="spaCy model to load, or 'blank' for a model-free pipeline.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000], help="Input sizes in tokens.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the median is reported.")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+    args = parser.parse_args()
+
+    nlp = load_pipeline(args.model)
+    service = NLPService(db=MagicMock(), nlp=nlp)
+
+    results = []
+    for size in args.sizes:
+        text = build_text(size, nlp)
+        new = service.process_text(text)
+        old = legacy_features(nlp, text)
+        assert new["num_sentences"] == old["num_sentences"]
+        assert new["num_alphanumeric_tokens"] == old["num_alphanumeric_tokens"]
+
+        legacy_seconds = time_call(lambda: legacy_features(nlp, text), args.repeat)
+        single_pass_seconds = time_call(lambda: service.process_text(text), args.repeat)
+        results.append({
+            "model": args.model,
+            "tokens": len(new["tokens"]),
+            "legacy_seconds": legacy_seconds,
+            "single_pass_seconds": single_pass_seconds,
+            "speedup": legacy_seconds / single_pass_seconds if single_pass_seconds else None,
+        })
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'tokens':>8} {'legacy (s)':>12} {'single-pass (s)':>16} {'speedup':>8}")
+    for row in results:
+        print(f"{row['tokens']:>8} {row['legacy_seconds']:>12.4f} {row['single_pass_seconds']:>16.4f} {row['speedup']:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+# backend/benchmarks/bench_output_parsing.py
+#
+# Microbenchmark for parsing flashcard and quiz generations.
+#
+# Runs a synthetic corpus of LLM outputs (numbered text, bold or lowercase labels,
+# multi-line answers, JSON, fenced JSON and truncated outputs) through the parsers
+# the generation modules use now and through the previous regex parsers, and
+# reports throughput and yield (items recovered / items the output contained).
+#
+# Usage (from the repository root):
+#   python -m backend.benchmarks.bench_output_parsing
+#   python -m backend.benchmarks.bench_output_parsing --size 10000 --json
+
+import argparse
+import json
+import random
+import re
+import statistics
+import time
+
+from backend.app.core.ai.output_parsing import load_json_items, parse_flashcard_text, parse_quiz_text
+
+STYLES = ["numbered", "bold", "lowercase", "multiline", "json", "fenced_json", "truncated"]
+
+
+def build_flashcard_output(rng: random.Random, style: str, count: int):
+    """Returns a synthetic flashcard generation in the given style and the number of intact cards in it."""
+    cards = [(f"What is concept {i}?", f"Concept {i} is a key idea of the text.") for i in range(count)]
+    if style in ("json", "fenced_json"):
+        text = json.dumps([{"question": q, "answer": a} for q, a in cards], indent=2)
+        return (f"```json\n{text}\n```" if style == "fenced_json" else text), count
+
+    lines = []
+    for i, (question, answer) in enumerate(cards, start=1):
+        if style == "bold":
+            lines += [f"{i}. **Question:** {question}", f"**Answer:** {answer}"]
+        elif style == "lowercase":
+            lines += [f"- question: {question}", f"answer: {answer}"]
+        elif style == "multiline":
+            lines += [f"{i}) Question: {question}", f"Answer: {answer}", "It is explained in the second paragraph."]
+        else:
+            lines += [f"{i}. Question: {question}", f"Answer: {answer}"]
+        lines.append("")
+    if style == "truncated":
+        # The last card is cut off before its answer
+        lines = lines[:-2]
+        return "\n".join(lines), count - 1
+    return "\n".join(lines), count
+
+
+def build_quiz_output(rng: random.Random, style: str, count: int):
+    """Returns a synthetic quiz generation in the given style and the number of intact questions in it."""
+    questions = []
+    for i in range(count):
+        options = [f"Option {letter} for question {i}" for letter in "ABCD"]
+        questions.append((f"Which statement about topic {i} is true?", options, rng.choice("ABCD")))
+    if style in ("json", "fenced_json"):
+        text = json.dumps({"questions": [
+            {"question": q, "options": o, "correct_answer": c} for q, o, c in questions
+        ]}, indent=2)
+        return (f"```json\n{text}\n```" if style == "fenced_json" else text), count
+
+    lines = []
+    for i, (question, options, correct) in enumerate(questions, start=1):
+        if style == "bold":
+            lines += [f"{i}. **Question:** {question}", "**Options:**"]
+        elif style == "lowercase":
+            lines += [f"question: {question}", "options:"]
+        elif style == "multiline":
+            lines += [f"{i}. Question: {question.rstrip('?')}", "according to the text?", "Options:"]
+        else:
+            lines += [f"{i}. Question: {question}", "Options:"]
+        lines += [f"{letter}. {option}" for letter, option in zip("ABCD", options)]
+        lines += [f"Correct Answer: {correct}", ""]
+    if style == "truncated":
+        # The last question is cut off before its correct answer
+        lines = lines[:-2]
+        return "\n".join(lines), count - 1
+    return "\n".join(lines), count
+
+
+def legacy_parse_flashcards(llm_output: str) -> list:
+    """The DOTALL lookahead regex the flashcard module used before the single-pass parser."""
+    flashcards = []
+    flashcard_blocks = re.findall(
+        r"(?m)^\s*\d*[\.\)]?\s*Question:\s*(.*?)\s*Answer:\s*(.*?)(?=\n^\s*\d*[\.\)]?\s*Question:|\Z)",
+        llm_output,
+        re.DOTALL
+    )
+    for question, answer in flashcard_blocks:
+        question = question.strip()
+        answer = answer.strip()
+        if question and answer:
+            flashcards.append({"question": question, "answer": answer})
+    return flashcards
+
+
+def legacy_parse_quiz(llm_output: str) -> list:
+    """The split-and-match parser the quiz module used before the single-pass parser."""
+    quiz_questions = []
+    for block in llm_output.split("Question:"):
+        block = block.strip()
+        if not block:
+            continue
+        match_num = re.match(r"^\d+[\.\)]?\s*", block)
+        if match_num:
+            block = block[match_num.end():].strip()
+
+        question_text = ""
+        options = []
+        correct_answer = ""
+        lines = block.split('\n')
+        i = 0
+        if lines[i].strip().endswith('?'):
+            question_text = lines[i].strip()
+            i += 1
+        if i < len(lines) and lines[i].strip() == "Options:":
+            i += 1
+            while i < len(lines) and re.match(r"^[A-D]\.\s", lines[i].strip()):
+                options.append(lines[i].strip()[3:].strip())
+                i += 1
+        if i < len(lines) and lines[i].strip().startswith("Correct Answer:"):
+            correct_answer_raw = lines[i].strip()[len("Correct Answer:"):].strip()
+            match_correct_letter = re.match(r"^[A-D]", correct_answer_raw)
+            if match_correct_letter:
+                correct_answer = match_correct_letter.group(0)
+                for opt_idx, opt_text in enumerate(options):
+                    if chr(65 + opt_idx) == correct_answer:
+                        correct_answer = opt_text
+                        break
+        if question_text and options and correct_answer:
+            quiz_questions.append({"question": question_text, "options": options, "correct_answer": correct_answer})
+    return quiz_questions
+
+
+def parse_flashcards(llm_output: str) -> list:
+    """What FlashcardGenerationModule does before validation: JSON first, then the line parser."""
+    items = load_json_items(llm_output, "flashcards")
+    return items if items is not None else parse_flashcard_text(llm_output)
+
+
+def parse_quiz(llm_output: str) -> list:
+    """What QuizGenerationModule does before validation: JSON first, then the line parser."""
+    items = load_json_items(llm_output, "questions")
+    return items if items is not None else parse_quiz_text(llm_output)
+
+
+def build_corpus(size: int, builder, seed: int):
+    rng = random.Random(seed)
+    return [builder(rng, STYLES[i % len(STYLES)], rng.randint(3, 8)) for i in range(size)]
+
+
+def run(parse, corpus, repeat: int) -> dict:
+    """Parses the whole corpus repeat times; reports the median throughput and the yield."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parsed = [parse(output) for output, _ in corpus]
+        timings.append(time.perf_counter() - started)
+    seconds = statistics.median(timings)
+    recovered = sum(len(items) for items in parsed)
+    expected = sum(count for _, count in corpus)
+    return {
+        "seconds": seconds,
+        "outputs_per_second": len(corpus) / seconds if seconds else None,
+        "yield": recovered / expected if expected else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark flashcard and quiz output parsing.")
+    parser.add_argument("--size", type=int, default=10_000, help="Synthetic outputs per artifact type.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the median is reported.")
+    parser.add_argument("--seed", type=int, default=13, help="Seed for the synthetic corpus.")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results.")
+    args = parser.parse_args()
+
+    flashcard_corpus = build_corpus(args.size, build_flashcard_output, args.seed)
+    quiz_corpus = build_corpus(args.size, build_quiz_output, args.seed)
+
+    results = []
+    for artifact, corpus, legacy, current in (
+        ("flashcards", flashcard_corpus, legacy_parse_flashcards, parse_flashcards),
+        ("quiz", quiz_corpus, legacy_parse_quiz, parse_quiz),
+    ):
+        for parser_name, parse in (("legacy", legacy), ("single-pass", current)):
+            results.append({"artifact": artifact, "parser": parser_name, "outputs": len(corpus), **run(parse, corpus, args.repeat)})
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'artifact':>10} {'parser':>12} {'outputs/s':>11} {'yield':>7}")
+    for row in results:
+        print(f"{row['artifact']:>10} {row['parser']:>12} {row['outputs_per_second']:>11.0f} {row['yield']:>7.1%}")
+
+
+if __name__ == "__main__":
+    main()
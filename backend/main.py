@@ -1,4 +1,8 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from contextlib import asynccontextmanager
+import math
+from fastapi import FastAPI, Depends, HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session # Import Session for type hinting
 from backend.app.api.v1.auth import router as auth_router
 from backend.app.api.v1.study_materials import router as study_materials_router
@@ -7,14 +11,53 @@ from backend.app.api.v1.clarity import router as clarity_router
 from backend.app.api.v1.feedback import router as feedback_router
 from backend.app.api.v1.sharing import router as sharing_router # Import sharing router
 from backend.app.api.v1.export import router as export_router # Import export router
+from backend.app.api.v1.jobs import router as jobs_router
+from backend.app.api.v1.sync import router as sync_router
 from backend.app.dependencies import get_current_user
-from backend.app.database import init_db, get_db, Base # Import init_db, get_db, and Base
+from backend.app.database import init_db, get_db, Base, engine, async_engine, pool_stats # Import init_db, get_db, and Base
 from backend.app.models.user import User # Import SQLAlchemy User model
 from backend.app.models.study_material import StudyMaterial # Import SQLAlchemy StudyMaterial model
 from backend.app.models.feedback import Feedback # Import SQLAlchemy Feedback model
 from backend.app.core.websockets import socket_app # Import the Socket.IO app
+from backend.app.core.nlp_model_registry import nlp_model_registry
+from backend.app.core.ai.generation_cache import generation_cache
+from backend.app.core.ai.llm_client_pool import llm_client_pool
+from backend.app.core.ai.llm_governor import llm_governor, LLMRateLimitExceeded
+from backend.app.core.ai.llm_resilience import llm_resilience, LLMUnavailableError
+from backend.app.services.job_service import job_service
+from backend.app.core.config import NLP_PRELOAD_MODEL, NLP_WARMUP_MODEL
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the shared spaCy pipeline once per worker before serving requests
+    if NLP_PRELOAD_MODEL:
+        await run_in_threadpool(nlp_model_registry.preload, warmup=NLP_WARMUP_MODEL)
+    await job_service.start()
+    yield
+    await job_service.stop()
+    await llm_client_pool.aclose()
+    engine.dispose()
+    await async_engine.dispose()
+
+app = FastAPI(lifespan=lifespan)
+
+@app.exception_handler(LLMRateLimitExceeded)
+async def llm_rate_limit_exceeded_handler(request: Request, exc: LLMRateLimitExceeded):
+    # Shed load early so clients back off instead of waiting on requests that would time out
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))}
+    )
+
+@app.exception_handler(LLMUnavailableError)
+async def llm_unavailable_handler(request: Request, exc: LLMUnavailableError):
+    # The provider is degraded and there was no fallback; fail fast instead of hanging the request
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))}
+    )
 
 # Mount the Socket.IO app
 app.mount("/ws", socket_app)
@@ -28,6 +71,36 @@ app.mount("/ws", socket_app)
 def read_root():
     return {"status": "ok"}
 
+@app.get("/api/v1/health/nlp")
+def read_nlp_health():
+    """Reports load time and memory usage of the shared spaCy pipelines."""
+    return {"status": "ok", **nlp_model_registry.stats()}
+
+@app.get("/api/v1/health/generation-cache")
+def read_generation_cache_health():
+    """Reports hit/miss counters and occupancy of the LLM generation cache."""
+    return {"status": "ok", **generation_cache.stats()}
+
+@app.get("/api/v1/health/llm-clients")
+def read_llm_client_pool_health():
+    """Reports the shared LLM clients and the limits of their connection pool."""
+    return {"status": "ok", **llm_client_pool.stats()}
+
+@app.get("/api/v1/health/llm-governor")
+def read_llm_governor_health():
+    """Reports the LLM rate limits and how many calls were admitted, delayed or rejected."""
+    return {"status": "ok", **llm_governor.stats()}
+
+@app.get("/api/v1/health/llm-resilience")
+def read_llm_resilience_health():
+    """Reports the circuit state and how many LLM calls succeeded, were retried, hedged, failed or fell back."""
+    return {"status": "ok", **llm_resilience.stats()}
+
+@app.get("/api/v1/health/db-pool")
+def read_db_pool_health():
+    """Reports the database connection pool limits, connections in use and how long checkouts waited."""
+    return {"status": "ok", **pool_stats()}
+
 @app.get("/api/v1/protected")
 async def protected_route(current_user: dict = Depends(get_current_user)):
     return {"message": f"Hello, user {current_user['email']}! You have access to protected data."} # Assuming current_user will have 'email'
@@ -44,4 +117,6 @@ app.include_router(nlp_router, prefix="/api/v1")
 app.include_router(clarity_router, prefix="/api/v1")
 app.include_router(feedback_router, prefix="/api/v1")
 app.include_router(sharing_router, prefix="/api/v1") # Include sharing router
-app.include_router(export_router, prefix="/api/v1") # Include export router
\ No newline at end of file
+app.include_router(export_router, prefix="/api/v1") # Include export router
+app.include_router(jobs_router, prefix="/api/v1")
+app.include_router(sync_router, prefix="/api/v1")
\ No newline at end of file
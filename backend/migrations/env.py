@@ -0,0 +1,76 @@
+# backend/migrations/env.py
+#
+# Runs migrations against DATABASE_URL (see backend.app.database), or against the
+# connection a caller passes in config.attributes["connection"], as the tests do.
+
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine
+
+from backend.app.database import SQLALCHEMY_DATABASE_URL, Base
+# Import every model so Base.metadata describes the whole schema for autogenerate
+from backend.app.models import (  # noqa: F401
+    change_log,
+    feedback,
+    generated_content,
+    generated_flashcard_set,
+    generated_quiz,
+    generated_summary,
+    generation_job,
+    shared_study_material,
+    stored_file,
+    study_material,
+    user,
+)
+
+config = context.config
+
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+
+def database_url() -> str:
+    return config.get_main_option("sqlalchemy.url") or SQLALCHEMY_DATABASE_URL
+
+
+def run_migrations_offline() -> None:
+    """Writes the migration SQL to stdout instead of running it (alembic upgrade head --sql)."""
+    context.configure(
+        url=database_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations(connection) -> None:
+    # Batch mode lets SQLite, which cannot ALTER most constraints, run the same scripts
+    context.configure(connection=connection, target_metadata=target_metadata, render_as_batch=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        run_migrations(connection)
+        return
+    # A plain engine: migrations need neither the app's pool nor its statement_timeout
+    migration_engine = create_engine(database_url())
+    try:
+        with migration_engine.connect() as connection:
+            run_migrations(connection)
+    finally:
+        migration_engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,141 @@
+"""Initial schema
+
+The tables and indexes Base.metadata.create_all built before migrations were introduced.
+
+Revision ID: 0001_initial_schema
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_initial_schema'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('auth_provider_id', sa.String(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('is_verified', sa.Boolean(), nullable=True),
+    sa.Column('verification_token', sa.String(), nullable=True),
+    sa.Column('verification_token_expires_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_users_auth_provider_id', 'users', ['auth_provider_id'], unique=True)
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    op.create_index('ix_users_id', 'users', ['id'], unique=False)
+
+    op.create_table('feedback',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('material_id', sa.Integer(), nullable=False),
+    sa.Column('material_type', sa.String(), nullable=False),
+    sa.Column('rating', sa.Integer(), nullable=False),
+    sa.Column('comments', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_feedback_id', 'feedback', ['id'], unique=False)
+
+    op.create_table('study_materials',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('file_name', sa.String(), nullable=False),
+    sa.Column('s3_key', sa.String(), nullable=False),
+    sa.Column('upload_date', sa.DateTime(), nullable=True),
+    sa.Column('processing_status', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_study_materials_id', 'study_materials', ['id'], unique=False)
+
+    op.create_table('generated_flashcard_sets',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('study_material_id', sa.Integer(), nullable=False),
+    sa.Column('content', sa.JSON(), nullable=False),
+    sa.Column('generated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['study_material_id'], ['study_materials.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_generated_flashcard_sets_id', 'generated_flashcard_sets', ['id'], unique=False)
+
+    op.create_table('generated_quizzes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('study_material_id', sa.Integer(), nullable=False),
+    sa.Column('content', sa.JSON(), nullable=False),
+    sa.Column('generated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['study_material_id'], ['study_materials.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_generated_quizzes_id', 'generated_quizzes', ['id'], unique=False)
+
+    op.create_table('generated_summaries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('study_material_id', sa.Integer(), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('detail_level', sa.String(), nullable=True),
+    sa.Column('generated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['study_material_id'], ['study_materials.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_generated_summaries_id', 'generated_summaries', ['id'], unique=False)
+
+    op.create_table('generation_jobs',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('study_material_id', sa.Integer(), nullable=False),
+    sa.Column('job_type', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('params', sa.JSON(), nullable=False),
+    sa.Column('result_id', sa.Integer(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['study_material_id'], ['study_materials.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('shared_study_materials',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('study_material_id', sa.Integer(), nullable=False),
+    sa.Column('shared_by_user_id', sa.Integer(), nullable=False),
+    sa.Column('shared_with_user_id', sa.Integer(), nullable=True),
+    sa.Column('share_token', sa.String(), nullable=True),
+    sa.Column('permissions', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['shared_by_user_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['shared_with_user_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['study_material_id'], ['study_materials.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_shared_study_materials_id', 'shared_study_materials', ['id'], unique=False)
+    op.create_index('ix_shared_study_materials_share_token', 'shared_study_materials', ['share_token'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Dropping a table drops its indexes
+    for table in (
+        "shared_study_materials",
+        "generation_jobs",
+        "generated_summaries",
+        "generated_quizzes",
+        "generated_flashcard_sets",
+        "study_materials",
+        "feedback",
+        "users",
+    ):
+        op.drop_table(table)
@@ -0,0 +1,50 @@
+"""Indexes for the hot queries
+
+Filters on the owner of a study material, the study material of generated content,
+both sides of a share and the author of feedback used to scan their whole table.
+
+Revision ID: 0002_hot_query_indexes
+Revises: 0001_initial_schema
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_hot_query_indexes'
+down_revision: Union[str, Sequence[str], None] = '0001_initial_schema'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns)
+INDEXES = [
+    ('ix_study_materials_user_id_upload_date_id', 'study_materials', ['user_id', 'upload_date', 'id']),
+    ('ix_generated_summaries_study_material_id', 'generated_summaries', ['study_material_id']),
+    ('ix_generated_flashcard_sets_study_material_id', 'generated_flashcard_sets', ['study_material_id']),
+    ('ix_generated_quizzes_study_material_id', 'generated_quizzes', ['study_material_id']),
+    ('ix_shared_study_materials_shared_by_user_id', 'shared_study_materials', ['shared_by_user_id']),
+    ('ix_shared_study_materials_shared_with_user_id', 'shared_study_materials', ['shared_with_user_id']),
+    (
+        'ix_shared_study_materials_study_material_id_shared_with_user_id',
+        'shared_study_materials',
+        ['study_material_id', 'shared_with_user_id'],
+    ),
+    ('ix_feedback_user_id', 'feedback', ['user_id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # On Postgres, build the indexes without blocking writes; CONCURRENTLY cannot run in a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
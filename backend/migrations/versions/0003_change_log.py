@@ -0,0 +1,70 @@
+"""Change log for incremental sync
+
+Adds the append-only change_log table behind GET /sync and backfills one upsert
+entry per existing study material, generated artifact and share, so a client's
+first sync receives everything created before the log existed.
+
+Revision ID: 0003_change_log
+Revises: 0002_hot_query_indexes
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_change_log'
+down_revision: Union[str, Sequence[str], None] = '0002_hot_query_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    change_log = op.create_table('change_log',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('entity_type', sa.String(), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('operation', sa.String(), nullable=False),
+    sa.Column('changed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_change_log_user_id_id', 'change_log', ['user_id', 'id'], unique=False)
+
+    study_materials = sa.table('study_materials', sa.column('id'), sa.column('user_id'))
+    shares = sa.table(
+        'shared_study_materials', sa.column('id'), sa.column('shared_by_user_id'), sa.column('shared_with_user_id')
+    )
+    columns = ['user_id', 'entity_type', 'entity_id', 'operation', 'changed_at']
+    changed_at = sa.literal(datetime.datetime.utcnow(), sa.DateTime())
+
+    def upserts(entity_type, user_id, entity_id):
+        return [user_id, sa.literal(entity_type), entity_id, sa.literal('upsert'), changed_at]
+
+    backfills = [sa.select(*upserts('study_material', study_materials.c.user_id, study_materials.c.id))]
+    for entity_type, table_name in (
+        ('summary', 'generated_summaries'),
+        ('flashcard_set', 'generated_flashcard_sets'),
+        ('quiz', 'generated_quizzes'),
+    ):
+        artifacts = sa.table(table_name, sa.column('id'), sa.column('study_material_id'))
+        backfills.append(
+            sa.select(*upserts(entity_type, study_materials.c.user_id, artifacts.c.id))
+            .select_from(artifacts.join(study_materials, study_materials.c.id == artifacts.c.study_material_id))
+        )
+    backfills.append(sa.select(*upserts('share', shares.c.shared_by_user_id, shares.c.id)))
+    backfills.append(
+        sa.select(*upserts('share', shares.c.shared_with_user_id, shares.c.id))
+        .where(shares.c.shared_with_user_id.isnot(None))
+    )
+    for backfill in backfills:
+        op.execute(change_log.insert().from_select(columns, backfill))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('change_log')
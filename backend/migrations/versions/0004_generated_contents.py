@@ -0,0 +1,121 @@
+"""Move generated content to its own table
+
+Generated summaries, flashcard sets and quizzes kept their content inline, so every
+query over those rows read it too. The content moves to generated_contents, encoded
+with the configured codec (zstd by default), and each artifact keeps a content_id.
+
+Revision ID: 0004_generated_contents
+Revises: 0003_change_log
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from backend.app.core import content_codec
+
+# revision identifiers, used by Alembic.
+revision: str = '0004_generated_contents'
+down_revision: Union[str, Sequence[str], None] = '0003_change_log'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Each artifact table and the type its content column had
+ARTIFACT_TABLES = {
+    'generated_summaries': sa.Text(),
+    'generated_flashcard_sets': sa.JSON(),
+    'generated_quizzes': sa.JSON(),
+}
+BATCH_SIZE = 500
+
+
+def _to_bytes(value, column_type) -> bytes:
+    if isinstance(column_type, sa.JSON):
+        return json.dumps(value, separators=(',', ':')).encode('utf-8')
+    return value.encode('utf-8')
+
+
+def _from_bytes(raw: bytes, column_type):
+    if isinstance(column_type, sa.JSON):
+        return json.loads(raw)
+    return raw.decode('utf-8')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    contents = op.create_table('generated_contents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('codec', sa.String(), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_generated_contents_id'), 'generated_contents', ['id'], unique=False)
+
+    connection = op.get_bind()
+    for table_name, column_type in ARTIFACT_TABLES.items():
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.add_column(sa.Column('content_id', sa.Integer(), nullable=True))
+
+        artifacts = sa.table(table_name, sa.column('id'), sa.column('content', column_type), sa.column('content_id'))
+        # Copy in batches, keyed on id, so memory stays flat however many artifacts there are
+        last_id = 0
+        while True:
+            rows = connection.execute(
+                sa.select(artifacts.c.id, artifacts.c.content)
+                .where(artifacts.c.id > last_id).order_by(artifacts.c.id).limit(BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            for artifact_id, content in rows:
+                raw = _to_bytes(content, column_type)
+                codec, data = content_codec.encode(raw)
+                content_id = connection.execute(
+                    contents.insert().values(codec=codec, data=data, size=len(raw)).returning(contents.c.id)
+                ).scalar_one()
+                connection.execute(artifacts.update().where(artifacts.c.id == artifact_id).values(content_id=content_id))
+            last_id = rows[-1].id
+
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.alter_column('content_id', existing_type=sa.Integer(), nullable=False)
+            batch_op.create_index(batch_op.f(f'ix_{table_name}_content_id'), ['content_id'], unique=False)
+            batch_op.create_foreign_key(
+                batch_op.f(f'fk_{table_name}_content_id_generated_contents'), 'generated_contents', ['content_id'], ['id']
+            )
+            batch_op.drop_column('content')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    connection = op.get_bind()
+    contents = sa.table('generated_contents', sa.column('id'), sa.column('codec'), sa.column('data'))
+    for table_name, column_type in ARTIFACT_TABLES.items():
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.add_column(sa.Column('content', column_type, nullable=True))
+
+        artifacts = sa.table(table_name, sa.column('id'), sa.column('content', column_type), sa.column('content_id'))
+        last_id = 0
+        while True:
+            rows = connection.execute(
+                sa.select(artifacts.c.id, contents.c.codec, contents.c.data)
+                .select_from(artifacts.join(contents, contents.c.id == artifacts.c.content_id))
+                .where(artifacts.c.id > last_id).order_by(artifacts.c.id).limit(BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            for artifact_id, codec, data in rows:
+                content = _from_bytes(content_codec.decode(codec, data), column_type)
+                connection.execute(artifacts.update().where(artifacts.c.id == artifact_id).values(content=content))
+            last_id = rows[-1].id
+
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.alter_column('content', existing_type=column_type, nullable=False)
+            batch_op.drop_constraint(batch_op.f(f'fk_{table_name}_content_id_generated_contents'), type_='foreignkey')
+            batch_op.drop_index(batch_op.f(f'ix_{table_name}_content_id'))
+            batch_op.drop_column('content_id')
+
+    op.drop_index(op.f('ix_generated_contents_id'), table_name='generated_contents')
+    op.drop_table('generated_contents')
@@ -0,0 +1,34 @@
+"""Record the size and SHA-256 of uploaded study materials
+
+Both are computed while an upload streams to storage. Materials uploaded before
+keep null in both columns.
+
+Revision ID: 0005_study_material_checksum
+Revises: 0004_generated_contents
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0005_study_material_checksum'
+down_revision: Union[str, Sequence[str], None] = '0004_generated_contents'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('study_materials') as batch_op:
+        batch_op.add_column(sa.Column('size_bytes', sa.BigInteger(), nullable=True))
+        batch_op.add_column(sa.Column('content_sha256', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('study_materials') as batch_op:
+        batch_op.drop_column('content_sha256')
+        batch_op.drop_column('size_bytes')
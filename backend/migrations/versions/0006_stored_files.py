@@ -0,0 +1,63 @@
+"""Deduplicate uploaded files and reusable generations by content hash
+
+Uploads are kept once per distinct content in stored_files, reference counted by
+the study materials that point at it. Materials uploaded before keep a null
+stored_file_id and own their storage object outright. Generated content records
+the fingerprint of its input so identical generation requests can reuse it.
+
+Revision ID: 0006_stored_files
+Revises: 0005_study_material_checksum
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0006_stored_files'
+down_revision: Union[str, Sequence[str], None] = '0005_study_material_checksum'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('stored_files',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('storage_key', sa.String(), nullable=False),
+    sa.Column('size_bytes', sa.BigInteger(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('sha256')
+    )
+    op.create_index(op.f('ix_stored_files_id'), 'stored_files', ['id'], unique=False)
+
+    with op.batch_alter_table('study_materials') as batch_op:
+        batch_op.add_column(sa.Column('stored_file_id', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_study_materials_stored_file_id'), ['stored_file_id'], unique=False)
+        batch_op.create_foreign_key(
+            batch_op.f('fk_study_materials_stored_file_id_stored_files'), 'stored_files', ['stored_file_id'], ['id']
+        )
+
+    with op.batch_alter_table('generated_contents') as batch_op:
+        batch_op.add_column(sa.Column('source_sha256', sa.String(length=64), nullable=True))
+        batch_op.create_index(batch_op.f('ix_generated_contents_source_sha256'), ['source_sha256'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('generated_contents') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_generated_contents_source_sha256'))
+        batch_op.drop_column('source_sha256')
+
+    with op.batch_alter_table('study_materials') as batch_op:
+        batch_op.drop_constraint(batch_op.f('fk_study_materials_stored_file_id_stored_files'), type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_study_materials_stored_file_id'))
+        batch_op.drop_column('stored_file_id')
+
+    op.drop_index(op.f('ix_stored_files_id'), table_name='stored_files')
+    op.drop_table('stored_files')
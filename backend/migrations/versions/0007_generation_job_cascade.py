@@ -0,0 +1,49 @@
+"""Delete generation jobs with their study material
+
+generation_jobs.study_material_id referred to study_materials without ON DELETE,
+so deleting a material that ever had a job violated the foreign key. The key now
+cascades, and the column is indexed for the lookup the cascade does.
+
+Revision ID: 0007_generation_job_cascade
+Revises: 0006_stored_files
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0007_generation_job_cascade'
+down_revision: Union[str, Sequence[str], None] = '0006_stored_files'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FK_NAME = 'fk_generation_jobs_study_material_id_study_materials'
+# Names the foreign keys SQLite reflects without one, so batch mode can drop them
+NAMING_CONVENTION = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+
+
+def _study_material_fk_name() -> str:
+    for foreign_key in sa.inspect(op.get_bind()).get_foreign_keys('generation_jobs'):
+        if foreign_key['constrained_columns'] == ['study_material_id']:
+            return foreign_key['name'] or FK_NAME
+    return FK_NAME
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    fk_name = _study_material_fk_name()
+    with op.batch_alter_table('generation_jobs', naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint(fk_name, type_='foreignkey')
+        batch_op.create_foreign_key(FK_NAME, 'study_materials', ['study_material_id'], ['id'], ondelete='CASCADE')
+        batch_op.create_index(batch_op.f('ix_generation_jobs_study_material_id'), ['study_material_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('generation_jobs') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_generation_jobs_study_material_id'))
+        batch_op.drop_constraint(FK_NAME, type_='foreignkey')
+        batch_op.create_foreign_key(FK_NAME, 'study_materials', ['study_material_id'], ['id'])
@@ -0,0 +1,33 @@
+"""Count the deferrals of generation jobs
+
+A job put back on the queue because the LLM was rate limited or unavailable
+now counts how often that happened, so it can fail after too many deferrals
+instead of being requeued forever. Existing jobs start at 0.
+
+Revision ID: 0008_generation_job_deferrals
+Revises: 0007_generation_job_cascade
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0008_generation_job_deferrals'
+down_revision: Union[str, Sequence[str], None] = '0007_generation_job_cascade'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('generation_jobs') as batch_op:
+        batch_op.add_column(sa.Column('deferrals', sa.Integer(), nullable=False, server_default=sa.text('0')))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('generation_jobs') as batch_op:
+        batch_op.drop_column('deferrals')
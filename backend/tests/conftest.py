@@ -6,11 +6,21 @@ from backend.app.core.ai.uncertainty_resolution_module import UncertaintyResolut
 from backend.app.core.ai.exploratory_module import ExploratoryModule
 from langchain_core.messages import AIMessage
 import os
+import tempfile
+import uuid
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from backend.app.database import Base, get_db
+from sqlalchemy.pool import NullPool
+from backend.app.database import Base, get_db, get_async_db
+from backend.app.models.user import User
 from fastapi.testclient import TestClient
 from backend.main import app
+from backend.app.core.ai.generation_cache import generation_cache
+from backend.app.core.ai.llm_client_pool import llm_client_pool
+from backend.app.core.ai.llm_governor import llm_governor
+from backend.app.core.ai.llm_resilience import llm_resilience
+from backend.app.services.storage_service import LocalStorageBackend, get_storage_backend
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 
@@ -18,6 +28,10 @@ engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# The async routes reach the same file through aiosqlite. NullPool, because every
+# TestClient runs the app on its own event loop and connections cannot move between loops.
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 
 Base.metadata.create_all(bind=engine)
@@ -31,7 +45,38 @@ def override_get_db():
         db.close()
 
 
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
+
+# Uploads land in a throwaway directory instead of the configured storage
+storage_root = tempfile.TemporaryDirectory()
+test_storage = LocalStorageBackend(storage_root.name)
+app.dependency_overrides[get_storage_backend] = lambda: test_storage
+
+
+@pytest.fixture
+def db_session():
+    """A session on the test database for arranging rows and checking what the API wrote."""
+    db = next(app.dependency_overrides[get_db]())
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def make_user(db_session):
+    """Creates a user with a unique identity each time it is called."""
+    def make() -> User:
+        user = User(auth_provider_id=f"auth0|{uuid.uuid4().hex}", email=f"{uuid.uuid4().hex}@example.com")
+        db_session.add(user)
+        db_session.commit()
+        db_session.refresh(user)
+        return user
+    return make
 
 
 @pytest.fixture(scope="module")
@@ -39,6 +84,18 @@ def test_client():
     with TestClient(app) as client:
         yield client
 
+@pytest.fixture(autouse=True)
+def clear_generation_cache():
+    """Prevents cached LLM generations from leaking between tests."""
+    generation_cache.clear()
+    yield
+    generation_cache.clear()
+
+@pytest.fixture(autouse=True)
+def disable_generation_reuse(monkeypatch):
+    """Keeps generations stored by one test from being reused by another; reuse tests turn it back on."""
+    monkeypatch.setattr("backend.app.services.nlp_service.GENERATION_REUSE_ENABLED", False)
+
 @pytest.fixture(autouse=True)
 def mock_openai_chat_completion_global(mocker, monkeypatch):
     """
@@ -48,16 +105,15 @@ def mock_openai_chat_completion_global(mocker, monkeypatch):
 
     mock_llm_instance = MagicMock()
     
-    # Patch ChatOpenAI in summarization_module
-    mocker.patch('backend.app.core.ai.summarization_module.ChatOpenAI', return_value=mock_llm_instance)
-    # Patch ChatOpenAI in flashcard_generation_module
-    mocker.patch('backend.app.core.ai.flashcard_generation_module.ChatOpenAI', return_value=mock_llm_instance)
-    # Patch ChatOpenAI in uncertainty_resolution_module
-    mocker.patch('backend.app.core.ai.uncertainty_resolution_module.ChatOpenAI', return_value=mock_llm_instance)
-    # Patch ChatOpenAI in exploratory_module
-    mocker.patch('backend.app.core.ai.exploratory_module.ChatOpenAI', return_value=mock_llm_instance)
+    # Every AI module gets its ChatOpenAI client from the shared pool, so patch it there
+    # and drop any client a previous test left in the pool
+    llm_client_pool.reset()
+    llm_governor.reset()
+    llm_resilience.reset()
+    mocker.patch('backend.app.core.ai.llm_client_pool.ChatOpenAI', return_value=mock_llm_instance)
 
     yield mock_llm_instance
+    llm_client_pool.reset()
 
 @pytest.fixture
 def mock_llm_response():
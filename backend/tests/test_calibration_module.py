@@ -1,4 +1,15 @@
 import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
 
 def test_true():
-    assert True
\ No newline at end of file
+    assert True
+
+@pytest.mark.asyncio
+async def test_agenerate_question_uses_ainvoke(uncertainty_resolution_module):
+    """Test that the async calibration question path awaits chain.ainvoke."""
+    response = MagicMock(content="When you say 'memory', do you mean RAM?")
+    with patch('langchain_core.runnables.base.RunnableSequence.ainvoke', new_callable=AsyncMock, return_value=response) as mock_ainvoke:
+        question = await uncertainty_resolution_module.agenerate_question("Tell me about memory", {"key_term": "memory", "topic": "hardware"})
+
+    assert question == "When you say 'memory', do you mean RAM?"
+    mock_ainvoke.assert_awaited_once()
@@ -0,0 +1,197 @@
+import hashlib
+import os
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from backend.main import app
+from backend.app.core.ai.flashcard_generation_module import Flashcard
+from backend.app.core.ai.llm_resilience import LLMUnavailableError
+from backend.app.dependencies import get_current_user
+from backend.app.models.stored_file import StoredFile
+from backend.app.models.study_material import StudyMaterial
+from backend.app.models.user import User
+from backend.app.services.nlp_service import NLPService, generation_fingerprint
+from backend.app.services.file_store_service import FileStore
+from backend.app.services.storage_service import LocalStorageBackend, get_storage_backend
+
+
+def upload_as(test_client, user: User, content: bytes) -> dict:
+    app.dependency_overrides[get_current_user] = lambda: user
+    try:
+        created = test_client.post("/api/v1/study-materials/", files={"file": ("notes.txt", content, "text/plain")})
+    finally:
+        del app.dependency_overrides[get_current_user]
+    assert created.status_code == 201
+    return created.json()
+
+
+def delete_as(test_client, user: User, material_id: int):
+    app.dependency_overrides[get_current_user] = lambda: user
+    try:
+        assert test_client.delete(f"/api/v1/study-materials/{material_id}").status_code == 204
+    finally:
+        del app.dependency_overrides[get_current_user]
+
+
+def stored_file(db_session, content: bytes):
+    db_session.expire_all()
+    return db_session.query(StoredFile).filter(StoredFile.sha256 == hashlib.sha256(content).hexdigest()).one_or_none()
+
+
+def test_identical_uploads_are_stored_once(test_client, db_session, make_user):
+    content = f"Mitochondria are the powerhouse of the cell. {uuid.uuid4()}".encode() * 500
+    alice, bob = make_user(), make_user()
+    root = app.dependency_overrides[get_storage_backend]().root
+    blobs_before = set(os.listdir(os.path.join(root, "blobs"))) if os.path.isdir(os.path.join(root, "blobs")) else set()
+
+    first = upload_as(test_client, alice, content)
+    second = upload_as(test_client, bob, content)
+    other = upload_as(test_client, bob, content + b"!")
+
+    assert first["s3_key"] == second["s3_key"] != other["s3_key"]
+    assert set(os.listdir(os.path.join(root, "blobs"))) - blobs_before == {
+        first["s3_key"].split("/")[-1], other["s3_key"].split("/")[-1]
+    }
+    assert stored_file(db_session, content).ref_count == 2
+
+    path = os.path.join(root, first["s3_key"])
+    delete_as(test_client, alice, first["id"])
+    assert os.path.exists(path)
+    assert stored_file(db_session, content).ref_count == 1
+
+    delete_as(test_client, bob, second["id"])
+    assert not os.path.exists(path)
+    assert stored_file(db_session, content) is None
+    assert stored_file(db_session, content + b"!").ref_count == 1
+
+
+def test_materials_uploaded_before_deduplication_still_delete_their_file(test_client, db_session, make_user):
+    user = make_user()
+    storage = app.dependency_overrides[get_storage_backend]()
+    key = f"users/{user.id}/legacy.txt"
+    os.makedirs(os.path.join(storage.root, "users", str(user.id)), exist_ok=True)
+    with open(os.path.join(storage.root, key), "wb") as legacy:
+        legacy.write(b"Uploaded long ago.")
+    material = StudyMaterial(user_id=user.id, file_name="legacy.txt", s3_key=key)
+    db_session.add(material)
+    db_session.commit()
+
+    delete_as(test_client, user, material.id)
+
+    assert not os.path.exists(os.path.join(storage.root, key))
+
+
+@pytest.mark.asyncio
+async def test_upload_is_deleted_when_its_reference_cannot_be_taken(tmp_path):
+    async def chunks():
+        yield b"Cells divide."
+
+    db = MagicMock()
+    db.connection = AsyncMock(side_effect=ConnectionError("database went away"))
+    file_store = FileStore(db, LocalStorageBackend(str(tmp_path)))
+
+    with pytest.raises(ConnectionError):
+        await file_store.add(chunks())
+
+    assert os.listdir(tmp_path / "blobs") == []
+
+
+@pytest.fixture
+def reuse_enabled(monkeypatch):
+    monkeypatch.setattr("backend.app.services.nlp_service.GENERATION_REUSE_ENABLED", True)
+
+
+@pytest.fixture
+def materials(db_session, make_user):
+    user = make_user()
+    materials = [StudyMaterial(user_id=user.id, file_name="notes.txt", s3_key=f"blobs/{uuid.uuid4().hex}") for _ in range(2)]
+    db_session.add_all(materials)
+    db_session.commit()
+    return [material.id for material in materials]
+
+
+@pytest.fixture
+def blank_nlp():
+    import spacy
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    return nlp
+
+
+@pytest.mark.asyncio
+async def test_identical_generations_reuse_the_stored_result(db_session, materials, blank_nlp, reuse_enabled):
+    service = NLPService(db=db_session, nlp=blank_nlp)
+    text = f"Cells are the unit of life. {uuid.uuid4()}"
+    flashcard = Flashcard(question="What is a cell?", answer="The unit of life.")
+    with patch.object(service.summarization_module, "agenerate_summary", new_callable=AsyncMock, return_value="A summary.") as summarize, \
+         patch.object(service.flashcard_generation_module, "agenerate_flashcards", new_callable=AsyncMock, return_value=[flashcard]) as make_cards:
+        first = await service.aget_summary(materials[0], text)
+        # Whitespace differences do not change the generation input
+        second = await service.aget_summary(materials[1], f"  {text.replace(' ', '  ')} ")
+        cards = [await service.aget_flashcards(material_id, text) for material_id in materials]
+        other_level = await service.aget_summary(materials[1], text, detail_level="brief")
+
+    assert summarize.await_count == 2 # The first summary and the brief one
+    assert (first.content, second.content, other_level.content) == ("A summary.",) * 3
+    assert (first.study_material_id, second.study_material_id) == tuple(materials)
+    assert first.content_id != second.content_id # Each artifact owns its copy, so deleting one keeps the other
+    make_cards.assert_awaited_once()
+    assert cards[0].content == cards[1].content == [flashcard.dict()]
+
+
+@pytest.mark.asyncio
+async def test_agenerate_all_only_generates_what_was_not_stored(db_session, materials, blank_nlp, reuse_enabled):
+    service = NLPService(db=db_session, nlp=blank_nlp)
+    text = f"Cells are the unit of life. {uuid.uuid4()}"
+    with patch.object(service.summarization_module, "agenerate_summary", new_callable=AsyncMock, return_value="A summary."):
+        await service.aget_summary(materials[0], text)
+
+    with patch.object(service.summarization_module, "agenerate_summary", new_callable=AsyncMock) as summarize, \
+         patch.object(service.flashcard_generation_module, "agenerate_flashcards", new_callable=AsyncMock, return_value=[]), \
+         patch.object(service.quiz_generation_module, "agenerate_quiz", new_callable=AsyncMock, return_value=[]):
+        summary, flashcard_set, quiz = await service.agenerate_all(materials[1], text)
+
+    summarize.assert_not_awaited()
+    assert (summary.study_material_id, summary.content) == (materials[1], "A summary.")
+    assert (flashcard_set.content, quiz.content) == ([], [])
+
+
+@pytest.mark.asyncio
+async def test_fallback_summaries_are_not_reused(db_session, materials, blank_nlp, reuse_enabled):
+    service = NLPService(db=db_session, nlp=blank_nlp)
+    text = f"Cells are alive. They divide. {uuid.uuid4()}"
+    with patch.object(service.summarization_module, "agenerate_summary", new_callable=AsyncMock,
+                      side_effect=LLMUnavailableError("circuit open", 5)):
+        fallback = await service.aget_summary(materials[0], text)
+    with patch.object(service.summarization_module, "agenerate_summary", new_callable=AsyncMock, return_value="A summary."):
+        summary = await service.aget_summary(materials[1], text)
+
+    assert fallback.stored_content.source_sha256 is None
+    assert summary.content == "A summary."
+
+
+def test_fingerprint_covers_the_provider_model_and_temperature(monkeypatch):
+    fingerprint = generation_fingerprint("summary", "1", "gpt-4o", 0.5, "Cells divide.", detail_level="brief")
+
+    assert generation_fingerprint("summary", "1", "gpt-4o", 0.5, " Cells  divide. ", detail_level="brief") == fingerprint
+    assert generation_fingerprint("summary", "1", "gpt-4o-mini", 0.5, "Cells divide.", detail_level="brief") != fingerprint
+    assert generation_fingerprint("summary", "1", "gpt-4o", 0.2, "Cells divide.", detail_level="brief") != fingerprint
+    monkeypatch.setattr("backend.app.services.nlp_service.LLM_PROVIDER", "fake")
+    assert generation_fingerprint("summary", "1", "gpt-4o", 0.5, "Cells divide.", detail_level="brief") != fingerprint
+
+
+@pytest.mark.asyncio
+async def test_results_of_another_model_are_not_reused(db_session, materials, blank_nlp, reuse_enabled):
+    service = NLPService(db=db_session, nlp=blank_nlp)
+    text = f"Cells are the unit of life. {uuid.uuid4()}"
+    with patch.object(service.summarization_module, "agenerate_summary", new_callable=AsyncMock, return_value="Old model."):
+        await service.aget_summary(materials[0], text)
+
+    with patch.object(service.summarization_module, "model_name", "gpt-4o-mini"), \
+         patch.object(service.summarization_module, "agenerate_summary", new_callable=AsyncMock, return_value="New model.") as summarize:
+        summary = await service.aget_summary(materials[1], text)
+
+    summarize.assert_awaited_once()
+    assert summary.content == "New model."
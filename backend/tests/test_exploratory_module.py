@@ -1,4 +1,21 @@
 import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
 
 def test_true():
-    assert True
\ No newline at end of file
+    assert True
+
+@pytest.mark.asyncio
+async def test_agenerate_phrasing_uses_ainvoke(exploratory_module):
+    """Test that the async phrasing path awaits chain.ainvoke."""
+    response = MagicMock(content="Could you tell me more about recursion in programming?")
+    with patch('langchain_core.runnables.base.RunnableSequence.ainvoke', new_callable=AsyncMock, return_value=response) as mock_ainvoke:
+        phrasing = await exploratory_module.agenerate_phrasing("I'm lost", {"key_term": "recursion", "topic": "programming"})
+
+    assert phrasing == "Could you tell me more about recursion in programming?"
+    mock_ainvoke.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_agenerate_phrasing_fallback_without_context(exploratory_module):
+    """Test that missing context short-circuits before calling the LLM."""
+    phrasing = await exploratory_module.agenerate_phrasing("What is it?", {})
+    assert phrasing == "Could you please tell me more about what you're trying to understand?"
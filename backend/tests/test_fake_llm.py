@@ -0,0 +1,104 @@
+import asyncio
+import time
+import openai
+import pytest
+from unittest.mock import patch
+
+from backend.app.core.ai.fake_llm import FakeStudyChatModel
+from backend.app.core.ai.flashcard_generation_module import FlashcardGenerationModule
+from backend.app.core.ai.llm_client_pool import llm_client_pool
+from backend.app.core.ai.llm_resilience import LLMResilience, LLMUnavailableError
+from backend.app.core.ai.quiz_generation_module import QuizGenerationModule
+from backend.app.core.ai.summarization_module import SummarizationModule
+
+TEXT = (
+    "Photosynthesis converts light energy into chemical energy. "
+    "It takes place in the chloroplasts. "
+    "Oxygen is released as a by-product. "
+    "The Calvin cycle fixes carbon dioxide."
+)
+
+
+@pytest.fixture
+def fake_provider():
+    """Routes every pooled client to a fast, deterministic fake model."""
+    settings = dict(latency_seconds=0, tokens_per_second=0, seed=7)
+    with patch("backend.app.core.ai.llm_client_pool.LLM_PROVIDER", "fake"), \
+         patch("backend.app.core.ai.llm_client_pool.FakeStudyChatModel", side_effect=lambda: FakeStudyChatModel(**settings)):
+        llm_client_pool.reset()
+        yield
+    llm_client_pool.reset()
+
+
+def test_generation_modules_run_end_to_end_on_the_fake_provider(fake_provider):
+    summary = SummarizationModule().generate_summary(TEXT)
+    text_flashcards = FlashcardGenerationModule(structured_output=False).generate_flashcards(TEXT)
+    structured_flashcards = FlashcardGenerationModule(structured_output=True).generate_flashcards(TEXT)
+    quiz = QuizGenerationModule(structured_output=False).generate_quiz(TEXT)
+    structured_quiz = QuizGenerationModule(structured_output=True).generate_quiz(TEXT)
+
+    assert summary == (
+        "Photosynthesis converts light energy into chemical energy. "
+        "It takes place in the chloroplasts. "
+        "Oxygen is released as a by-product."
+    )
+    assert len(text_flashcards) == 4
+    assert text_flashcards == structured_flashcards
+    assert len(quiz) == 3
+    assert quiz == structured_quiz
+    assert all(question.correct_answer in question.options for question in quiz)
+    assert llm_client_pool.stats()["provider"] == "fake"
+
+
+@pytest.mark.asyncio
+async def test_summary_streams_token_by_token(fake_provider):
+    deltas = [delta async for delta in SummarizationModule().astream_summary(TEXT, detail_level="brief")]
+
+    assert len(deltas) > 1
+    assert "".join(deltas) == "Photosynthesis converts light energy into chemical energy."
+
+
+@pytest.mark.parametrize("distribution, low, high", [("constant", 0.1, 0.1), ("uniform", 0.05, 0.15)])
+def test_latency_distributions_stay_in_range(distribution, low, high):
+    llm = FakeStudyChatModel(latency_seconds=0.1, latency_distribution=distribution, latency_spread=0.5, seed=1)
+
+    samples = [llm.sample_latency() for _ in range(200)]
+
+    assert all(low <= sample <= high for sample in samples)
+
+
+def test_lognormal_latency_has_the_configured_median_and_is_seeded():
+    def make():
+        return FakeStudyChatModel(latency_seconds=0.2, latency_distribution="lognormal", latency_spread=0.5, seed=3)
+
+    first, second = make(), make()
+    samples = [first.sample_latency() for _ in range(2001)]
+
+    assert sorted(samples)[1000] == pytest.approx(0.2, rel=0.1)
+    assert max(samples) > 0.4 # Long tail
+    assert [second.sample_latency() for _ in range(2001)] == samples
+
+
+@pytest.mark.asyncio
+async def test_injected_errors_are_retryable_provider_errors():
+    llm = FakeStudyChatModel(latency_seconds=0, error_rate=1, error_kind="rate_limit")
+    with pytest.raises(openai.RateLimitError):
+        await llm.ainvoke("Summarize the following text:\n\nCells divide.\n\nSummary:")
+
+    resilience = LLMResilience(
+        timeout=1, max_retries=2, backoff_seconds=0, backoff_max_seconds=0, hedge=False,
+        hedge_percentile=95, hedge_min_samples=1, failure_threshold=0, reset_seconds=30
+    )
+    with pytest.raises(LLMUnavailableError):
+        await resilience.wrap(llm).ainvoke("Summarize the following text:\n\nCells divide.\n\nSummary:")
+    assert resilience.stats()["retried"] == 2
+
+
+@pytest.mark.asyncio
+async def test_async_calls_overlap():
+    llm = FakeStudyChatModel(latency_seconds=0.1, latency_distribution="constant")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(llm.ainvoke(f"Summarize the following text:\n\nDoc {i}.\n\nSummary:") for i in range(10)))
+
+    assert time.perf_counter() - started < 0.5
@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from backend.app.core.ai.flashcard_generation_module import FlashcardGenerationModule, Flashcard
 import os
 import json
@@ -83,4 +83,14 @@ def test_generate_flashcards_missing_api_key():
         flashcard_generator.generate_flashcards("some text")
 
     if original_api_key:
-        os.environ["OPENAI_API_KEY"] = original_api_key
\ No newline at end of file
+        os.environ["OPENAI_API_KEY"] = original_api_key
+
+@pytest.mark.asyncio
+async def test_agenerate_flashcards_parses_ainvoke_output():
+    """Test that the async variant awaits chain.ainvoke and parses its output."""
+    llm_output = "1. Question: What is 2 + 2?\nAnswer: 4\n2. Question: What is the capital of Spain?\nAnswer: Madrid"
+    with patch('langchain_core.runnables.base.RunnableSequence.ainvoke', new_callable=AsyncMock, return_value=llm_output) as mock_ainvoke:
+        flashcards = await FlashcardGenerationModule().agenerate_flashcards("Some text")
+
+    mock_ainvoke.assert_awaited_once_with({"text": "Some text"})
+    assert [fc.answer for fc in flashcards] == ["4", "Madrid"]
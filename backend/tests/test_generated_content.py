@@ -0,0 +1,113 @@
+import uuid
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.engine import Engine
+
+from backend.main import app
+from backend.app.core import content_codec
+from backend.app.database import get_db
+from backend.app.dependencies import get_current_user
+from backend.app.models.generated_content import GeneratedContent
+from backend.app.models.generated_quiz import GeneratedQuiz
+from backend.app.models.generated_summary import GeneratedSummary
+from backend.app.models.study_material import StudyMaterial
+from backend.app.models.user import User
+
+LONG_SUMMARY = "Photosynthesis turns light, water and carbon dioxide into sugar and oxygen. " * 40
+QUESTIONS = [{"question": "Where?", "options": ["Chloroplasts", "Nucleus"], "correct_answer": "Chloroplasts"}]
+
+
+@pytest.fixture
+def db_session():
+    db = next(app.dependency_overrides[get_db]())
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def study_material(db_session):
+    user = User(auth_provider_id=f"auth0|{uuid.uuid4().hex}", email=f"{uuid.uuid4().hex}@example.com")
+    db_session.add(user)
+    db_session.flush()
+    material = StudyMaterial(user_id=user.id, file_name="notes.txt", s3_key=f"users/{user.id}/notes.txt")
+    db_session.add(material)
+    db_session.flush()
+    db_session.add_all([
+        GeneratedSummary(study_material_id=material.id, content=LONG_SUMMARY, detail_level="detailed"),
+        GeneratedQuiz(study_material_id=material.id, content=QUESTIONS),
+    ])
+    db_session.commit()
+    app.dependency_overrides[get_current_user] = lambda: user
+    yield material
+    del app.dependency_overrides[get_current_user]
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+
+
+def test_content_round_trips_through_its_own_table(db_session, study_material):
+    db_session.expire_all()
+    summary = db_session.query(GeneratedSummary).filter(GeneratedSummary.study_material_id == study_material.id).one()
+    quiz = db_session.query(GeneratedQuiz).filter(GeneratedQuiz.study_material_id == study_material.id).one()
+
+    assert summary.content == LONG_SUMMARY
+    assert quiz.content == QUESTIONS
+    assert summary.stored_content.size == len(LONG_SUMMARY.encode("utf-8"))
+    assert summary.stored_content.codec == content_codec.WRITE_CODEC
+    if content_codec.WRITE_CODEC == content_codec.ZSTD:
+        assert len(summary.stored_content.data) < summary.stored_content.size
+    # Below the threshold compression does not pay, so the quiz is stored as it is
+    assert quiz.stored_content.codec == content_codec.IDENTITY
+
+
+def test_querying_artifacts_does_not_read_their_content(db_session, study_material):
+    statement = str(select(GeneratedSummary).compile())
+    assert "generated_contents" not in statement
+    assert "content_id" in statement
+
+
+def test_listing_leaves_content_unread_until_it_is_requested(test_client, study_material):
+    with count_statements() as statements:
+        listing = test_client.get("/api/v1/study-materials/")
+    assert listing.status_code == 200
+    assert not [statement for statement in statements if "generated_contents" in statement]
+
+    with count_statements() as statements:
+        summaries = test_client.get(f"/api/v1/study-materials/{study_material.id}/summaries")
+    assert summaries.status_code == 200
+    assert summaries.json()[0]["content"] == LONG_SUMMARY
+    assert len([statement for statement in statements if "generated_contents" in statement]) == 1
+
+    detail = test_client.get(f"/api/v1/study-materials/{study_material.id}")
+    assert detail.json()["generated_quizzes"][0]["content"] == QUESTIONS
+
+
+def test_deleting_a_material_deletes_its_content(test_client, db_session, study_material):
+    content_ids = [
+        content_id for (content_id,) in db_session.query(GeneratedSummary.content_id)
+        .filter(GeneratedSummary.study_material_id == study_material.id)
+    ]
+
+    response = test_client.delete(f"/api/v1/study-materials/{study_material.id}")
+
+    assert response.status_code == 204
+    db_session.expire_all()
+    assert db_session.query(GeneratedContent).filter(GeneratedContent.id.in_(content_ids)).count() == 0
+
+
+def test_decoding_an_unknown_codec_fails_loudly():
+    with pytest.raises(content_codec.UnsupportedCodecError):
+        content_codec.decode("brotli", b"...")
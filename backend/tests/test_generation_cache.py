@@ -0,0 +1,130 @@
+import pytest
+from backend.app.core.ai.generation_cache import GenerationCache, LRUTier, RedisTier
+
+class FakeRedis:
+    """Minimal stand-in for redis.Redis supporting get/set with an expiry."""
+    def __init__(self):
+        self.store = {}
+        self.expiries = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        self.store[key] = value.encode("utf-8")
+        self.expiries[key] = ex
+
+class FakeAsyncRedis(FakeRedis):
+    """Minimal stand-in for redis.asyncio.Redis over the same kind of store."""
+    async def get(self, key):
+        return FakeRedis.get(self, key)
+
+    async def set(self, key, value, ex=None):
+        FakeRedis.set(self, key, value, ex)
+
+class BlockingRedis:
+    """A synchronous client that must not be used from a coroutine."""
+    def get(self, key):
+        raise AssertionError("the synchronous Redis client blocked the event loop")
+
+    def set(self, key, value, ex=None):
+        raise AssertionError("the synchronous Redis client blocked the event loop")
+
+class BrokenRedis:
+    def get(self, key):
+        raise ConnectionError("redis is down")
+
+    def set(self, key, value, ex=None):
+        raise ConnectionError("redis is down")
+
+def make_key(text="Some text", **params):
+    return GenerationCache.make_key("summarization", "1", "gpt-4o", 0.5, text, **params)
+
+def test_make_key_is_content_addressed():
+    """Keys depend on every generation input but not on whitespace formatting."""
+    assert make_key("Some  text\n") == make_key("Some text")
+    assert make_key(detail_level="brief") != make_key(detail_level="normal")
+    assert make_key() != GenerationCache.make_key("summarization", "2", "gpt-4o", 0.5, "Some text")
+    assert make_key() != GenerationCache.make_key("summarization", "1", "gpt-4o", 0.7, "Some text")
+    assert make_key().startswith("gen:summarization:")
+
+def test_lru_tier_evicts_least_recently_used():
+    cache = GenerationCache(LRUTier(max_entries=2, ttl_seconds=60))
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1 # "a" is now the most recently used entry
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["memory_evictions"] == 1
+
+def test_lru_tier_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("backend.app.core.ai.generation_cache.time.monotonic", lambda: now[0])
+    cache = GenerationCache(LRUTier(max_entries=10, ttl_seconds=60))
+    cache.set("a", "summary")
+    assert cache.get("a") == "summary"
+
+    now[0] += 61
+    assert cache.get("a") is None
+
+def test_redis_tier_is_shared_and_backfills_memory():
+    fake_redis = FakeRedis()
+    writer = GenerationCache(LRUTier(10, 60), RedisTier(fake_redis, ttl_seconds=60))
+    reader = GenerationCache(LRUTier(10, 60), RedisTier(fake_redis, ttl_seconds=60))
+    writer.set("k", [{"question": "Q", "answer": "A"}])
+
+    assert fake_redis.expiries["k"] == 60
+    assert reader.get("k") == [{"question": "Q", "answer": "A"}]
+    assert reader.get("k") == [{"question": "Q", "answer": "A"}]
+    stats = reader.stats()
+    assert stats["redis_hits"] == 1
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 0
+
+def test_redis_errors_are_treated_as_misses():
+    cache = GenerationCache(LRUTier(10, 60), RedisTier(BrokenRedis(), ttl_seconds=60))
+    cache.set("k", "value") # Must not raise
+    cache.memory_tier.clear()
+
+    assert cache.get("k") is None
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["redis_errors"] == 2
+
+def test_disabled_cache_never_hits():
+    cache = GenerationCache(LRUTier(10, 60), enabled=False)
+    cache.set("k", "value")
+    assert cache.get("k") is None
+
+@pytest.mark.asyncio
+async def test_async_lookups_use_the_async_redis_client():
+    async_redis = FakeAsyncRedis()
+    writer = GenerationCache(LRUTier(10, 60), RedisTier(BlockingRedis(), 60, async_client=async_redis))
+    reader = GenerationCache(LRUTier(10, 60), RedisTier(BlockingRedis(), 60, async_client=async_redis))
+
+    await writer.aset("k", "value")
+
+    assert async_redis.expiries["k"] == 60
+    assert await reader.aget("k") == "value"
+    assert await reader.aget("missing") is None
+    assert (reader.stats()["redis_hits"], reader.stats()["misses"]) == (1, 1)
+
+@pytest.mark.asyncio
+async def test_async_lookups_without_an_async_client_run_in_the_threadpool():
+    import threading
+    threads = []
+
+    class RecordingRedis(FakeRedis):
+        def get(self, key):
+            threads.append(threading.current_thread())
+            return FakeRedis.get(self, key)
+
+    cache = GenerationCache(LRUTier(10, 60), RedisTier(RecordingRedis(), 60))
+    await cache.aset("k", "value")
+    cache.memory_tier.clear()
+
+    assert await cache.aget("k") == "value"
+    assert threading.current_thread() not in threads
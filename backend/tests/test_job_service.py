@@ -0,0 +1,246 @@
+import asyncio
+import threading
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.concurrency import run_in_threadpool
+
+from backend.app.database import Base
+from backend.app.models.user import User
+from backend.app.models.study_material import StudyMaterial
+from backend.app.models.generated_summary import GeneratedSummary
+from backend.app.models.generation_job import GenerationJob
+from backend.app.api.schemas import JobStatus, JobType
+from backend.app.services.job_service import InMemoryJobQueue, JobService
+from backend.app.core.ai.llm_governor import LLMRateLimitExceeded
+
+
+@pytest.fixture
+def session_factory():
+    """In-memory database shared by the test and the job workers."""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def study_material(session_factory):
+    db = session_factory()
+    user = User(auth_provider_id="auth0|jobs", email="jobs@example.com")
+    db.add(user)
+    db.commit()
+    material = StudyMaterial(user_id=user.id, file_name="notes.txt", s3_key="users/1/notes.txt")
+    db.add(material)
+    db.commit()
+    db.refresh(material)
+    db.close()
+    return material
+
+
+@pytest.fixture
+def job_service(session_factory):
+    return JobService(InMemoryJobQueue(), session_factory=session_factory, num_workers=1)
+
+
+@pytest.fixture
+def mock_emit():
+    with patch("backend.app.services.job_service.emit_to_user", new_callable=AsyncMock) as mock:
+        yield mock
+
+
+@pytest.fixture
+def mock_nlp_service(session_factory, study_material):
+    def save_summary(study_material_id, text, detail_level="normal"):
+        db = session_factory()
+        summary = GeneratedSummary(study_material_id=study_material_id, content=f"Summary of {text}", detail_level=detail_level)
+        db.add(summary)
+        db.commit()
+        db.refresh(summary)
+        db.refresh(summary.stored_content) # As NLPService does, so the summary can be serialized once detached
+        db.close()
+        return summary
+
+    instance = MagicMock()
+    instance.aget_summary = AsyncMock(side_effect=save_summary)
+    with patch("backend.app.services.job_service.NLPService", return_value=instance):
+        yield instance
+
+
+@pytest.mark.asyncio
+async def test_submit_persists_queued_job(job_service, session_factory, study_material):
+    db = session_factory()
+    job = await job_service.submit(db, study_material.user_id, study_material.id, JobType.summary, {"text": "Some text"})
+
+    assert job.status == JobStatus.queued.value
+    assert await job_service.queue.get() == job.id
+    assert job_service.get_job(db, job.id, study_material.user_id).id == job.id
+    assert job_service.get_job(db, job.id, study_material.user_id + 1) is None
+    db.close()
+
+
+@pytest.mark.asyncio
+async def test_run_job_completes_and_notifies(job_service, session_factory, study_material, mock_nlp_service, mock_emit):
+    db = session_factory()
+    job = await job_service.submit(
+        db, study_material.user_id, study_material.id, JobType.summary, {"text": "Some text", "detail_level": "brief"}
+    )
+
+    await job_service.run_job(job.id)
+
+    db.expire_all()
+    db_job = db.query(GenerationJob).filter(GenerationJob.id == job.id).one()
+    assert db_job.status == JobStatus.complete.value
+    assert db_job.result_id is not None
+    mock_nlp_service.aget_summary.assert_awaited_once_with(study_material.id, text="Some text", detail_level="brief")
+
+    events = [call.args[1] for call in mock_emit.await_args_list]
+    assert events == ["summary_created", "job_completed"]
+    assert mock_emit.await_args_list[1].args[2]["result_id"] == db_job.result_id
+    db.close()
+
+
+@pytest.mark.asyncio
+async def test_run_job_keeps_database_work_off_the_event_loop(job_service, session_factory, study_material, mock_nlp_service, mock_emit):
+    save_summary = mock_nlp_service.aget_summary.side_effect
+
+    async def asave_summary(*args, **kwargs):
+        # As NLPService does, whose own queries and commits run in the threadpool
+        return await run_in_threadpool(save_summary, *args, **kwargs)
+
+    mock_nlp_service.aget_summary.side_effect = asave_summary
+    db = session_factory()
+    job = await job_service.submit(db, study_material.user_id, study_material.id, JobType.summary, {"text": "Some text"})
+    threads = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        threads.append(threading.current_thread())
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        await job_service.run_job(job.id)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert threads
+    assert threading.current_thread() not in threads
+    db.close()
+
+
+@pytest.mark.asyncio
+async def test_run_job_records_failure(job_service, session_factory, study_material, mock_nlp_service, mock_emit):
+    mock_nlp_service.aget_summary.side_effect = RuntimeError("LLM unavailable")
+    db = session_factory()
+    job = await job_service.submit(db, study_material.user_id, study_material.id, JobType.summary, {"text": "Some text"})
+
+    await job_service.run_job(job.id)
+
+    db.expire_all()
+    db_job = db.query(GenerationJob).filter(GenerationJob.id == job.id).one()
+    assert db_job.status == JobStatus.failed.value
+    assert db_job.error == "LLM unavailable"
+    mock_emit.assert_awaited_once()
+    assert mock_emit.await_args.args[1] == "job_failed"
+    db.close()
+
+
+@pytest.mark.asyncio
+async def test_run_job_skips_jobs_that_already_ran(job_service, session_factory, study_material, mock_nlp_service, mock_emit):
+    db = session_factory()
+    job = await job_service.submit(db, study_material.user_id, study_material.id, JobType.summary, {"text": "Some text"})
+
+    await job_service.run_job(job.id)
+    await job_service.run_job(job.id)
+
+    mock_nlp_service.aget_summary.assert_awaited_once()
+    db.close()
+
+
+@pytest.mark.asyncio
+async def test_a_job_is_claimed_by_only_one_worker(job_service, session_factory, study_material):
+    db = session_factory()
+    job = await job_service.submit(db, study_material.user_id, study_material.id, JobType.summary, {"text": "Some text"})
+    # Both workers have read the job while it was still queued
+    first, second = session_factory(), session_factory()
+    seen = [session.get(GenerationJob, job.id) for session in (first, second)]
+    assert [seen_job.status for seen_job in seen] == [JobStatus.queued.value] * 2
+
+    assert JobService._claim_job(first, job.id).status == JobStatus.running.value
+    assert JobService._claim_job(second, job.id) is None
+    for session in (db, first, second):
+        session.close()
+
+
+@pytest.mark.asyncio
+async def test_workers_drain_the_queue(job_service, session_factory, study_material, mock_nlp_service, mock_emit):
+    db = session_factory()
+    await job_service.start()
+    try:
+        job = await job_service.submit(db, study_material.user_id, study_material.id, JobType.summary, {"text": "Some text"})
+        for _ in range(100):
+            db.expire_all()
+            if job_service.get_job(db, job.id, study_material.user_id).status == JobStatus.complete.value:
+                break
+            await asyncio.sleep(0.01)
+        assert job_service.get_job(db, job.id, study_material.user_id).status == JobStatus.complete.value
+    finally:
+        await job_service.stop()
+        db.close()
+
+
+@pytest.mark.asyncio
+async def test_run_job_requeues_when_llm_budget_is_exhausted(job_service, session_factory, study_material, mock_nlp_service, mock_emit):
+    mock_nlp_service.aget_summary.side_effect = LLMRateLimitExceeded("provider rate limit budget exhausted", 0.01)
+    db = session_factory()
+    job = await job_service.submit(db, study_material.user_id, study_material.id, JobType.summary, {"text": "Some text"})
+    assert await job_service.queue.get() == job.id
+
+    await job_service.run_job(job.id)
+
+    db.expire_all()
+    assert job_service.get_job(db, job.id, study_material.user_id).status == JobStatus.queued.value
+    assert await asyncio.wait_for(job_service.queue.get(), timeout=1) == job.id
+    mock_emit.assert_not_called()
+    db.close()
+
+
+@pytest.mark.asyncio
+async def test_run_job_fails_after_too_many_deferrals(job_service, session_factory, study_material, mock_nlp_service, mock_emit):
+    mock_nlp_service.aget_summary.side_effect = LLMRateLimitExceeded("provider rate limit budget exhausted", 0.001)
+    db = session_factory()
+    job = await job_service.submit(db, study_material.user_id, study_material.id, JobType.summary, {"text": "Some text"})
+    delays = []
+
+    with patch("backend.app.services.job_service.JOB_MAX_DEFERRALS", 3), \
+         patch.object(job_service, "_schedule_requeue", side_effect=lambda job_id, delay: delays.append(delay)):
+        for _ in range(4):
+            await job_service.run_job(job.id)
+
+    db.expire_all()
+    db_job = job_service.get_job(db, job.id, study_material.user_id)
+    assert (db_job.status, db_job.deferrals) == (JobStatus.failed.value, 3)
+    assert delays == [0.001, 0.002, 0.004] # Doubling from the provider's retry_after
+    assert [call.args[1] for call in mock_emit.await_args_list] == ["job_failed"]
+    db.close()
+
+
+@pytest.mark.asyncio
+async def test_stop_cancels_pending_requeues(job_service, session_factory, study_material, mock_nlp_service, mock_emit):
+    mock_nlp_service.aget_summary.side_effect = LLMRateLimitExceeded("provider rate limit budget exhausted", 60)
+    db = session_factory()
+    job = await job_service.submit(db, study_material.user_id, study_material.id, JobType.summary, {"text": "Some text"})
+    assert await job_service.queue.get() == job.id
+
+    await job_service.run_job(job.id)
+    requeues = set(job_service._requeues)
+    assert len(requeues) == 1
+
+    await job_service.stop()
+    assert all(task.cancelled() for task in requeues)
+    assert not job_service._requeues
+    db.close()
@@ -0,0 +1,68 @@
+import pytest
+from unittest.mock import MagicMock, patch
+
+from backend.app.core.ai.llm_client_pool import LLMClientPool, llm_client_pool
+from backend.app.core.ai.exploratory_module import ExploratoryModule
+from backend.app.core.ai.uncertainty_resolution_module import UncertaintyResolutionModule
+
+
+@pytest.fixture
+def chat_openai():
+    with patch("backend.app.core.ai.llm_client_pool.ChatOpenAI", side_effect=lambda **kwargs: MagicMock(**kwargs)) as mock:
+        yield mock
+
+
+def test_clients_are_shared_per_model_and_temperature(chat_openai):
+    pool = LLMClientPool(max_connections=10, max_keepalive_connections=5, keepalive_expiry=30)
+
+    first = pool.get("gpt-4o", 0.7)
+    second = pool.get("gpt-4o", 0.7)
+    other = pool.get("gpt-4o", 0.2)
+
+    assert first is second
+    assert other is not first
+    assert chat_openai.call_count == 2
+    assert pool.stats()["hits"] == 1
+    assert pool.stats()["misses"] == 2
+
+
+def test_clients_share_one_connection_pool(chat_openai):
+    pool = LLMClientPool(max_connections=10, max_keepalive_connections=5, keepalive_expiry=30)
+
+    pool.get("gpt-4o", 0.7)
+    pool.get("gpt-4o-mini", 0.5)
+
+    first_kwargs, second_kwargs = (call.kwargs for call in chat_openai.call_args_list)
+    assert first_kwargs["http_client"] is second_kwargs["http_client"]
+    assert first_kwargs["http_async_client"] is second_kwargs["http_async_client"]
+    assert first_kwargs["http_async_client"]._transport._pool._max_connections == 10
+
+
+@pytest.mark.asyncio
+async def test_aclose_forgets_clients(chat_openai):
+    pool = LLMClientPool(max_connections=10, max_keepalive_connections=5, keepalive_expiry=30)
+    pool.get("gpt-4o", 0.7)
+
+    await pool.aclose()
+
+    assert pool.stats()["clients"] == []
+    pool.get("gpt-4o", 0.7)
+    assert chat_openai.call_count == 2
+
+
+def test_modules_reuse_the_pooled_client():
+    """Modules built with the same model and temperature share one client."""
+    first = ExploratoryModule(temperature=0.7)
+    second = UncertaintyResolutionModule(temperature=0.7)
+
+    assert first.llm is second.llm
+    assert llm_client_pool.stats()["clients"] == [{"model_name": "gpt-4o", "temperature": 0.7}]
+
+
+def test_llm_client_pool_health_endpoint(test_client):
+    response = test_client.get("/api/v1/health/llm-clients")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ok"
+    assert "max_connections" in body
@@ -0,0 +1,123 @@
+import asyncio
+import time
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableLambda
+
+from backend.app.core.ai.llm_governor import LLMGovernor, LLMRateLimitExceeded, bind_llm_request, llm_user_id
+
+
+def make_governor(**overrides):
+    settings = dict(
+        requests_per_minute=0,
+        tokens_per_minute=0,
+        max_inflight_per_user=0,
+        max_wait_seconds=5,
+        completion_tokens_estimate=0,
+    )
+    settings.update(overrides)
+    return LLMGovernor(**settings)
+
+
+def slow_llm(seconds: float):
+    """A local fake LLM that answers after a delay."""
+    async def answer(prompt):
+        await asyncio.sleep(seconds)
+        return "answer"
+    return RunnableLambda(lambda prompt: "answer", afunc=answer)
+
+
+def test_calls_within_budget_are_admitted_immediately():
+    governor = make_governor(requests_per_minute=60, tokens_per_minute=6000)
+    llm = governor.wrap(RunnableLambda(lambda prompt: "answer"))
+
+    started = time.perf_counter()
+    assert [llm.invoke("short prompt") for _ in range(3)] == ["answer"] * 3
+
+    assert time.perf_counter() - started < 0.1
+    assert governor.stats()["admitted"] == 3
+    assert governor.stats()["rejected"] == 0
+
+
+def test_requests_per_minute_rejects_with_retry_after():
+    governor = make_governor(requests_per_minute=1, max_wait_seconds=1)
+    llm = governor.wrap(RunnableLambda(lambda prompt: "answer"))
+
+    llm.invoke("first")
+    with pytest.raises(LLMRateLimitExceeded) as excinfo:
+        llm.invoke("second")
+
+    # One request per minute: the next slot opens in about a minute
+    assert 55 < excinfo.value.retry_after <= 60
+    assert governor.stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_tokens_per_minute_delays_until_budget_refills():
+    # 600 tokens per minute refill at 10 tokens per second
+    governor = make_governor(tokens_per_minute=600, max_wait_seconds=2)
+    llm = governor.wrap(slow_llm(0))
+
+    await llm.ainvoke("x" * 2400) # About 600 tokens, drains the bucket
+    started = time.perf_counter()
+    await llm.ainvoke("x" * 20) # 5 tokens, available after about half a second
+
+    assert 0.4 < time.perf_counter() - started < 1.0
+    assert governor.stats()["total_wait_seconds"] > 0.4
+
+
+@pytest.mark.asyncio
+async def test_per_user_cap_keeps_one_user_from_taking_every_slot():
+    governor = make_governor(max_inflight_per_user=1)
+    llm = governor.wrap(slow_llm(0.1))
+
+    async def call_as(user_id):
+        llm_user_id.set(user_id)
+        return await llm.ainvoke("prompt")
+
+    results = await asyncio.gather(
+        call_as("alice"), call_as("alice"), call_as("bob"), return_exceptions=True
+    )
+
+    assert results[0] == "answer"
+    assert isinstance(results[1], LLMRateLimitExceeded)
+    assert results[2] == "answer"
+    # Slots are released once the calls finish
+    assert governor.stats()["users_in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_per_user_cap_counts_requests_not_the_calls_they_fan_out():
+    governor = make_governor(max_inflight_per_user=1)
+    llm = governor.wrap(slow_llm(0.1))
+
+    async def request_as(user_id, calls):
+        bind_llm_request(user_id)
+        return await asyncio.gather(*(llm.ainvoke("prompt") for _ in range(calls)))
+
+    results = await asyncio.gather(
+        request_as("alice", 3), request_as("alice", 1), request_as("bob", 2), return_exceptions=True
+    )
+
+    assert results[0] == ["answer"] * 3
+    assert isinstance(results[1], LLMRateLimitExceeded)
+    assert results[2] == ["answer"] * 2
+    assert governor.stats()["users_in_flight"] == 0
+    # Once the request's calls are done its slot is free for the next request
+    assert await request_as("alice", 2) == ["answer"] * 2
+
+
+@pytest.mark.asyncio
+async def test_streaming_chain_is_governed():
+    governor = make_governor(requests_per_minute=60)
+    fake = GenericFakeChatModel(messages=iter([AIMessage(content="streamed answer here")]))
+    chain = ChatPromptTemplate.from_messages([("user", "{text}")]) | governor.wrap(fake) | StrOutputParser()
+
+    deltas = [delta async for delta in chain.astream({"text": "hello"})]
+
+    assert "".join(deltas) == "streamed answer here"
+    assert len(deltas) > 1
+    assert governor.stats()["admitted"] == 1
@@ -0,0 +1,189 @@
+import asyncio
+import time
+import httpx
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from backend.app.core.ai.llm_governor import LLMRateLimitExceeded
+from backend.app.core.ai.llm_resilience import CircuitBreaker, LLMResilience, LLMUnavailableError
+
+
+def make_resilience(**overrides):
+    settings = dict(
+        timeout=1,
+        max_retries=2,
+        backoff_seconds=0,
+        backoff_max_seconds=0,
+        hedge=False,
+        hedge_percentile=95,
+        hedge_min_samples=1,
+        failure_threshold=0,
+        reset_seconds=30,
+    )
+    settings.update(overrides)
+    return LLMResilience(**settings)
+
+
+def flaky_llm(failures: int, error=httpx.ConnectError("connection refused")):
+    """A local fake LLM that fails the first few calls and then answers."""
+    calls = []
+
+    def answer(prompt):
+        calls.append(prompt)
+        if len(calls) <= failures:
+            raise error
+        return "answer"
+
+    async def aanswer(prompt):
+        return answer(prompt)
+
+    return RunnableLambda(answer, afunc=aanswer), calls
+
+
+def test_retryable_errors_are_retried():
+    resilience = make_resilience()
+    llm, calls = flaky_llm(failures=2)
+
+    assert resilience.wrap(llm).invoke("prompt") == "answer"
+
+    assert len(calls) == 3
+    assert resilience.stats()["retried"] == 2
+    assert resilience.stats()["succeeded"] == 1
+
+
+def test_exhausted_retries_raise_unavailable():
+    resilience = make_resilience(max_retries=1)
+    llm, calls = flaky_llm(failures=5)
+
+    with pytest.raises(LLMUnavailableError, match="ConnectError after 2 attempts"):
+        resilience.wrap(llm).invoke("prompt")
+
+    assert len(calls) == 2
+    assert resilience.stats()["failed"] == 1
+
+
+def test_non_retryable_errors_are_raised_at_once():
+    resilience = make_resilience()
+    for error in (ValueError("bad request"), LLMRateLimitExceeded("too many concurrent requests for this user", 1.0)):
+        llm, calls = flaky_llm(failures=1, error=error)
+        with pytest.raises(type(error)):
+            resilience.wrap(llm).invoke("prompt")
+        assert len(calls) == 1
+    assert resilience.stats()["retried"] == 0
+
+
+def test_backoff_is_jittered_and_capped():
+    resilience = make_resilience(backoff_seconds=1, backoff_max_seconds=4)
+
+    delays = [resilience.backoff(attempt) for attempt in range(10) for _ in range(20)]
+
+    assert all(0 <= delay <= 4 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+@pytest.mark.asyncio
+async def test_slow_attempts_hit_the_deadline():
+    resilience = make_resilience(timeout=0.05, max_retries=1)
+
+    async def hang(prompt):
+        await asyncio.sleep(1)
+
+    started = time.perf_counter()
+    with pytest.raises(LLMUnavailableError, match="TimeoutError"):
+        await resilience.wrap(RunnableLambda(lambda prompt: None, afunc=hang)).ainvoke("prompt")
+
+    assert time.perf_counter() - started < 0.5
+    assert resilience.stats()["timed_out"] == 2
+
+
+@pytest.mark.asyncio
+async def test_slow_call_is_hedged_and_first_answer_wins():
+    resilience = make_resilience(hedge=True)
+    resilience.latencies.add(0.02)
+    delays = iter([1, 0])
+
+    async def answer(prompt):
+        delay = next(delays)
+        await asyncio.sleep(delay)
+        return f"answered after {delay}s"
+
+    started = time.perf_counter()
+    result = await resilience.wrap(RunnableLambda(lambda prompt: None, afunc=answer)).ainvoke("prompt")
+
+    assert result == "answered after 0s"
+    assert time.perf_counter() - started < 0.5
+    assert resilience.stats()["hedged"] == 1
+    assert resilience.stats()["hedge_wins"] == 1
+
+
+def test_circuit_opens_then_fails_fast_until_reset():
+    resilience = make_resilience(max_retries=0, failure_threshold=2, reset_seconds=0.05)
+    llm, calls = flaky_llm(failures=2)
+    wrapped = resilience.wrap(llm)
+
+    for _ in range(2):
+        with pytest.raises(LLMUnavailableError):
+            wrapped.invoke("prompt")
+    with pytest.raises(LLMUnavailableError, match="circuit open"):
+        wrapped.invoke("prompt")
+    assert len(calls) == 2
+    assert resilience.stats()["circuit_state"] == CircuitBreaker.OPEN
+    assert resilience.stats()["short_circuited"] == 1
+
+    time.sleep(0.06)
+    assert resilience.stats()["circuit_state"] == CircuitBreaker.HALF_OPEN
+    assert wrapped.invoke("prompt") == "answer"
+    assert resilience.stats()["circuit_state"] == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_stream_is_retried_before_its_first_chunk():
+    resilience = make_resilience()
+    attempts = []
+
+    async def chunks(prompt):
+        attempts.append(prompt)
+        if len(attempts) == 1:
+            raise httpx.ReadTimeout("read timed out")
+        for chunk in ("a", "b"):
+            yield chunk
+
+    class FlakyStreamingLLM:
+        def astream(self, input, config=None, **kwargs):
+            return chunks(input)
+
+    assert [chunk async for chunk in resilience.wrap(FlakyStreamingLLM()).astream("prompt")] == ["a", "b"]
+    assert len(attempts) == 2
+    assert resilience.stats()["timed_out"] == 1
+
+
+@pytest.mark.asyncio
+async def test_half_open_circuit_lets_a_single_trial_call_through():
+    resilience = make_resilience(max_retries=0, failure_threshold=1, reset_seconds=0.05)
+
+    async def refuse():
+        raise httpx.ConnectError("connection refused")
+
+    with pytest.raises(LLMUnavailableError):
+        await resilience.acall(refuse)
+    await asyncio.sleep(0.06)
+    assert resilience.stats()["circuit_state"] == CircuitBreaker.HALF_OPEN
+
+    attempts = []
+    release = asyncio.Event()
+
+    async def slow_answer():
+        attempts.append(1)
+        await release.wait()
+        return "answer"
+
+    calls = [asyncio.ensure_future(resilience.acall(slow_answer)) for _ in range(5)]
+    await asyncio.sleep(0.01)
+    release.set()
+    results = await asyncio.gather(*calls, return_exceptions=True)
+
+    assert len(attempts) == 1
+    assert results.count("answer") == 1
+    assert all(isinstance(result, LLMUnavailableError) for result in results if result != "answer")
+    assert resilience.stats()["circuit_state"] == CircuitBreaker.CLOSED
+    assert await resilience.acall(slow_answer) == "answer"
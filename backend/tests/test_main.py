@@ -7,4 +7,15 @@ def test_read_root():
     with TestClient(app) as client:
         response = client.get("/api/v1/health")
         assert response.status_code == 200
-        assert response.json() == {"status": "ok"}
\ No newline at end of file
+        assert response.json() == {"status": "ok"}
+
+def test_read_nlp_health():
+    """Test the NLP model health endpoint reports registry statistics."""
+    with TestClient(app) as client:
+        response = client.get("/api/v1/health/nlp")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "ok"
+        assert data["default_model"] == "en_core_web_sm"
+        assert isinstance(data["models"], list)
+        assert data["process_rss_bytes"] > 0
@@ -2,65 +2,24 @@ import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock
 from backend.main import app
-
+from backend.app.core.nlp_model_registry import nlp_model_registry
 
 
 @pytest.fixture(autouse=True)
 def mock_spacy_load_for_api_tests():
     """
     Mocks spacy.load for API tests to prevent actual model loading
-    and ensure deterministic behavior.
-    """
-    mock_nlp = MagicMock()
-    mock_doc = MagicMock()
-    mock_nlp.return_value = mock_doc
-
-    # Minimal mocking for doc object to avoid errors during iteration or attribute access
-    mock_token_hello = MagicMock(text="Hello", lemma_="hello", pos_="INTJ", is_alpha=True)
-    mock_token_world = MagicMock(text="world", lemma_="world", pos_="NOUN", is_alpha=True)
-    mock_token_period = MagicMock(text=".", lemma_=".", pos_="PUNCT", is_alpha=False)
-    mock_token_question = MagicMock(text="?", lemma_="?", pos_="PUNCT", is_alpha=False)
-
-    mock_doc.configure_mock(
-        **{
-            "sents.__iter__.return_value": [
-                MagicMock(text="Hello world.", doc=MagicMock(__iter__=lambda s: [mock_token_hello, mock_token_world, mock_token_period])),
-                MagicMock(text="How are you?", doc=MagicMock(__iter__=lambda s: [mock_token_hello, mock_token_world, mock_token_question]))
-            ],
-            "ents": [],
-            "__iter__.return_value": [mock_token_hello, mock_token_world, mock_token_period, mock_token_question]
-        }
-    )
-    mock_doc.sents = [
-        MagicMock(text="Hello world.", doc=MagicMock(__iter__=lambda s: [mock_token_hello, mock_token_world, mock_token_period])),
-        MagicMock(text="How are you?", doc=MagicMock(__iter__=lambda s: [mock_token_hello, mock_token_world, mock_token_question]))
-    ]
-
-    # Mock specific calls for num_alphanumeric_tokens in sentences within NLPService logic
-    def mock_nlp_side_effect(text):
-        if "Hello world." in text:
-            mock_sent_doc = MagicMock()
-            mock_sent_doc.__iter__.return_value = [
-                MagicMock(text="Hello", is_alpha=True), MagicMock(text="world", is_alpha=True), MagicMock(text=".", is_alpha=False)
-            ]
-            return mock_sent_doc
-        elif "How are you?" in text:
-            mock_sent_doc = MagicMock()
-            mock_sent_doc.__iter__.return_value = [
-                MagicMock(text="How", is_alpha=True), MagicMock(text="are", is_alpha=True), MagicMock(text="you", is_alpha=True), MagicMock(text="?", is_alpha=False)
-            ]
-            return mock_sent_doc
-        else:
-            mock_doc_generic = MagicMock()
-            mock_doc_generic.__iter__.return_value = []
-            mock_doc_generic.sents = []
-            mock_doc_generic.ents = []
-            return mock_doc_generic
-
-    mock_nlp.side_effect = mock_nlp_side_effect
-
-    with patch('spacy.load', return_value=mock_nlp) as mock_load:
+    and ensure deterministic behavior. A blank English pipeline with a
+    rule-based sentencizer stands in for en_core_web_sm.
+    """
+    import spacy
+    blank_nlp = spacy.blank("en")
+    blank_nlp.add_pipe("sentencizer")
+
+    nlp_model_registry.reset()
+    with patch('spacy.load', return_value=blank_nlp) as mock_load:
         yield mock_load
+    nlp_model_registry.reset()
 
 @pytest.mark.asyncio
 async def test_process_text_endpoint_success(test_client: TestClient, mock_spacy_load_for_api_tests):
@@ -89,6 +48,28 @@ async def test_process_text_endpoint_success(test_client: TestClient, mock_spacy
     assert isinstance(data["average_word_length"], float)
     assert isinstance(data["average_sentence_length"], float)
     assert isinstance(data["named_entities"], list)
+    assert data["profile"] == "full"
+
+@pytest.mark.asyncio
+async def test_process_text_endpoint_intent_only_profile(test_client: TestClient):
+    """
+    Test that the intent_only profile skips sentence and annotation signals.
+    """
+    response = test_client.post(
+        "/api/v1/nlp/process",
+        json={"text": "How do I summarize this? Quickly.", "profile": "intent_only"}
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["profile"] == "intent_only"
+    assert "sentences" not in data["computed_fields"]
+    assert data["sentences"] is None
+    assert data["num_sentences"] is None
+    assert data["lemmas"] is None
+    assert data["named_entities"] is None
+    assert data["detected_intent"] == "Summarization"
+    assert data["inferred_user_state"] == "Time Limited"
 
 @pytest.mark.asyncio
 async def test_process_text_endpoint_empty_input(test_client: TestClient, mock_spacy_load_for_api_tests):
@@ -124,3 +105,65 @@ async def test_process_text_endpoint_invalid_input(test_client: TestClient):
     )
     assert response.status_code == 422 # Unprocessable Entity for Pydantic validation error
 
+def test_process_batch_endpoint_streams_ndjson(test_client: TestClient):
+    """
+    Test the /api/v1/nlp/process-batch endpoint streams one NDJSON line per text.
+    """
+    import json
+    import spacy
+    from backend.app.api.v1.nlp import get_nlp_service
+    from backend.app.services.nlp_service import NLPService
+
+    blank_nlp = spacy.blank("en")
+    blank_nlp.add_pipe("sentencizer")
+    app.dependency_overrides[get_nlp_service] = lambda: NLPService(nlp=blank_nlp)
+    try:
+        response = test_client.post(
+            "/api/v1/nlp/process-batch",
+            json={"texts": ["Hello world.", "How are you? I am fine."], "batch_size": 8}
+        )
+    finally:
+        del app.dependency_overrides[get_nlp_service]
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["index"] for line in lines] == [0, 1]
+    assert lines[0]["tokens"] == ["Hello", "world", "."]
+    assert lines[1]["num_sentences"] == 2
+    assert lines[1]["found_question_words"] == ["how"]
+
+def test_process_batch_endpoint_rejects_oversized_batch(test_client: TestClient):
+    """
+    Test that batches above NLP_BATCH_MAX_TEXTS are rejected before any parsing.
+    """
+    with patch('backend.app.api.v1.nlp.NLP_BATCH_MAX_TEXTS', 1):
+        response = test_client.post(
+            "/api/v1/nlp/process-batch",
+            json={"texts": ["one", "two"]}
+        )
+    assert response.status_code == 400
+
+
+def test_process_batch_endpoint_ignores_client_process_count(test_client: TestClient):
+    """
+    Test that the number of pipe worker processes comes from server config, not the request.
+    """
+    import spacy
+    from backend.app.api.v1.nlp import get_nlp_service
+    from backend.app.services.nlp_service import NLPService
+
+    blank_nlp = spacy.blank("en")
+    blank_nlp.add_pipe("sentencizer")
+    app.dependency_overrides[get_nlp_service] = lambda: NLPService(nlp=blank_nlp)
+    try:
+        with patch.object(blank_nlp, "pipe", wraps=blank_nlp.pipe) as mock_pipe:
+            response = test_client.post(
+                "/api/v1/nlp/process-batch",
+                json={"texts": ["Hello world."], "n_process": 64}
+            )
+    finally:
+        del app.dependency_overrides[get_nlp_service]
+
+    assert response.status_code == 200
+    assert mock_pipe.call_args.kwargs["n_process"] == 1
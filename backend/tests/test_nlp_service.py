@@ -1,6 +1,12 @@
+import asyncio
+import time
 import pytest
-from unittest.mock import MagicMock, patch
-from backend.app.services.nlp_service import NLPService, Intent, UserState
+from unittest.mock import AsyncMock, MagicMock, patch
+from backend.app.services.nlp_service import NLPService, Intent, UserState, GenerationTimeoutError
+from backend.app.core.ai.flashcard_generation_module import Flashcard
+from backend.app.core.ai.quiz_generation_module import QuizQuestion
+from backend.app.core.nlp_model_registry import nlp_model_registry
+from backend.app.core.ai.llm_resilience import LLMUnavailableError, llm_resilience
 
 @pytest.fixture
 def mock_spacy_nlp():
@@ -62,8 +68,10 @@ def mock_spacy_nlp():
 @pytest.fixture(autouse=True)
 def patch_spacy_load(mock_spacy_nlp):
     """Patches spacy.load globally for all NLPService tests."""
+    nlp_model_registry.reset()
     with patch('spacy.load', return_value=mock_spacy_nlp) as mock_load:
         yield mock_load
+    nlp_model_registry.reset()
 
 @pytest.fixture
 def nlp_service():
@@ -76,4 +84,198 @@ def test_nlp_service_initialization(nlp_service, patch_spacy_load):
     patch_spacy_load.assert_called_once_with("en_core_web_sm")
     assert nlp_service.nlp is not None
     assert nlp_service.summarization_module is not None
-    assert nlp_service.flashcard_generation_module is not None # Added assertion
\ No newline at end of file
+    assert nlp_service.flashcard_generation_module is not None # Added assertion
+
+def test_nlp_services_share_one_pipeline(patch_spacy_load):
+    """Test that the spaCy model is loaded once per worker and shared across services."""
+    first = NLPService(db=MagicMock())
+    second = NLPService(db=MagicMock())
+
+    patch_spacy_load.assert_called_once_with("en_core_web_sm")
+    assert first.nlp is second.nlp
+    assert first.summarization_module is second.summarization_module
+
+def test_nlp_model_registry_stats(patch_spacy_load):
+    """Test that the registry records load statistics for the loaded pipeline."""
+    nlp_model_registry.preload(warmup=True)
+
+    stats = nlp_model_registry.stats()
+    assert stats["default_model"] == "en_core_web_sm"
+    assert len(stats["models"]) == 1
+    assert stats["models"][0]["load_seconds"] >= 0
+    assert stats["models"][0]["warmup_seconds"] is not None
+    assert stats["models"][0]["rss_delta_bytes"] >= 0
+
+@pytest.fixture
+def blank_nlp():
+    """A real, model-free English pipeline with rule-based sentence boundaries."""
+    import spacy
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    return nlp
+
+def test_process_text_single_pass_signals(blank_nlp):
+    """Test that every signal is derived from the single parsed Doc."""
+    service = NLPService(db=MagicMock(), nlp=blank_nlp)
+    signals = service.process_text("Hello, world. How are you today?")
+
+    assert signals["tokens"] == ["Hello", ",", "world", ".", "How", "are", "you", "today", "?"]
+    assert signals["sentences"] == ["Hello, world.", "How are you today?"]
+    assert signals["num_sentences"] == 2
+    assert signals["found_question_words"] == ["how"]
+    assert signals["num_alphanumeric_tokens"] == 6
+    assert signals["unique_words"] == 6
+    assert signals["average_word_length"] == 4.0
+    assert signals["average_sentence_length"] == 3.0
+    assert signals["num_paragraphs"] == 1
+
+def test_process_text_without_sentence_boundaries():
+    """Test that a pipeline without a sentence segmenter yields one sentence."""
+    import spacy
+    service = NLPService(db=MagicMock(), nlp=spacy.blank("en"))
+    signals = service.process_text("What is it. Tell me")
+
+    assert signals["sentences"] == ["What is it. Tell me"]
+    assert signals["num_sentences"] == 1
+    assert signals["average_sentence_length"] == 5.0
+
+def test_process_text_empty_input(blank_nlp):
+    """Test that empty input produces zeroed signals."""
+    service = NLPService(db=MagicMock(), nlp=blank_nlp)
+    signals = service.process_text("")
+
+    assert signals["tokens"] == []
+    assert signals["sentences"] == []
+    assert signals["num_sentences"] == 0
+    assert signals["average_word_length"] == 0
+    assert signals["average_sentence_length"] == 0
+
+def test_process_texts_uses_pipe_and_preserves_order(blank_nlp):
+    """Test that batch processing yields one signals dict per text in input order."""
+    service = NLPService(db=MagicMock(), nlp=blank_nlp)
+    texts = ["Summarize this chapter.", "", "What is a cell? Explain it."]
+
+    with patch.object(blank_nlp, "pipe", wraps=blank_nlp.pipe) as mock_pipe:
+        results = list(service.process_texts(texts, batch_size=2))
+
+    mock_pipe.assert_called_once()
+    assert mock_pipe.call_args.kwargs["batch_size"] == 2
+    assert [r["original_text"] for r in results] == texts
+    assert results[0]["detected_intent"] == Intent.SUMMARIZATION.value
+    assert results[1]["num_sentences"] == 0
+    assert results[2]["num_sentences"] == 2
+    assert results[2] == service.process_text(texts[2])
+
+def test_intent_only_profile_disables_pipeline_components(blank_nlp):
+    """Test that the intent_only profile runs the tokenizer only and marks skipped fields."""
+    from backend.app.services.nlp_service import SignalProfile
+    service = NLPService(db=MagicMock(), nlp=blank_nlp)
+
+    assert service._disabled_components(SignalProfile.INTENT_ONLY) == ["sentencizer"]
+    assert service._disabled_components(SignalProfile.STRUCTURE) == []
+    assert service._disabled_components(SignalProfile.FULL) == []
+
+    signals = service.process_text("What is a cell? Explain it.", profile=SignalProfile.INTENT_ONLY)
+    assert signals["profile"] == "intent_only"
+    assert signals["sentences"] is None
+    assert signals["lemmas"] is None
+    assert signals["named_entities"] is None
+    assert "sentences" not in signals["computed_fields"]
+    assert signals["found_question_words"] == ["what"]
+    assert signals["detected_intent"] == Intent.CLARIFICATION.value
+
+def test_structure_profile_computes_sentences_only(blank_nlp):
+    """Test that the structure profile adds sentence signals but not annotations."""
+    from backend.app.services.nlp_service import SignalProfile
+    service = NLPService(db=MagicMock(), nlp=blank_nlp)
+
+    signals = service.process_text("What is a cell? Explain it.", profile=SignalProfile.STRUCTURE)
+    assert signals["num_sentences"] == 2
+    assert signals["pos_tags"] is None
+    assert "num_sentences" in signals["computed_fields"]
+
+def test_split_into_chunks_breaks_between_sentences(blank_nlp):
+    """Test that long texts are chunked on spaCy sentence boundaries, in order."""
+    service = NLPService(db=MagicMock(), nlp=blank_nlp)
+    text = "The cell is the unit of life. It has a membrane.\n\nMitochondria make energy. Ribosomes build proteins."
+
+    chunks = service.split_into_chunks(text, max_tokens=10)
+
+    assert chunks == [
+        "The cell is the unit of life.",
+        "It has a membrane.",
+        "Mitochondria make energy.",
+        "Ribosomes build proteins.",
+    ]
+
+@pytest.mark.asyncio
+async def test_aget_summary_uses_map_reduce_for_long_texts(blank_nlp):
+    """Test that texts over the chunk budget go through the chunked summarization path."""
+    service = NLPService(db=MagicMock(), nlp=blank_nlp)
+    with patch("backend.app.services.nlp_service.SUMMARY_CHUNK_TOKENS", 12), \
+         patch.object(service.summarization_module, "agenerate_chunked_summary", new_callable=AsyncMock) as mock_chunked, \
+         patch.object(service.summarization_module, "agenerate_summary", new_callable=AsyncMock) as mock_single:
+        mock_chunked.return_value = "Chunked summary."
+        summary = await service.aget_summary(1, "The cell is the unit of life. It has a membrane and many organelles.")
+
+    assert summary.content == "Chunked summary."
+    mock_single.assert_not_called()
+    chunks = mock_chunked.await_args.args[0]
+    assert chunks == ["The cell is the unit of life.", "It has a membrane and many organelles."]
+
+@pytest.mark.asyncio
+async def test_aget_summary_falls_back_to_extractive_summary(blank_nlp):
+    """Test that an unavailable provider yields the leading sentences of each paragraph."""
+    service = NLPService(db=MagicMock(), nlp=blank_nlp)
+    text = "Cells are alive. They divide. They grow.\n\nAtoms are small. They bond."
+    with patch.object(service.summarization_module, "agenerate_summary", new_callable=AsyncMock,
+                      side_effect=LLMUnavailableError("circuit open", 5)):
+        summary = await service.aget_summary(1, text, detail_level="brief")
+
+    assert summary.content == "Cells are alive. They divide. Atoms are small."
+    assert llm_resilience.stats()["fallbacks"] == 1
+
+@pytest.mark.asyncio
+async def test_agenerate_all_runs_modules_concurrently(blank_nlp):
+    """Test that the three modules overlap and their artifacts are committed once."""
+    db = MagicMock()
+    service = NLPService(db=db, nlp=blank_nlp)
+
+    def slow(value):
+        async def generate(*args):
+            await asyncio.sleep(0.1)
+            return value
+        return generate
+
+    flashcard = Flashcard(question="What is a cell?", answer="The unit of life.")
+    question = QuizQuestion(question="What is a cell?", options=["A", "B"], correct_answer="A")
+    with patch.object(service.summarization_module, "agenerate_summary", side_effect=slow("A summary.")), \
+         patch.object(service.flashcard_generation_module, "agenerate_flashcards", side_effect=slow([flashcard])), \
+         patch.object(service.quiz_generation_module, "agenerate_quiz", side_effect=slow([question])):
+        started = time.perf_counter()
+        summary, flashcard_set, quiz = await service.agenerate_all(1, "Cells are the unit of life.")
+        elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.25
+    assert summary.content == "A summary."
+    assert flashcard_set.content == [flashcard.dict()]
+    assert quiz.content == [question.dict()]
+    db.add_all.assert_called_once()
+    db.commit.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_agenerate_all_timeout_saves_nothing(blank_nlp):
+    """Test that a module exceeding its timeout aborts the whole transaction."""
+    db = MagicMock()
+    service = NLPService(db=db, nlp=blank_nlp)
+
+    async def hang(*args):
+        await asyncio.sleep(1)
+
+    with patch.object(service.summarization_module, "agenerate_summary", new_callable=AsyncMock, return_value="A summary."), \
+         patch.object(service.flashcard_generation_module, "agenerate_flashcards", side_effect=hang), \
+         patch.object(service.quiz_generation_module, "agenerate_quiz", new_callable=AsyncMock, return_value=[]):
+        with pytest.raises(GenerationTimeoutError, match="flashcards"):
+            await service.agenerate_all(1, "Cells are the unit of life.", timeout=0.05)
+
+    db.commit.assert_not_called()
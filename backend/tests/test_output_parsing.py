@@ -0,0 +1,140 @@
+import json
+from langchain_core.runnables import RunnableLambda
+
+from backend.app.core.ai.flashcard_generation_module import Flashcard, FlashcardGenerationModule, FlashcardList
+from backend.app.core.ai.llm_governor import LLMGovernor
+from backend.app.core.ai.output_parsing import (
+    load_json_items,
+    parse_flashcard_text,
+    parse_quiz_text,
+    resolve_correct_answer,
+)
+from backend.app.core.ai.quiz_generation_module import QuizGenerationModule, QuizQuestion, QuizQuestionList
+
+
+def test_parse_quiz_text_maps_letter_to_option_text():
+    output = (
+        "1. Question: What is the capital of France?\n"
+        "Options:\n"
+        "A. Berlin\n"
+        "B. Madrid\n"
+        "C. Paris\n"
+        "D. Rome\n"
+        "Correct Answer: C\n\n"
+        "2. Question: Which planet is known\n"
+        "as the Red Planet?\n"
+        "Options:\n"
+        "  A) Venus\n"
+        "  B) Mars\n"
+        "Correct Answer: B. Mars\n"
+    )
+    questions = parse_quiz_text(output)
+
+    assert questions == [
+        {"question": "What is the capital of France?", "options": ["Berlin", "Madrid", "Paris", "Rome"], "correct_answer": "Paris"},
+        {"question": "Which planet is known as the Red Planet?", "options": ["Venus", "Mars"], "correct_answer": "Mars"},
+    ]
+
+
+def test_parse_quiz_text_drops_incomplete_questions():
+    output = (
+        "Question: No options here?\n"
+        "Correct Answer: A\n"
+        "Question: No answer here?\n"
+        "Options:\n"
+        "A. One\n"
+        "B. Two\n"
+    )
+    assert parse_quiz_text(output) == []
+    assert parse_quiz_text("") == []
+
+
+def test_parse_flashcard_text_handles_numbering_labels_and_multiline_answers():
+    output = (
+        "1. Question: What is photosynthesis?\n"
+        "Answer: The process plants use\n"
+        "to make food from sunlight.\n"
+        "2) **Question:** Where does it occur?\n"
+        "**Answer:** In chloroplasts.\n"
+        "- question: What is released?\n"
+        "answer: Oxygen.\n"
+        "Question: Missing its answer?\n"
+    )
+    assert parse_flashcard_text(output) == [
+        {"question": "What is photosynthesis?", "answer": "The process plants use to make food from sunlight."},
+        {"question": "Where does it occur?", "answer": "In chloroplasts."},
+        {"question": "What is released?", "answer": "Oxygen."},
+    ]
+
+
+def test_load_json_items_accepts_fenced_json_and_rejects_free_text():
+    fenced = "```json\n" + json.dumps({"flashcards": [{"question": "Q", "answer": "A"}]}) + "\n```"
+
+    assert load_json_items(fenced, "flashcards") == [{"question": "Q", "answer": "A"}]
+    assert load_json_items("Question: Q\nAnswer: A", "flashcards") is None
+    assert load_json_items("[not json", "flashcards") is None
+
+
+def test_resolve_correct_answer_keeps_text_answers():
+    assert resolve_correct_answer("C", ["a", "b", "c"]) == "c"
+    assert resolve_correct_answer("Paris", ["Berlin", "Paris"]) == "Paris"
+    assert resolve_correct_answer("E", ["a", "b"]) == "E"
+    assert resolve_correct_answer("(B)", ["a", "b"]) == "b"
+    assert resolve_correct_answer("B: b", ["a", "b"]) == "b"
+
+
+def test_resolve_correct_answer_keeps_answers_starting_with_a_letter():
+    options = ["Iron", "Calcium", "a vitamin C tablet", "A cell wall"]
+
+    assert resolve_correct_answer("A cell wall", options) == "A cell wall"
+    assert resolve_correct_answer("a vitamin C tablet", options) == "a vitamin C tablet"
+    assert resolve_correct_answer("A cell wall", ["Membrane", "Nucleus"]) == "A cell wall"
+
+
+def test_flashcard_module_accepts_structured_model_and_skips_invalid_items():
+    module = FlashcardGenerationModule()
+
+    structured = FlashcardList(flashcards=[Flashcard(question="Q1", answer="A1")])
+    assert module._parse_llm_output_to_flashcards(structured) == [Flashcard(question="Q1", answer="A1")]
+
+    mixed = [{"question": "Q2", "answer": "A2"}, {"question": "No answer"}, {"question": " ", "answer": "blank"}]
+    assert module._parse_llm_output_to_flashcards(mixed) == [Flashcard(question="Q2", answer="A2")]
+
+
+def test_quiz_module_resolves_letters_in_json_items():
+    module = QuizGenerationModule()
+    output = json.dumps({"questions": [
+        {"question": "2 + 2?", "options": ["3", "4"], "correct_answer": "B"},
+        {"question": "Bad", "options": "not a list", "correct_answer": "A"},
+    ]})
+
+    questions = module._parse_llm_output_to_quiz_questions(output)
+
+    assert len(questions) == 1
+    assert questions[0].correct_answer == "4"
+
+
+def test_quiz_module_keeps_structured_answers_as_given():
+    module = QuizGenerationModule()
+    structured = QuizQuestionList(questions=[
+        QuizQuestion(question="What do plant cells have?", options=["Nucleus", "A cell wall"], correct_answer="A cell wall"),
+        QuizQuestion(question="Which is a supplement?", options=["Iron", "a vitamin C tablet"], correct_answer="a vitamin C tablet"),
+    ])
+
+    questions = module._parse_llm_output_to_quiz_questions(structured)
+
+    assert [q.correct_answer for q in questions] == ["A cell wall", "a vitamin C tablet"]
+
+
+def test_structured_output_runnable_stays_governed():
+    class FakeModel(RunnableLambda):
+        def with_structured_output(self, schema, **kwargs):
+            return RunnableLambda(lambda prompt: schema(flashcards=[]))
+
+    governor = LLMGovernor(requests_per_minute=0, tokens_per_minute=0, max_inflight_per_user=0, max_wait_seconds=5)
+    llm = governor.wrap(FakeModel(lambda prompt: "answer"))
+
+    structured = llm.with_structured_output(FlashcardList)
+
+    assert structured.invoke("prompt") == FlashcardList(flashcards=[])
+    assert governor.stats()["admitted"] == 1
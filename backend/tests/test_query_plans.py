@@ -0,0 +1,175 @@
+import datetime
+import os
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect, select, text, tuple_
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.models.change_log import ChangeLogEntry
+from backend.app.models.feedback import Feedback
+from backend.app.models.generated_content import GeneratedContent
+from backend.app.models.generated_flashcard_set import GeneratedFlashcardSet
+from backend.app.models.generated_quiz import GeneratedQuiz
+from backend.app.models.generated_summary import GeneratedSummary
+from backend.app.models.shared_study_material import SharedStudyMaterial
+from backend.app.models.stored_file import StoredFile
+from backend.app.models.study_material import StudyMaterial
+from backend.app.models.user import User
+
+ALEMBIC_INI = os.path.join(os.path.dirname(__file__), "..", "alembic.ini")
+USERS = 20
+MATERIALS_PER_USER = 25
+UPLOADED = datetime.datetime(2024, 1, 1)
+
+# Each hot query and the index it must be served by
+HOT_QUERIES = {
+    "list_study_materials": (
+        select(StudyMaterial).where(StudyMaterial.user_id == 3)
+        .order_by(StudyMaterial.upload_date.desc(), StudyMaterial.id.desc()).limit(51),
+        "ix_study_materials_user_id_upload_date_id",
+    ),
+    "list_study_materials_after_cursor": (
+        select(StudyMaterial).where(
+            StudyMaterial.user_id == 3,
+            tuple_(StudyMaterial.upload_date, StudyMaterial.id) < (UPLOADED + datetime.timedelta(hours=10), 60)
+        ).order_by(StudyMaterial.upload_date.desc(), StudyMaterial.id.desc()).limit(51),
+        "ix_study_materials_user_id_upload_date_id",
+    ),
+    "get_user_study_material": (
+        select(StudyMaterial).where(StudyMaterial.id == 42, StudyMaterial.user_id == 2),
+        "INTEGER PRIMARY KEY",
+    ),
+    "summaries_of_materials": (
+        select(GeneratedSummary).where(GeneratedSummary.study_material_id.in_([1, 2, 3])),
+        "ix_generated_summaries_study_material_id",
+    ),
+    "flashcard_sets_of_materials": (
+        select(GeneratedFlashcardSet).where(GeneratedFlashcardSet.study_material_id.in_([1, 2, 3])),
+        "ix_generated_flashcard_sets_study_material_id",
+    ),
+    "quizzes_of_materials": (
+        select(GeneratedQuiz).where(GeneratedQuiz.study_material_id.in_([1, 2, 3])),
+        "ix_generated_quizzes_study_material_id",
+    ),
+    "contents_of_artifacts": (
+        select(GeneratedContent).where(GeneratedContent.id.in_([1, 2, 3])),
+        "INTEGER PRIMARY KEY",
+    ),
+    "reusable_generation": (
+        select(GeneratedContent).where(GeneratedContent.source_sha256 == "0" * 64)
+        .order_by(GeneratedContent.id.desc()).limit(1),
+        "ix_generated_contents_source_sha256",
+    ),
+    "stored_file_by_sha256": (
+        select(StoredFile).where(StoredFile.sha256 == "0" * 64),
+        "sqlite_autoindex_stored_files_1",
+    ),
+    "shares_made": (
+        select(SharedStudyMaterial).where(SharedStudyMaterial.shared_by_user_id == 4),
+        "ix_shared_study_materials_shared_by_user_id",
+    ),
+    "shares_received": (
+        select(SharedStudyMaterial).where(SharedStudyMaterial.shared_with_user_id == 4),
+        "ix_shared_study_materials_shared_with_user_id",
+    ),
+    "existing_share": (
+        select(SharedStudyMaterial).where(
+            SharedStudyMaterial.study_material_id == 7,
+            SharedStudyMaterial.shared_with_user_id == 5
+        ),
+        "ix_shared_study_materials_study_material_id_shared_with_user_id",
+    ),
+    "sync_changes": (
+        select(ChangeLogEntry).where(ChangeLogEntry.user_id == 3, ChangeLogEntry.id > 40)
+        .order_by(ChangeLogEntry.id).limit(501),
+        "ix_change_log_user_id_id",
+    ),
+    "feedback_of_user": (
+        select(Feedback).where(Feedback.user_id == 6),
+        "ix_feedback_user_id",
+    ),
+}
+
+
+@pytest.fixture(scope="module")
+def migrated_engine(tmp_path_factory):
+    """A SQLite database built by the Alembic migrations, seeded and analyzed."""
+    url = f"sqlite:///{tmp_path_factory.mktemp('plans') / 'plans.db'}"
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("sqlalchemy.url", url)
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
+
+    db_engine = create_engine(url)
+    db = sessionmaker(bind=db_engine)()
+    users = [User(auth_provider_id=f"plans|{i}", email=f"plans-{i}@example.com") for i in range(USERS)]
+    db.add_all(users)
+    db.flush()
+    for user in users:
+        for i in range(MATERIALS_PER_USER):
+            stored_file = StoredFile(
+                sha256=f"{user.id:032x}{i:032x}", storage_key=f"blobs/{user.id}-{i}", size_bytes=100, ref_count=1
+            )
+            db.add(stored_file)
+            db.flush()
+            material = StudyMaterial(
+                user_id=user.id,
+                file_name=f"notes-{i}.txt",
+                s3_key=stored_file.storage_key,
+                stored_file_id=stored_file.id,
+                upload_date=UPLOADED + datetime.timedelta(hours=i)
+            )
+            db.add(material)
+            db.flush()
+            summary = GeneratedSummary(study_material_id=material.id, content="A summary.", detail_level="brief")
+            summary.stored_content.source_sha256 = stored_file.sha256
+            db.add(summary)
+            db.add(GeneratedFlashcardSet(study_material_id=material.id, content=[]))
+            db.add(GeneratedQuiz(study_material_id=material.id, content=[]))
+            if i % 5 == 0:
+                db.add(SharedStudyMaterial(
+                    study_material_id=material.id,
+                    shared_by_user_id=user.id,
+                    shared_with_user_id=users[(user.id + i) % USERS].id
+                ))
+        db.add(Feedback(user_id=user.id, material_id=1, material_type="summary", rating=5))
+    db.commit()
+    db.close()
+    with db_engine.begin() as connection:
+        # Give the planner real statistics, as a production database has
+        connection.execute(text("ANALYZE"))
+    yield db_engine
+    db_engine.dispose()
+
+
+def query_plan(db_engine, statement) -> list:
+    sql = statement.compile(dialect=db_engine.dialect, compile_kwargs={"literal_binds": True})
+    with db_engine.connect() as connection:
+        return [row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_its_index(migrated_engine, name):
+    """Fails when a hot query degrades to a full table scan or sorts instead of reading the index in order."""
+    statement, index = HOT_QUERIES[name]
+    plan = query_plan(migrated_engine, statement)
+
+    assert not [step for step in plan if step.startswith("SCAN")], f"{name} scans a table: {plan}"
+    assert not [step for step in plan if "TEMP B-TREE" in step], f"{name} sorts its rows: {plan}"
+    assert any(index in step for step in plan), f"{name} does not use {index}: {plan}"
+
+
+def test_migrations_match_the_models(migrated_engine):
+    """Every index declared on the models is created by the migrations, so create_all and Alembic agree."""
+    from alembic.autogenerate import compare_metadata
+    from alembic.migration import MigrationContext
+    from backend.app.database import Base
+
+    with migrated_engine.connect() as connection:
+        differences = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+    assert differences == []
+    assert "ix_study_materials_user_id_upload_date_id" in {
+        index["name"] for index in inspect(migrated_engine).get_indexes("study_materials")
+    }
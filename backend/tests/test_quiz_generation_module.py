@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from backend.app.core.ai.quiz_generation_module import QuizGenerationModule, QuizQuestion
 import os
 import json
@@ -95,3 +95,22 @@ def test_generate_quiz_missing_api_key():
 
     if original_api_key:
         os.environ["OPENAI_API_KEY"] = original_api_key
+
+@pytest.mark.asyncio
+async def test_agenerate_quiz_parses_ainvoke_output():
+    """Test that the async variant awaits chain.ainvoke and parses its output."""
+    llm_output = (
+        "1. Question: What is the capital of France?\n"
+        "Options:\n"
+        "  A. Berlin\n"
+        "  B. Madrid\n"
+        "  C. Paris\n"
+        "  D. Rome\n"
+        "Correct Answer: C\n"
+    )
+    with patch('langchain_core.runnables.base.RunnableSequence.ainvoke', new_callable=AsyncMock, return_value=llm_output) as mock_ainvoke:
+        questions = await QuizGenerationModule().agenerate_quiz("France text")
+
+    mock_ainvoke.assert_awaited_once_with({"text": "France text"})
+    assert len(questions) == 1
+    assert questions[0].correct_answer == "Paris"
@@ -0,0 +1,149 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from backend.main import app
+from backend.app.dependencies import get_current_user
+from backend.app.models.shared_study_material import SharedStudyMaterial
+from backend.app.models.study_material import StudyMaterial
+from backend.app.models.user import User
+
+
+@pytest.fixture
+def owner(make_user):
+    user = make_user()
+    app.dependency_overrides[get_current_user] = lambda: user
+    yield user
+    del app.dependency_overrides[get_current_user]
+
+
+def share_materials(db_session, owner: User, recipient: User, count: int) -> list:
+    shares = []
+    for i in range(count):
+        material = StudyMaterial(user_id=owner.id, file_name=f"notes-{i}.txt", s3_key=f"users/{owner.id}/notes-{i}.txt")
+        db_session.add(material)
+        db_session.flush()
+        shares.append(SharedStudyMaterial(
+            study_material_id=material.id,
+            shared_by_user_id=owner.id,
+            shared_with_user_id=recipient.id,
+            permissions="view_only",
+            share_token=None
+        ))
+    db_session.add_all(shares)
+    db_session.commit()
+    return [share.id for share in shares]
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+
+
+def test_my_shares_pages_newest_first_with_material_details(test_client, db_session, owner, make_user):
+    recipient = make_user()
+    share_ids = share_materials(db_session, owner, recipient, 5)
+
+    first = test_client.get("/api/v1/sharing/my-shares", params={"limit": 3})
+    assert first.status_code == 200
+    body = first.json()
+    assert [item["id"] for item in body["items"]] == share_ids[::-1][:3]
+    assert body["items"][0]["file_name"] == "notes-4.txt"
+    assert body["items"][0]["shared_with_user_id"] == recipient.id
+
+    second = test_client.get("/api/v1/sharing/my-shares", params={"limit": 3, "cursor": body["next_cursor"]})
+    assert [item["id"] for item in second.json()["items"]] == share_ids[::-1][3:]
+    assert second.json()["next_cursor"] is None
+
+    assert test_client.get("/api/v1/sharing/my-shares", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_shared_with_me_lists_the_shares_received(test_client, db_session, owner, make_user):
+    sharer = make_user()
+    share_ids = share_materials(db_session, sharer, owner, 2)
+
+    response = test_client.get("/api/v1/sharing/shared-with-me")
+
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["items"]] == share_ids[::-1]
+    assert {item["shared_by_user_id"] for item in response.json()["items"]} == {sharer.id}
+
+
+@pytest.mark.parametrize("path", ["/api/v1/sharing/my-shares", "/api/v1/sharing/shared-with-me"])
+def test_share_listings_run_a_constant_number_of_queries(test_client, db_session, owner, path, make_user):
+    """Test that a listing costs the same statements for one share as for many (no query per share)."""
+    other = make_user()
+
+    def listing_statements():
+        with count_statements() as statements:
+            response = test_client.get(path)
+        assert response.status_code == 200
+        share_queries = [statement for statement in statements if "shared_study_materials" in statement]
+        return len(response.json()["items"]), len(statements), len(share_queries)
+
+    if path.endswith("my-shares"):
+        share_materials(db_session, owner, other, 1)
+        few = listing_statements()
+        share_materials(db_session, owner, other, 20)
+    else:
+        share_materials(db_session, other, owner, 1)
+        few = listing_statements()
+        share_materials(db_session, other, owner, 20)
+    many = listing_statements()
+
+    assert (few[0], many[0]) == (1, 21)
+    assert few[1] == many[1]
+    # The shares and their materials come from one joined query
+    assert few[2] == many[2] == 1
+
+
+def test_share_with_user_returns_the_projected_share(test_client, db_session, owner, make_user):
+    recipient = make_user()
+    material = StudyMaterial(user_id=owner.id, file_name="notes.txt", s3_key=f"users/{owner.id}/notes.txt")
+    db_session.add(material)
+    db_session.commit()
+
+    response = test_client.post(
+        "/api/v1/sharing/share-with-user",
+        json={"study_material_id": material.id, "shared_with_email": recipient.email, "permissions": "edit"}
+    )
+
+    assert response.status_code == 201
+    body = response.json()
+    assert body["file_name"] == "notes.txt"
+    assert body["shared_with_user_id"] == recipient.id
+    assert body["permissions"] == "edit"
+
+
+def test_generate_link_returns_the_share_url(test_client, db_session, owner):
+    material = StudyMaterial(user_id=owner.id, file_name="notes.txt", s3_key=f"users/{owner.id}/notes.txt")
+    db_session.add(material)
+    db_session.commit()
+
+    created = test_client.post("/api/v1/sharing/generate-link", json={"study_material_id": material.id, "permissions": "edit"})
+
+    assert created.status_code == 201
+    body = created.json()
+    assert body["full_share_url"].endswith(f"/share/{body['share_token']}")
+    assert body["permissions"] == "edit"
+    assert test_client.get(f"/api/v1/sharing/shared/{body['share_token']}").status_code == 200
+
+
+def test_generate_link_rejects_materials_of_other_users(test_client, db_session, owner, make_user):
+    other = make_user()
+    material = StudyMaterial(user_id=other.id, file_name="notes.txt", s3_key=f"users/{other.id}/notes.txt")
+    db_session.add(material)
+    db_session.commit()
+
+    assert test_client.post("/api/v1/sharing/generate-link", json={"study_material_id": material.id}).status_code == 404
@@ -0,0 +1,165 @@
+import hashlib
+import os
+import uuid
+from unittest.mock import patch
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from backend.main import app
+from backend.app.database import get_db
+from backend.app.dependencies import get_current_user
+from backend.app.models.study_material import StudyMaterial
+from backend.app.models.user import User
+from backend.app.services.storage_service import LocalStorageBackend, S3StorageBackend, get_storage_backend, iter_parts
+
+MIB = 1024 * 1024
+
+
+async def stream(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+async def failing_stream(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+    raise ConnectionResetError("client went away")
+
+
+async def collect(parts) -> list:
+    return [part async for part in parts]
+
+
+@pytest.mark.asyncio
+async def test_iter_parts_regroups_chunks_into_fixed_size_parts():
+    parts = await collect(iter_parts(stream(b"ab", b"cdefg", b"", b"hij"), 4))
+
+    assert parts == [b"abcd", b"efgh", b"ij"]
+
+
+@pytest.mark.asyncio
+async def test_local_backend_streams_to_a_file_and_hashes_it(tmp_path):
+    storage = LocalStorageBackend(str(tmp_path), part_size=3)
+
+    stored = await storage.save("users/1/notes.txt", stream(b"Cells ", b"divide."))
+
+    assert (stored.key, stored.size) == ("users/1/notes.txt", 13)
+    assert stored.sha256 == hashlib.sha256(b"Cells divide.").hexdigest()
+    assert (tmp_path / "users" / "1" / "notes.txt").read_bytes() == b"Cells divide."
+
+    await storage.delete("users/1/notes.txt")
+    assert not (tmp_path / "users" / "1" / "notes.txt").exists()
+
+
+@pytest.mark.asyncio
+async def test_local_backend_leaves_nothing_behind_when_the_stream_fails(tmp_path):
+    storage = LocalStorageBackend(str(tmp_path))
+
+    with pytest.raises(ConnectionResetError):
+        await storage.save("users/1/notes.txt", failing_stream(b"Cells "))
+
+    assert os.listdir(tmp_path / "users" / "1") == []
+
+
+@pytest.mark.asyncio
+async def test_local_backend_rejects_keys_outside_its_root(tmp_path):
+    storage = LocalStorageBackend(str(tmp_path / "root"))
+
+    with pytest.raises(ValueError):
+        await storage.save("../elsewhere.txt", stream(b"x"))
+
+
+@pytest.fixture
+def s3_client():
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="materials")
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_s3_backend_puts_small_files_in_one_request(s3_client):
+    storage = S3StorageBackend("materials", part_size=5 * MIB, client=s3_client)
+
+    stored = await storage.save("users/1/notes.txt", stream(b"Cells divide."))
+
+    assert stored.sha256 == hashlib.sha256(b"Cells divide.").hexdigest()
+    assert s3_client.get_object(Bucket="materials", Key="users/1/notes.txt")["Body"].read() == b"Cells divide."
+
+
+@pytest.mark.asyncio
+async def test_s3_backend_uploads_large_files_in_parts(s3_client):
+    storage = S3StorageBackend("materials", part_size=5 * MIB, client=s3_client)
+    chunks = [os.urandom(MIB) for _ in range(11)]
+
+    stored = await storage.save("users/1/lecture.pdf", stream(*chunks))
+
+    content = b"".join(chunks)
+    assert (stored.size, stored.sha256) == (len(content), hashlib.sha256(content).hexdigest())
+    obj = s3_client.get_object(Bucket="materials", Key="users/1/lecture.pdf")
+    assert obj["Body"].read() == content
+    assert obj["ETag"].strip('"').endswith("-3") # Two full parts and the remainder
+
+
+@pytest.mark.asyncio
+async def test_s3_backend_aborts_the_multipart_upload_when_the_stream_fails(s3_client):
+    storage = S3StorageBackend("materials", part_size=5 * MIB, client=s3_client)
+
+    with pytest.raises(ConnectionResetError):
+        await storage.save("users/1/lecture.pdf", failing_stream(*[b"x" * MIB] * 11))
+
+    assert s3_client.list_multipart_uploads(Bucket="materials").get("Uploads", []) == []
+    assert s3_client.list_objects_v2(Bucket="materials").get("KeyCount") == 0
+
+
+@pytest.mark.asyncio
+async def test_s3_backend_keeps_the_upload_error_when_the_abort_fails(s3_client):
+    storage = S3StorageBackend("materials", part_size=5 * MIB, client=s3_client)
+
+    with patch.object(s3_client, "abort_multipart_upload", side_effect=RuntimeError("abort failed")):
+        with pytest.raises(ConnectionResetError):
+            await storage.save("users/1/lecture.pdf", failing_stream(*[b"x" * MIB] * 11))
+
+
+@pytest.fixture
+def current_user():
+    db = next(app.dependency_overrides[get_db]())
+    user = User(auth_provider_id=f"auth0|{uuid.uuid4().hex}", email=f"{uuid.uuid4().hex}@example.com")
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    db.close()
+    app.dependency_overrides[get_current_user] = lambda: user
+    yield user
+    del app.dependency_overrides[get_current_user]
+
+
+def test_upload_streams_the_file_to_storage(test_client, current_user):
+    content = b"Mitochondria are the powerhouse of the cell. " * 2000
+
+    created = test_client.post("/api/v1/study-materials/", files={"file": ("../biology.txt", content, "text/plain")})
+
+    assert created.status_code == 201
+    body = created.json()
+    assert body["file_name"] == "biology.txt"
+    assert body["s3_key"].startswith("blobs/")
+    assert (body["size_bytes"], body["content_sha256"]) == (len(content), hashlib.sha256(content).hexdigest())
+    path = os.path.join(app.dependency_overrides[get_storage_backend]().root, body["s3_key"])
+    with open(path, "rb") as stored:
+        assert stored.read() == content
+
+    assert test_client.delete(f"/api/v1/study-materials/{body['id']}").status_code == 204
+    assert not os.path.exists(path)
+
+
+def test_upload_rejects_bodies_without_the_file(test_client, current_user):
+    missing_file = test_client.post("/api/v1/study-materials/", data={"note": "no file here"}, files={"other": ("a.txt", b"x")})
+    not_multipart = test_client.post("/api/v1/study-materials/", json={"file": "notes.txt"})
+
+    assert missing_file.status_code == 400
+    assert not_multipart.status_code == 400
+    db = next(app.dependency_overrides[get_db]())
+    assert db.query(StudyMaterial).filter(StudyMaterial.user_id == current_user.id).count() == 0
+    db.close()
@@ -2,14 +2,283 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine, Column, Integer, String, DateTime, ForeignKey, Boolean
 from sqlalchemy.orm import sessionmaker, Session, declarative_base, relationship
-from unittest.mock import patch, MagicMock
+from unittest.mock import AsyncMock, patch, MagicMock
 import datetime
+import json
 import os
+import uuid
 
 from backend.main import app
 from backend.app.database import get_db, Base
+from backend.app.dependencies import get_current_user
 from backend.app.models.user import User
 from backend.app.models.study_material import StudyMaterial
+from backend.app.models.generated_summary import GeneratedSummary
+from backend.app.models.generation_job import GenerationJob
+from backend.app.api.v1.study_materials import get_nlp_service
+from backend.app.services.nlp_service import NLPService, get_shared_generation_modules
+from backend.app.core.ai.llm_governor import LLMRateLimitExceeded
+from backend.app.core.ai.llm_resilience import LLMUnavailableError
+from backend.app.core.ai.fake_llm import FakeStudyChatModel
+from backend.app.core.ai.llm_client_pool import llm_client_pool
 
 def test_true():
     assert True
+
+@pytest.fixture
+def db_session():
+    db = next(app.dependency_overrides[get_db]())
+    yield db
+    db.close()
+
+@pytest.fixture
+def current_user(db_session):
+    user = User(auth_provider_id=f"auth0|{uuid.uuid4().hex}", email=f"{uuid.uuid4().hex}@example.com")
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    app.dependency_overrides[get_current_user] = lambda: user
+    yield user
+    del app.dependency_overrides[get_current_user]
+
+@pytest.fixture
+def study_material(db_session, current_user):
+    material = StudyMaterial(user_id=current_user.id, file_name="notes.txt", s3_key=f"users/{current_user.id}/notes.txt")
+    db_session.add(material)
+    db_session.commit()
+    db_session.refresh(material)
+    return material
+
+@pytest.fixture
+def blank_nlp_service(db_session):
+    import spacy
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    app.dependency_overrides[get_nlp_service] = lambda: NLPService(db_session, nlp=nlp)
+    yield
+    del app.dependency_overrides[get_nlp_service]
+
+def parse_sse(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+def test_summarize_stream_sends_chunks_then_persists(test_client, db_session, study_material, blank_nlp_service):
+    """Test that the SSE endpoint streams summary_chunk events and stores the full summary."""
+    async def fake_astream(self, input, config=None, **kwargs):
+        for delta in ["Cells ", "are ", "alive."]:
+            yield delta
+
+    with patch("langchain_core.runnables.base.RunnableSequence.astream", fake_astream), \
+         patch("backend.app.api.v1.study_materials.emit_to_user", new_callable=AsyncMock) as mock_emit:
+        response = test_client.post(
+            f"/api/v1/study-materials/summarize/stream?study_material_id={study_material.id}",
+            json={"text": "Cells are the basic unit of life."}
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_sse(response.text)
+    assert [name for name, _ in events] == ["summary_chunk"] * 3 + ["summary_complete"]
+    assert [data["delta"] for _, data in events[:3]] == ["Cells ", "are ", "alive."]
+    assert events[-1][1]["content"] == "Cells are alive."
+
+    stored = db_session.query(GeneratedSummary).filter(GeneratedSummary.id == events[-1][1]["id"]).one()
+    assert stored.content == "Cells are alive."
+    assert [call.args[1] for call in mock_emit.await_args_list] == ["summary_chunk"] * 3 + ["summary_created"]
+
+def test_summarize_stream_requires_ownership(test_client, current_user, blank_nlp_service):
+    response = test_client.post(
+        "/api/v1/study-materials/summarize/stream?study_material_id=999999",
+        json={"text": "Some text."}
+    )
+    assert response.status_code == 404
+
+def test_generate_all_returns_and_emits_every_artifact(test_client, study_material, blank_nlp_service):
+    """Test that generate-all stores the three artifacts and emits one combined event."""
+    with patch("backend.app.core.ai.summarization_module.SummarizationModule.agenerate_summary", new_callable=AsyncMock, return_value="A summary."), \
+         patch("backend.app.core.ai.flashcard_generation_module.FlashcardGenerationModule.agenerate_flashcards", new_callable=AsyncMock, return_value=[]), \
+         patch("backend.app.core.ai.quiz_generation_module.QuizGenerationModule.agenerate_quiz", new_callable=AsyncMock, return_value=[]), \
+         patch("backend.app.api.v1.study_materials.emit_to_user", new_callable=AsyncMock) as mock_emit:
+        response = test_client.post(
+            f"/api/v1/study-materials/{study_material.id}/generate-all",
+            json={"text": "Cells are the basic unit of life."}
+        )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["summary"]["content"] == "A summary."
+    assert body["flashcard_set"]["study_material_id"] == study_material.id
+    assert body["quiz"]["study_material_id"] == study_material.id
+    mock_emit.assert_awaited_once()
+    assert mock_emit.await_args.args[1] == "artifacts_created"
+
+def test_llm_rate_limit_returns_429_with_retry_after(test_client, study_material, blank_nlp_service):
+    """Test that a call rejected by the LLM governor surfaces as backpressure rather than a 500."""
+    with patch(
+        "backend.app.core.ai.summarization_module.SummarizationModule.agenerate_summary",
+        new_callable=AsyncMock,
+        side_effect=LLMRateLimitExceeded("provider rate limit budget exhausted", 2.5)
+    ):
+        response = test_client.post(
+            f"/api/v1/study-materials/summarize?study_material_id={study_material.id}",
+            json={"text": "Cells are the basic unit of life."}
+        )
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "3"
+
+def test_llm_unavailable_returns_503_with_retry_after(test_client, study_material, blank_nlp_service):
+    """Test that flashcards fail fast with 503 while the LLM circuit is open."""
+    with patch(
+        "backend.app.core.ai.flashcard_generation_module.FlashcardGenerationModule.agenerate_flashcards",
+        new_callable=AsyncMock,
+        side_effect=LLMUnavailableError("circuit open", 12.2)
+    ):
+        response = test_client.post(
+            f"/api/v1/study-materials/flashcards?study_material_id={study_material.id}",
+            json={"text": "Cells are the basic unit of life."}
+        )
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "13"
+
+def test_generate_all_runs_on_the_fake_llm_provider(test_client, study_material, blank_nlp_service):
+    """Test that the whole generation path works offline with LLM_PROVIDER=fake."""
+    with patch("backend.app.core.ai.llm_client_pool.LLM_PROVIDER", "fake"), \
+         patch("backend.app.core.ai.llm_client_pool.FakeStudyChatModel", side_effect=lambda: FakeStudyChatModel(latency_seconds=0)), \
+         patch("backend.app.api.v1.study_materials.emit_to_user", new_callable=AsyncMock):
+        # The shared modules hold on to the client they got first
+        get_shared_generation_modules.cache_clear()
+        llm_client_pool.reset()
+        response = test_client.post(
+            f"/api/v1/study-materials/{study_material.id}/generate-all",
+            json={"text": "Cells are the basic unit of life. They divide by mitosis."}
+        )
+    get_shared_generation_modules.cache_clear()
+    llm_client_pool.reset()
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["summary"]["content"] == "Cells are the basic unit of life. They divide by mitosis."
+    assert len(body["flashcard_set"]["content"]) == 2
+    assert len(body["quiz"]["content"]) == 2
+
+def test_study_material_crud_runs_on_the_async_session(test_client, db_session, current_user, study_material):
+    """Test that create, read, update, list and delete are served through the async session."""
+    db_session.add(GeneratedSummary(study_material_id=study_material.id, content="Cells divide.", detail_level="brief"))
+    db_session.commit()
+
+    with patch("backend.app.api.v1.study_materials.emit_to_user", new_callable=AsyncMock) as mock_emit:
+        created = test_client.post(
+            "/api/v1/study-materials/",
+            files={"file": (f"{uuid.uuid4().hex}.txt", b"Cells are the basic unit of life.", "text/plain")}
+        )
+        assert created.status_code == 201
+        created_id = created.json()["id"]
+        assert created.json()["generated_summaries"] == []
+
+        fetched = test_client.get(f"/api/v1/study-materials/{study_material.id}")
+        assert fetched.status_code == 200
+        assert [summary["content"] for summary in fetched.json()["generated_summaries"]] == ["Cells divide."]
+
+        updated = test_client.put(f"/api/v1/study-materials/{created_id}", json={"processing_status": "complete"})
+        assert updated.status_code == 200
+        assert updated.json()["processing_status"] == "complete"
+
+        listed = test_client.get("/api/v1/study-materials/")
+        assert sorted(material["id"] for material in listed.json()["items"]) == sorted([study_material.id, created_id])
+
+        summaries = test_client.get(f"/api/v1/study-materials/{study_material.id}/summaries")
+        assert [summary["content"] for summary in summaries.json()] == ["Cells divide."]
+
+        deleted = test_client.delete(f"/api/v1/study-materials/{created_id}")
+        assert deleted.status_code == 204
+        assert test_client.get(f"/api/v1/study-materials/{created_id}").status_code == 404
+
+    assert [call.args[1] for call in mock_emit.await_args_list] == [
+        "study_material_created", "study_material_updated", "study_material_deleted"
+    ]
+
+def test_bearer_token_is_resolved_on_the_async_session(test_client, db_session):
+    """Test that get_current_user loads the token's user without the dependency override."""
+    from jose import jwt
+    from backend.app.dependencies import ALGORITHM, SECRET_KEY
+
+    user = User(auth_provider_id=f"auth0|{uuid.uuid4().hex}", email=f"{uuid.uuid4().hex}@example.com")
+    db_session.add(user)
+    db_session.commit()
+    token = jwt.encode({"sub": str(user.id)}, SECRET_KEY, algorithm=ALGORITHM)
+
+    response = test_client.get("/api/v1/study-materials/", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.json() == {"items": [], "next_cursor": None}
+
+    unknown = jwt.encode({"sub": "not-a-user-id"}, SECRET_KEY, algorithm=ALGORITHM)
+    response = test_client.get("/api/v1/study-materials/", headers={"Authorization": f"Bearer {unknown}"})
+    assert response.status_code == 401
+
+def test_study_material_listing_pages_newest_first_by_cursor(test_client, db_session, current_user):
+    """Test that the listing walks every material once, newest first, including upload_date ties."""
+    uploaded = datetime.datetime(2024, 1, 1, 12, 0, 0)
+    materials = [
+        StudyMaterial(
+            user_id=current_user.id,
+            file_name=f"notes-{i}.txt",
+            s3_key=f"users/{current_user.id}/notes-{i}.txt",
+            upload_date=uploaded + datetime.timedelta(minutes=i // 2)
+        )
+        for i in range(5)
+    ]
+    db_session.add_all(materials)
+    db_session.commit()
+    expected = [m.id for m in sorted(materials, key=lambda m: (m.upload_date, m.id), reverse=True)]
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = test_client.get("/api/v1/study-materials/", params=params)
+        assert response.status_code == 200
+        body = response.json()
+        seen.extend(item["id"] for item in body["items"])
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == expected
+    assert pages == 3
+    # Generated content is left out unless it is asked for
+    assert "generated_summaries" not in body["items"][0]
+
+def test_study_material_listing_includes_only_requested_content(test_client, db_session, study_material):
+    db_session.add(GeneratedSummary(study_material_id=study_material.id, content="Cells divide.", detail_level="brief"))
+    db_session.commit()
+
+    response = test_client.get("/api/v1/study-materials/", params={"include": "summaries,quizzes"})
+
+    assert response.status_code == 200
+    item = response.json()["items"][0]
+    assert [summary["content"] for summary in item["generated_summaries"]] == ["Cells divide."]
+    assert item["generated_quizzes"] == []
+    assert "generated_flashcard_sets" not in item
+
+def test_study_material_listing_rejects_bad_parameters(test_client, current_user):
+    assert test_client.get("/api/v1/study-materials/", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert test_client.get("/api/v1/study-materials/", params={"include": "everything"}).status_code == 400
+    assert test_client.get("/api/v1/study-materials/", params={"limit": 0}).status_code == 422
+
+def test_deleting_a_study_material_deletes_its_generation_jobs(test_client, db_session, study_material):
+    """Test that a material that has had generation jobs can still be deleted, and takes them with it."""
+    job = GenerationJob(user_id=study_material.user_id, study_material_id=study_material.id, job_type="summary", params={})
+    db_session.add(job)
+    db_session.commit()
+    job_id = job.id
+
+    with patch("backend.app.api.v1.study_materials.emit_to_user", new_callable=AsyncMock):
+        assert test_client.delete(f"/api/v1/study-materials/{study_material.id}").status_code == 204
+
+    db_session.expunge_all()
+    assert db_session.get(GenerationJob, job_id) is None
@@ -1,5 +1,10 @@
+import asyncio
+import re
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
 from backend.app.core.ai.summarization_module import SummarizationModule
 import os
 
@@ -19,6 +24,11 @@ def set_openai_api_key_env():
     else:
         del os.environ["OPENAI_API_KEY"]
 
+@pytest.fixture
+def mock_chain_ainvoke():
+    with patch('langchain_core.runnables.base.RunnableSequence.ainvoke', new_callable=AsyncMock) as mock_ainvoke:
+        yield mock_ainvoke
+
 def test_summarization_module_initialization():
     """Test that the summarization module initializes correctly."""
     summarizer = SummarizationModule()
@@ -59,3 +69,97 @@ def test_generate_summary_missing_api_key():
 
     if original_api_key:
         os.environ["OPENAI_API_KEY"] = original_api_key
+
+def test_generate_summary_served_from_cache(mock_chain_invoke):
+    """Test that repeating a request with the same text and detail level skips the LLM."""
+    summarizer = SummarizationModule()
+    mock_chain_invoke.return_value = "Cached summary."
+
+    first = summarizer.generate_summary("Some   text to summarize.", detail_level="normal")
+    second = summarizer.generate_summary("Some text to summarize.", detail_level="normal")
+    third = summarizer.generate_summary("Some text to summarize.", detail_level="brief")
+
+    assert first == second == third == "Cached summary."
+    # Whitespace differences share an entry; a different detail level does not
+    assert mock_chain_invoke.call_count == 2
+
+@pytest.mark.asyncio
+async def test_agenerate_summary_uses_ainvoke(mock_chain_invoke, mock_chain_ainvoke):
+    """Test that the async variant awaits chain.ainvoke and never calls the blocking invoke."""
+    summarizer = SummarizationModule()
+    mock_chain_ainvoke.return_value = "Async summary."
+
+    text = "A text summarized without blocking the event loop."
+    summary = await summarizer.agenerate_summary(text, detail_level="brief")
+
+    assert summary == "Async summary."
+    mock_chain_ainvoke.assert_awaited_once_with({"text": text})
+    mock_chain_invoke.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_agenerate_summary_missing_api_key(monkeypatch):
+    """Test that the async variant validates the API key like the sync one."""
+    monkeypatch.delenv("OPENAI_API_KEY")
+    with pytest.raises(ValueError, match="OPENAI_API_KEY environment variable is not set."):
+        await SummarizationModule().agenerate_summary("some text")
+
+def _echo_llm(calls, active, peak):
+    """A fake LLM that answers with the #markers of its prompt, in order, and records its concurrency."""
+    def tag(prompt_value):
+        text = prompt_value.to_messages()[-1].content
+        calls.append(text)
+        return "".join(re.findall(r"#\w", text))
+
+    async def atag(prompt_value):
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.01)
+        active[0] -= 1
+        return tag(prompt_value)
+
+    return RunnableLambda(tag, afunc=atag)
+
+@pytest.mark.asyncio
+async def test_agenerate_chunked_summary_map_reduce():
+    """Test that chunks are summarized with bounded concurrency and combined in document order."""
+    summarizer = SummarizationModule()
+    calls, active, peak = [], [0], [0]
+    summarizer.llm = _echo_llm(calls, active, peak)
+
+    chunks = [f"Chunk #{letter} of the chapter." for letter in "ABCDEFGH"]
+    summary = await summarizer.agenerate_chunked_summary(chunks, detail_level="brief", max_tokens=5, max_concurrency=3)
+
+    assert summary == "#A#B#C#D#E#F#G#H"
+    assert 1 < peak[0] <= 3
+    # 8 section summaries, at least one intermediate combine level, then the final brief combine
+    section_calls = [c for c in calls if "one section of a longer document" in c]
+    assert len(section_calls) == 8
+    assert len(calls) > 9
+    assert "Combine them into a brief summary" in calls[-1]
+
+def test_generate_chunked_summary_is_cached():
+    """Test that the sync variant caches the final summary of a chunked document."""
+    summarizer = SummarizationModule()
+    calls = []
+    summarizer.llm = _echo_llm(calls, [0], [0])
+
+    chunks = ["Chunk #A.", "Chunk #B."]
+    first = summarizer.generate_chunked_summary(chunks, max_tokens=100)
+    call_count = len(calls)
+    second = summarizer.generate_chunked_summary(chunks, max_tokens=100)
+
+    assert first == second == "#A#B"
+    assert len(calls) == call_count == 3
+
+@pytest.mark.asyncio
+async def test_astream_summary_yields_deltas_and_caches():
+    """Test that summaries stream in several deltas and a repeat request is served from the cache."""
+    summarizer = SummarizationModule()
+    summarizer.llm = GenericFakeChatModel(messages=iter([AIMessage(content="Cells are the unit of life.")]))
+
+    deltas = [delta async for delta in summarizer.astream_summary("Some biology text.")]
+    cached = [delta async for delta in summarizer.astream_summary("Some biology text.")]
+
+    assert len(deltas) > 1
+    assert "".join(deltas) == "Cells are the unit of life."
+    assert cached == ["Cells are the unit of life."]
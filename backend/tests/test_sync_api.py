@@ -0,0 +1,124 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from backend.main import app
+from backend.app.dependencies import get_current_user
+from backend.app.models.generated_summary import GeneratedSummary
+from backend.app.models.shared_study_material import SharedStudyMaterial
+from backend.app.models.study_material import StudyMaterial
+from backend.app.services import sync_service
+
+
+@pytest.fixture(autouse=True)
+def no_settle_window(monkeypatch):
+    monkeypatch.setattr(sync_service, "SYNC_SETTLE_SECONDS", 0)
+
+
+@pytest.fixture
+def current_user(make_user):
+    user = make_user()
+    app.dependency_overrides[get_current_user] = lambda: user
+    yield user
+    del app.dependency_overrides[get_current_user]
+
+
+def sync(test_client, cursor=None, **params):
+    response = test_client.get("/api/v1/sync/", params={**params, **({"cursor": cursor} if cursor else {})})
+    assert response.status_code == 200
+    return response.json()
+
+
+def changes_by_key(body) -> dict:
+    return {(change["entity_type"], change["entity_id"]): change for change in body["changes"]}
+
+
+def test_sync_returns_upserts_then_only_what_changed_since_the_cursor(test_client, db_session, current_user):
+    material = StudyMaterial(user_id=current_user.id, file_name="notes.txt", s3_key="notes.txt")
+    db_session.add(material)
+    db_session.flush()
+    db_session.add(GeneratedSummary(study_material_id=material.id, content="Cells divide.", detail_level="brief"))
+    db_session.commit()
+
+    first = sync(test_client)
+    changes = changes_by_key(first)
+    assert changes[("study_material", material.id)]["data"]["file_name"] == "notes.txt"
+    assert "generated_summaries" not in changes[("study_material", material.id)]["data"]
+    assert [c["data"]["content"] for c in first["changes"] if c["entity_type"] == "summary"] == ["Cells divide."]
+    assert first["has_more"] is False
+
+    # Nothing new: same cursor, no changes
+    assert sync(test_client, first["cursor"]) == {"changes": [], "cursor": first["cursor"], "has_more": False}
+
+    with patch("backend.app.api.v1.study_materials.emit_to_user", new_callable=AsyncMock):
+        test_client.put(f"/api/v1/study-materials/{material.id}", json={"processing_status": "complete"})
+        test_client.put(f"/api/v1/study-materials/{material.id}", json={"file_name": "renamed.txt"})
+
+    second = sync(test_client, first["cursor"])
+    # Two updates compact to one upsert with the latest state
+    assert len(second["changes"]) == 1
+    assert second["changes"][0]["data"]["file_name"] == "renamed.txt"
+    assert second["changes"][0]["data"]["processing_status"] == "complete"
+
+
+def test_deleting_a_material_sends_tombstones_for_it_and_its_content(test_client, db_session, current_user, make_user):
+    recipient = make_user()
+    material = StudyMaterial(user_id=current_user.id, file_name="notes.txt", s3_key="notes.txt")
+    db_session.add(material)
+    db_session.flush()
+    summary = GeneratedSummary(study_material_id=material.id, content="Cells divide.")
+    share = SharedStudyMaterial(study_material_id=material.id, shared_by_user_id=current_user.id, shared_with_user_id=recipient.id)
+    db_session.add_all([summary, share])
+    db_session.commit()
+    material_id, summary_id, share_id = material.id, summary.id, share.id
+    cursor = sync(test_client)["cursor"]
+
+    with patch("backend.app.api.v1.study_materials.emit_to_user", new_callable=AsyncMock):
+        assert test_client.delete(f"/api/v1/study-materials/{material_id}").status_code == 204
+
+    changes = changes_by_key(sync(test_client, cursor))
+    assert {key: change["operation"] for key, change in changes.items()} == {
+        ("study_material", material_id): "delete",
+        ("summary", summary_id): "delete",
+        ("share", share_id): "delete",
+    }
+    assert all(change["data"] is None for change in changes.values())
+
+    # The recipient's feed carries the share and its tombstone too
+    app.dependency_overrides[get_current_user] = lambda: recipient
+    recipient_changes = changes_by_key(sync(test_client))
+    assert recipient_changes[("share", share_id)]["operation"] == "delete"
+
+
+def test_sync_pages_are_bounded_by_limit(test_client, db_session, current_user):
+    db_session.add_all([
+        StudyMaterial(user_id=current_user.id, file_name=f"notes-{i}.txt", s3_key=f"notes-{i}.txt") for i in range(5)
+    ])
+    db_session.commit()
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        body = sync(test_client, cursor, limit=2)
+        assert len(body["changes"]) <= 2
+        seen.extend(change["entity_id"] for change in body["changes"])
+        cursor, pages = body["cursor"], pages + 1
+        if not body["has_more"]:
+            break
+
+    assert len(seen) == len(set(seen)) == 5
+    assert pages == 3
+
+
+def test_sync_rejects_a_malformed_cursor(test_client, current_user):
+    assert test_client.get("/api/v1/sync/", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_updates_lists_materials_changed_since(test_client, db_session, current_user):
+    material = StudyMaterial(user_id=current_user.id, file_name="notes.txt", s3_key="notes.txt")
+    db_session.add(material)
+    db_session.commit()
+
+    response = test_client.get("/api/v1/study-materials/updates", params={"since": "2000-01-01T00:00:00"})
+
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [material.id]
+    assert test_client.get("/api/v1/study-materials/updates", params={"since": "2999-01-01T00:00:00"}).json() == []
@@ -0,0 +1,49 @@
+from backend.app.core.ai.text_chunking import estimate_tokens, group_by_budget, pack_chunks
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+
+
+def test_pack_chunks_keeps_paragraphs_together_and_in_order():
+    paragraphs = [
+        ["First sentence here.", "Second sentence here."],
+        ["Third sentence here."],
+        ["Fourth sentence here.", "Fifth sentence here."],
+    ]
+    chunks = pack_chunks(paragraphs, max_tokens=15)
+
+    assert chunks == [
+        "First sentence here. Second sentence here.",
+        "Third sentence here.",
+        "Fourth sentence here. Fifth sentence here.",
+    ]
+
+
+def test_pack_chunks_splits_long_paragraphs_between_sentences():
+    sentences = [f"Sentence number {i} of the paragraph." for i in range(10)]
+    chunks = pack_chunks([sentences], max_tokens=25)
+
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 25 for chunk in chunks)
+    assert " ".join(chunks) == " ".join(sentences)
+
+
+def test_pack_chunks_splits_overlong_sentence_between_words():
+    sentence = " ".join(["word"] * 100)
+    chunks = pack_chunks([[sentence]], max_tokens=20)
+
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 20 for chunk in chunks)
+    assert " ".join(chunks) == sentence
+
+
+def test_group_by_budget_always_makes_progress():
+    texts = ["x" * 100 for _ in range(5)]
+    groups = group_by_budget(texts, max_tokens=10)
+
+    # Every text exceeds the budget on its own, yet each group still merges at least two
+    assert [len(group) for group in groups] == [2, 3]
+    assert [text for group in groups for text in group] == texts